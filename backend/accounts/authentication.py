@@ -0,0 +1,32 @@
+"""
+JWT authentication that resolves roles from access-token claims when they are current.
+"""
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .tokens import prime_roles_from_token
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Same as SimpleJWT's JWTAuthentication; tokens carrying role claims whose version matches
+    user.role_version skip the roles query. Tokens without claims behave exactly as before.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        prime_roles_from_token(user, validated_token)
+        return user
+
+
+class QueryTokenJWTAuthentication(RoleClaimsJWTAuthentication):
+    """
+    Access token in ?token= for requests the browser makes without headers (<img>, <video>).
+    Only enabled on views that list it in authentication_classes.
+    """
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get('token')
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_user(validated_token), validated_token
@@ -0,0 +1,159 @@
+"""
+Bounded executor for password hashing (PBKDF2 is CPU-heavy).
+Login and registration hash through a small pool with a cap on in-flight jobs; when the cap is
+reached the request fails fast with 429 instead of piling up behind other hashes.
+Configured by settings.PASSWORD_HASHING_POOL; per-call wait/hash timings are logged and aggregated.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from rest_framework.exceptions import Throttled
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_CONFIG = {
+    'EXECUTOR': 'thread',  # 'thread' | 'process' | 'inline'
+    'MAX_WORKERS': 2,
+    'MAX_PENDING': 16,     # running + queued hashes per process before answering 429
+    'TIMEOUT': 10.0,       # seconds to wait for a result
+}
+
+
+class HashingPoolSaturated(Throttled):
+    default_detail = 'Too many concurrent sign-in requests. Please retry shortly.'
+    default_code = 'hashing_pool_saturated'
+
+
+def _init_process_worker():
+    import django
+    django.setup()
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+class HashingPool:
+    def __init__(self, executor='thread', max_workers=2, max_pending=16, timeout=10.0):
+        self.kind = executor
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'rejected': 0, 'wait_ms': 0.0, 'hash_ms': 0.0, 'max_hash_ms': 0.0}
+        if executor == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_process_worker)
+        elif executor == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pwhash')
+        else:
+            self._executor = None
+
+    def run(self, op, fn, *args):
+        """Run fn(*args) on the pool and return its result; raises HashingPoolSaturated when full."""
+        if not self._slots.acquire(blocking=False):
+            self._record_rejection(op)
+            raise HashingPoolSaturated(wait=1)
+        start = time.perf_counter()
+        release = True
+        try:
+            if self._executor is None:
+                result, hash_ms = _timed(fn, *args)
+            else:
+                future = self._executor.submit(_timed, fn, *args)
+                try:
+                    result, hash_ms = future.result(timeout=self.timeout)
+                except TimeoutError:
+                    # A hash that is still running keeps its slot until it finishes, so the
+                    # number of hashes in flight never exceeds MAX_PENDING
+                    if not future.cancel():
+                        release = False
+                        future.add_done_callback(lambda _: self._slots.release())
+                    self._record_rejection(op)
+                    raise HashingPoolSaturated(wait=1)
+        finally:
+            if release:
+                self._slots.release()
+        total_ms = (time.perf_counter() - start) * 1000
+        self._record(op, total_ms - hash_ms, hash_ms)
+        return result
+
+    def _record(self, op, wait_ms, hash_ms):
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['wait_ms'] += wait_ms
+            self._stats['hash_ms'] += hash_ms
+            self._stats['max_hash_ms'] = max(self._stats['max_hash_ms'], hash_ms)
+        logger.info('password %s: wait=%.1fms hash=%.1fms executor=%s', op, wait_ms, hash_ms, self.kind)
+
+    def _record_rejection(self, op):
+        with self._lock:
+            self._stats['rejected'] += 1
+        logger.warning('password %s rejected: hashing pool saturated', op)
+
+    def stats(self):
+        """Snapshot of counters for this process: calls, rejected, avg/max timings in ms."""
+        with self._lock:
+            s = dict(self._stats)
+        calls = s['calls'] or 1
+        return {
+            'executor': self.kind,
+            'calls': s['calls'],
+            'rejected': s['rejected'],
+            'avg_wait_ms': s['wait_ms'] / calls,
+            'avg_hash_ms': s['hash_ms'] / calls,
+            'max_hash_ms': s['max_hash_ms'],
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_config = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool, rebuilt if settings.PASSWORD_HASHING_POOL changes (e.g. in tests)."""
+    global _pool, _pool_config
+    config = {**DEFAULT_POOL_CONFIG, **getattr(settings, 'PASSWORD_HASHING_POOL', {})}
+    with _pool_lock:
+        if _pool is None or config != _pool_config:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = HashingPool(
+                executor=config['EXECUTOR'],
+                max_workers=config['MAX_WORKERS'],
+                max_pending=config['MAX_PENDING'],
+                timeout=config['TIMEOUT'],
+            )
+            _pool_config = config
+        return _pool
+
+
+def hash_password(raw_password):
+    """make_password() on the pool. Unusable passwords (None) need no hashing."""
+    if raw_password is None:
+        return make_password(None)
+    return get_pool().run('hash', make_password, raw_password)
+
+
+def verify_password(user, raw_password):
+    """
+    user.check_password() on the pool. Like Django, re-hashes and saves the password when
+    the stored hash uses an outdated algorithm or iteration count.
+    """
+    encoded = user.password
+    if not get_pool().run('check', check_password, raw_password, encoded):
+        return False
+    preferred = get_hasher('default')
+    if identify_hasher(encoded).algorithm != preferred.algorithm or preferred.must_update(encoded):
+        user.password = hash_password(raw_password)
+        user.save(update_fields=['password'])
+    return True
@@ -0,0 +1,71 @@
+"""
+Login identifier resolution micro-benchmark.
+Seeds users inside a transaction that is rolled back, then compares the old chained lookups
+(username, national_id, phone, email__iexact one after another) with User.objects.get_by_identifier.
+Password hashing is excluded so only the lookup cost is measured.
+"""
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+
+
+def chained_lookup(identifier):
+    return (
+        User.objects.filter(username=identifier).first()
+        or User.objects.filter(national_id=identifier).first()
+        or User.objects.filter(phone=identifier).first()
+        or User.objects.filter(email__iexact=identifier).first()
+    )
+
+
+class Command(BaseCommand):
+    help = 'Compare chained vs single-query login identifier resolution'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        n = options['users']
+        iterations = options['iterations']
+        with transaction.atomic():
+            password = make_password(None)
+            self.stdout.write(f'Seeding {n} users...')
+            batch = []
+            for i in range(n):
+                batch.append(User(
+                    username=f'bench_user_{i}',
+                    email=f'Bench.User.{i}@example.com',
+                    phone=f'0999{i:07d}',
+                    national_id=f'9{i:09d}',
+                    password=password,
+                ))
+                if len(batch) == 5000:
+                    User.objects.bulk_create(batch)
+                    batch = []
+            User.objects.bulk_create(batch)
+
+            probe = n // 2
+            identifiers = {
+                'username': f'bench_user_{probe}',
+                'national_id': f'9{probe:09d}',
+                'phone': f'0999{probe:07d}',
+                'email': f'bench.user.{probe}@EXAMPLE.com',
+                'unknown': 'no-such-user@example.com',
+            }
+            self.stdout.write(f'{"identifier":<14}{"strategy":<12}{"queries":>9}{"ms/login":>11}')
+            for kind, identifier in identifiers.items():
+                for name, resolve in (('chained', chained_lookup), ('single', User.objects.get_by_identifier)):
+                    with CaptureQueriesContext(connection) as ctx:
+                        resolve(identifier)
+                    start = time.perf_counter()
+                    for _ in range(iterations):
+                        resolve(identifier)
+                    elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+                    self.stdout.write(f'{kind:<14}{name:<12}{len(ctx):>9}{elapsed_ms:>11.3f}')
+            transaction.set_rollback(True)
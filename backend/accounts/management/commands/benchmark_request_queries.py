@@ -0,0 +1,49 @@
+"""
+Count the SQL queries a typical authenticated API request makes.
+Seeds a throwaway detective with cases inside a transaction that is rolled back,
+then calls list endpoints with a real JWT and reports total and role-table queries.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import Role, User
+from accounts.views import get_tokens_for_user
+from cases.models import Case
+
+ENDPOINTS = [
+    '/api/cases/',
+    '/api/complaints/',
+    '/api/evidence/',
+    '/api/suspects/',
+    '/api/tips/',
+    '/api/notifications/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Report SQL query counts per authenticated request (nothing is persisted)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cases', type=int, default=20, help='Cases to seed for the detective')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            role, _ = Role.objects.get_or_create(name='Detective')
+            user = User.objects.create_user(username='__bench_detective__', password=None)
+            user.roles.add(role)
+            Case.objects.bulk_create(
+                Case(title=f'Bench case {i}', created_by=user, assigned_detective=user)
+                for i in range(options['cases'])
+            )
+            access = get_tokens_for_user(user)['access']
+            client = APIClient(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+            self.stdout.write(f'{"endpoint":<24}{"status":>8}{"queries":>10}{"role queries":>15}')
+            for url in ENDPOINTS:
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(url)
+                role_queries = sum(1 for q in ctx.captured_queries if 'accounts_role' in q['sql'])
+                self.stdout.write(f'{url:<24}{response.status_code:>8}{len(ctx):>10}{role_queries:>15}')
+            transaction.set_rollback(True)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
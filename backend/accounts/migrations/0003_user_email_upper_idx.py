@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:42
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_role_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='accounts_user_email_upper_idx'),
+        ),
+    ]
@@ -3,8 +3,12 @@ User and dynamic Role models.
 Admin can add, remove, or modify roles without code changes.
 """
 from django.db import models
+from django.db.models import Q, Value, prefetch_related_objects
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from .hashing import hash_password
+
 
 class Role(models.Model):
     """
@@ -31,10 +35,37 @@ class UserManager(BaseUserManager):
             raise ValueError('Users must have a username')
         email = self.normalize_email(email) if email else ''
         user = self.model(username=username, email=email or '', **kwargs)
-        user.set_password(password)
+        user.password = hash_password(password)
+        user._password = password
         user.save(using=self._db)
         return user
 
+    def get_by_identifier(self, identifier):
+        """
+        Resolve a login identifier (username, national_id, phone, or email) in one query.
+        Priority matches the login spec: username, then national_id, then phone, then email.
+        Email is only considered for identifiers containing '@'.
+        """
+        condition = Q(username=identifier) | Q(national_id=identifier) | Q(phone=identifier)
+        qs = self.all()
+        if '@' in identifier:
+            # Compare UPPER(email) directly (not email__iexact, which is LIKE on SQLite) so every
+            # OR branch can use an index, including accounts_user_email_upper_idx.
+            qs = qs.alias(email_upper=Upper('email'))
+            condition |= Q(email_upper=Upper(Value(identifier)))
+        matches = list(qs.filter(condition)[:4])
+        checks = (
+            lambda u: u.username == identifier,
+            lambda u: u.national_id == identifier,
+            lambda u: u.phone == identifier,
+            lambda u: (u.email or '').lower() == identifier.lower(),
+        )
+        for check in checks:
+            for user in matches:
+                if check(user):
+                    return user
+        return None
+
     def create_superuser(self, username, email=None, password=None, **kwargs):
         kwargs.setdefault('is_staff', True)
         kwargs.setdefault('is_superuser', True)
@@ -52,6 +83,8 @@ class User(AbstractUser):
     full_name = models.CharField(max_length=255, blank=True)
     national_id = models.CharField(max_length=32, blank=True, unique=True, null=True)
     roles = models.ManyToManyField(Role, related_name='users', blank=True)
+    # Bumped on every role change; JWT role claims are only trusted while it matches
+    role_version = models.PositiveIntegerField(default=0, editable=False)
 
     objects = UserManager()
 
@@ -64,14 +97,46 @@ class User(AbstractUser):
             models.Index(fields=['national_id']),
             models.Index(fields=['phone']),
             models.Index(fields=['email']),
+            # Case-insensitive email lookups (login, registration uniqueness checks)
+            models.Index(Upper('email'), name='accounts_user_email_upper_idx'),
         ]
 
     def __str__(self):
         return self.username or self.email or str(self.pk)
 
+    def cached_roles(self):
+        """
+        Roles loaded once per instance (one query) and kept in the prefetch cache.
+        roles.add/remove/set/clear and refresh_from_db() drop the cache, so it never goes stale
+        for the instance that changed; each request authenticates a fresh instance.
+        """
+        cache = getattr(self, '_prefetched_objects_cache', {})
+        if 'roles' not in cache:
+            if self.pk is None:
+                return []
+            prefetch_related_objects([self], 'roles')
+        return list(self.roles.all())
+
+    def prime_role_cache(self, roles):
+        """Install already-known roles (e.g. from token claims) as the cached roles."""
+        cache = self.__dict__.setdefault('_prefetched_objects_cache', {})
+        cache.pop('roles', None)
+        qs = self.roles.all()
+        qs._result_cache = list(roles)
+        qs._prefetch_done = True
+        cache['roles'] = qs
+
+    def role_set(self):
+        """Lower-cased role names for case-insensitive membership checks."""
+        return frozenset(r.name.lower() for r in self.cached_roles())
+
     def has_role(self, role_name):
-        """Check if user has a role by name."""
-        return self.roles.filter(name__iexact=role_name).exists()
+        """Check if user has a role by name (case-insensitive)."""
+        return role_name.lower() in self.role_set()
+
+    def has_any_role(self, role_names):
+        """Check if user has at least one of the given roles (case-insensitive)."""
+        return not self.role_set().isdisjoint(name.lower() for name in role_names)
 
     def role_names(self):
-        return list(self.roles.values_list('name', flat=True))
+        return [r.name for r in self.cached_roles()]
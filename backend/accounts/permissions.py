@@ -55,7 +55,7 @@ def has_any_role(user, role_names):
     """Check if user has at least one of the given roles."""
     if not user.is_authenticated:
         return False
-    return any(user.has_role(name) for name in role_names)
+    return user.has_any_role(role_names)
 
 
 class IsSupervisor(permissions.BasePermission):
@@ -4,6 +4,7 @@ User and Role serializers. Registration with unique username, email, phone, nati
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import Role
+from .hashing import verify_password
 
 User = get_user_model()
 
@@ -103,7 +104,9 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         role_ids = validated_data.pop('role_ids', None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        if validated_data:
+            # Only the submitted columns: a full save would write back a stale role_version
+            instance.save(update_fields=list(validated_data))
         if role_ids is not None:
             instance.roles.set(Role.objects.filter(pk__in=role_ids))
         return instance
@@ -120,13 +123,8 @@ class LoginSerializer(serializers.Serializer):
         if not identifier or not password:
             raise serializers.ValidationError('Identifier and password are required.')
         User = get_user_model()
-        user = (
-            User.objects.filter(username=identifier).first()
-            or User.objects.filter(national_id=identifier).first()
-            or User.objects.filter(phone=identifier).first()
-            or User.objects.filter(email__iexact=identifier).first()
-        )
-        if not user or not user.check_password(password):
+        user = User.objects.get_by_identifier(identifier)
+        if not user or not verify_password(user, password):
             raise serializers.ValidationError('Invalid identifier or password.')
         if not user.is_active:
             raise serializers.ValidationError('User account is disabled.')
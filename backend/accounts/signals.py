@@ -0,0 +1,40 @@
+"""
+Bump User.role_version whenever a user's effective roles change, so tokens carrying
+role claims from before the change fall back to a database role check.
+"""
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Role, User
+
+
+def bump_role_version(user_ids):
+    if user_ids:
+        User.objects.filter(pk__in=user_ids).update(role_version=F('role_version') + 1)
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def user_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_role_version([instance.pk])
+            instance.role_version += 1
+        return
+    # role.users.add(...) etc.: instance is the Role
+    if action in ('post_add', 'post_remove'):
+        bump_role_version(pk_set)
+    elif action == 'pre_clear':
+        bump_role_version(list(instance.users.values_list('pk', flat=True)))
+
+
+@receiver(post_save, sender=Role)
+def role_saved(sender, instance, created, **kwargs):
+    """Renaming a role changes the names carried in existing tokens."""
+    if not created:
+        bump_role_version(list(instance.users.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Role)
+def role_deleted(sender, instance, **kwargs):
+    bump_role_version(list(instance.users.values_list('pk', flat=True)))
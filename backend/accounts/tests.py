@@ -1,8 +1,14 @@
-from django.test import TestCase
+import threading
+import time
+
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from accounts.models import Role
+from accounts.hashing import HashingPool, HashingPoolSaturated, get_pool
 
 User = get_user_model()
 
@@ -104,4 +110,142 @@ class AccountsTestCase(TestCase):
         
         response = self.client.get('/api/auth/users/')
         
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # تست ۶: نقش‌های کاربر فقط یک بار در هر درخواست بارگذاری می‌شوند
+    def test_roles_loaded_once_per_request(self):
+        """چند بررسی نقش در یک درخواست فقط یک کوئری روی جدول نقش‌ها اجرا می‌کند"""
+        detective = User.objects.get(pk=self.normal_user.pk)
+        detective.roles.add(self.detective_role)
+        self.client.force_authenticate(user=User.objects.get(pk=detective.pk))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/cases/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        role_queries = [q for q in ctx.captured_queries if 'accounts_role' in q['sql']]
+        self.assertEqual(len(role_queries), 1)
+
+    # تست ۷: تغییر نقش‌ها کش نقش را باطل می‌کند
+    def test_role_cache_invalidated_on_change(self):
+        """افزودن یا حذف نقش بلافاصله در has_role دیده می‌شود"""
+        self.assertFalse(self.normal_user.has_role('detective'))
+        self.normal_user.roles.add(self.detective_role)
+        self.assertTrue(self.normal_user.has_role('Detective'))
+        self.normal_user.roles.remove(self.detective_role)
+        self.assertFalse(self.normal_user.has_any_role(['Detective', 'Police Officer']))
+
+
+    # تست ۸: نقش‌ها در توکن دسترسی قرار می‌گیرند و بررسی نقش بدون کوئری انجام می‌شود
+    @override_settings(JWT_ROLE_CLAIMS=True)
+    def test_role_claims_in_access_token(self):
+        """با فعال بودن JWT_ROLE_CLAIMS بررسی دسترسی ادمین کوئری نقش اجرا نمی‌کند"""
+        response = self.client.post('/api/auth/login/', {'identifier': 'admin', 'password': 'Admin@123456'})
+        access = response.data['data']['tokens']['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/auth/users/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        role_queries = [q for q in ctx.captured_queries if 'accounts_role' in q['sql']]
+        # Only the list's roles prefetch touches the roles table, not the permission check
+        self.assertEqual(len(role_queries), 1)
+
+    # تست ۹: توکن قدیمی پس از تغییر نقش به بررسی پایگاه داده برمی‌گردد
+    @override_settings(JWT_ROLE_CLAIMS=True)
+    def test_stale_role_claims_fall_back_to_database(self):
+        """پس از حذف نقش ادمین، توکن قبلی دیگر دسترسی ادمین نمی‌دهد"""
+        response = self.client.post('/api/auth/login/', {'identifier': 'admin', 'password': 'Admin@123456'})
+        access = response.data['data']['tokens']['access']
+        self.admin_user.roles.remove(self.admin_role)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = self.client.get('/api/auth/users/')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+    # تست ۱۰: ورود با ایمیل (بدون حساسیت به حروف) با یک کوئری شناسایی می‌شود
+    def test_login_identifier_resolved_in_single_query(self):
+        """شناسه ورود (ایمیل با حروف بزرگ) فقط با یک کوئری به کاربر تبدیل می‌شود"""
+        with CaptureQueriesContext(connection) as ctx:
+            user = User.objects.get_by_identifier('ADMIN@Test.com')
+        self.assertEqual(user, self.admin_user)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        response = self.client.post('/api/auth/login/', {
+            'identifier': '09122222222',  # شماره تلفن کاربر عادی
+            'password': 'User@123456'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['user']['username'], 'user1')
+
+
+    # تست ۱۱: در صورت اشباع استخر هش رمز عبور، ورود با کد ۴۲۹ رد می‌شود
+    @override_settings(PASSWORD_HASHING_POOL={'EXECUTOR': 'thread', 'MAX_WORKERS': 1, 'MAX_PENDING': 1, 'TIMEOUT': 5})
+    def test_login_rejected_when_hashing_pool_saturated(self):
+        """وقتی همه ظرفیت استخر هش در حال استفاده است، پاسخ ۴۲۹ برگردانده می‌شود"""
+        pool = get_pool()
+        started, finish = threading.Event(), threading.Event()
+
+        def busy():
+            started.set()
+            finish.wait(5)
+
+        # تنها جایگاه استخر را با یک هش طولانی اشغال می‌کنیم
+        worker = threading.Thread(target=pool.run, args=('hash', busy))
+        worker.start()
+        started.wait(5)
+        try:
+            with self.assertLogs('accounts.hashing', 'WARNING') as logs:
+                response = self.client.post('/api/auth/login/', {'identifier': 'admin', 'password': 'Admin@123456'})
+        finally:
+            finish.set()
+            worker.join()
+
+        self.assertIn('password check rejected', logs.output[0])
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+        response = self.client.post('/api/auth/login/', {'identifier': 'admin', 'password': 'Admin@123456'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(pool.stats()['rejected'], 1)
+
+    # تست ۱۲: هشی که از مهلت گذشته ولی هنوز در حال اجراست جایگاه خود را نگه می‌دارد
+    def test_timed_out_hash_keeps_its_slot_until_done(self):
+        """پس از timeout تا پایان واقعی هش، درخواست جدید پذیرفته نمی‌شود و سپس جایگاه آزاد می‌شود"""
+        pool = HashingPool('thread', max_workers=2, max_pending=1, timeout=0.05)
+        self.addCleanup(pool.shutdown)
+        finish = threading.Event()
+        with self.assertLogs('accounts.hashing', 'WARNING'):
+            with self.assertRaises(HashingPoolSaturated):
+                pool.run('check', finish.wait, 5)
+            with self.assertRaises(HashingPoolSaturated):
+                pool.run('check', len, 'x')  # هش قبلی هنوز در حال اجراست
+        finish.set()
+        deadline = time.monotonic() + 5
+        with self.assertLogs('accounts.hashing', 'INFO'):  # رد تا آزاد شدن جایگاه، سپس زمان‌بندی هش موفق
+            while True:
+                try:
+                    self.assertEqual(pool.run('check', len, 'abc'), 3)
+                    break
+                except HashingPoolSaturated:
+                    self.assertLess(time.monotonic(), deadline)
+                    time.sleep(0.01)
+
+    # تست ۱۳: ویرایش کاربر نسخه نقشی را که هم‌زمان افزایش یافته بازنویسی نمی‌کند
+    def test_user_update_keeps_concurrent_role_version(self):
+        """ذخیره فقط ستون‌های ارسال‌شده را می‌نویسد؛ نسخه نقش افزایش‌یافته در پایگاه داده می‌ماند"""
+        from accounts.serializers import UserUpdateSerializer
+        from accounts.signals import bump_role_version
+
+        stale = User.objects.get(pk=self.normal_user.pk)
+        bump_role_version([self.normal_user.pk])  # تغییر نقش هم‌زمان در درخواست دیگر
+        serializer = UserUpdateSerializer(stale, data={'full_name': 'کاربر ویرایش‌شده'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        user = User.objects.get(pk=self.normal_user.pk)
+        self.assertEqual(user.full_name, 'کاربر ویرایش‌شده')
+        self.assertEqual(user.role_version, stale.role_version + 1)
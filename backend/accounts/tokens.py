@@ -0,0 +1,46 @@
+"""
+Role claims for JWT access tokens (opt-in via JWT_ROLE_CLAIMS).
+Access tokens carry the user's roles and role_version; authentication trusts the claims only
+while role_version still matches the user row, otherwise roles are read from the database.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+ROLES_CLAIM = 'roles'
+ROLE_VERSION_CLAIM = 'rv'
+
+
+def role_claims_enabled():
+    return getattr(settings, 'JWT_ROLE_CLAIMS', False)
+
+
+def add_role_claims(token, user):
+    """Stamp [[role_id, role_name], ...] and the user's role_version onto a token."""
+    token[ROLES_CLAIM] = [[role.pk, role.name] for role in user.cached_roles()]
+    token[ROLE_VERSION_CLAIM] = user.role_version
+    return token
+
+
+def prime_roles_from_token(user, validated_token):
+    """Seed user's role cache from token claims if they are still current. Returns True when used."""
+    roles = validated_token.get(ROLES_CLAIM)
+    if roles is None or validated_token.get(ROLE_VERSION_CLAIM) != user.role_version:
+        return False
+    from .models import Role
+    user.prime_role_cache([Role(pk=pk, name=name) for pk, name in roles])
+    return True
+
+
+class RoleClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh that re-stamps current role claims so refreshed access tokens stay stateless."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if role_claims_enabled():
+            access = AccessToken(data['access'])
+            user = get_user_model().objects.get(**{api_settings.USER_ID_FIELD: access[api_settings.USER_ID_CLAIM]})
+            data['access'] = str(add_role_claims(access, user))
+        return data
@@ -18,6 +18,7 @@ from .serializers import (
     LoginSerializer,
 )
 from .permissions import IsSystemAdmin, IsOfficerOrAbove
+from .tokens import add_role_claims, role_claims_enabled
 from core.utils import log_audit
 
 User = get_user_model()
@@ -25,7 +26,10 @@ User = get_user_model()
 
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
-    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+    access = refresh.access_token
+    if role_claims_enabled():
+        add_role_claims(access, user)
+    return {'refresh': str(refresh), 'access': str(access)}
 
 
 class RegisterView(APIView):
@@ -63,7 +67,7 @@ class LoginView(APIView):
 
 class UserListView(generics.ListAPIView):
     """List users (admin)."""
-    queryset = User.objects.all().order_by('-date_joined')
+    queryset = User.objects.prefetch_related('roles').order_by('-date_joined')
     serializer_class = UserListSerializer
     permission_classes = [IsAuthenticated, IsSystemAdmin]
     filterset_fields = ['is_active', 'username', 'email']
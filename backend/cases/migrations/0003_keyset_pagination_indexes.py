@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0002_add_waiting_sergeant_approval'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['-created_at', '-id'], name='cases_case_created_c31cb3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['-created_at', '-id'], name='cases_compl_created_22a8ff_idx'),
+        ),
+    ]
@@ -68,6 +68,7 @@ class Case(models.Model):
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['severity']),
+            models.Index(fields=['-created_at', '-id']),
         ]
 
     def __str__(self):
@@ -130,6 +131,9 @@ class Complaint(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
 
     def __str__(self):
         return f"Complaint: {self.title} ({self.get_status_display()})"
@@ -136,4 +136,54 @@ class CasesTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         complaint.refresh_from_db()
         self.assertEqual(complaint.status, 'rejected')
-        self.assertEqual(complaint.correction_count, 3)
\ No newline at end of file
+        self.assertEqual(complaint.correction_count, 3)
+
+    # تست ۶: تعداد ثابت کوئری در فهرست پرونده‌ها برای صفحه‌های ۲۰ و ۲۰۰ تایی
+    def test_case_list_query_count_is_constant(self):
+        """فهرست پرونده‌ها مستقل از اندازه صفحه تعداد کوئری ثابتی دارد و پرونده تکراری برنمی‌گرداند"""
+        cases = []
+        for i in range(200):
+            # نیمی را افسر ساخته و نیمی به او ارجاع شده است
+            if i % 2:
+                cases.append(Case(title=f'پرونده {i}', created_by=self.officer, assigned_detective=self.intern))
+            else:
+                cases.append(Case(title=f'پرونده {i}', created_by=self.complainant, assigned_detective=self.officer))
+        cases.append(Case(title='پرونده دیگران', created_by=self.complainant))
+        Case.objects.bulk_create(cases)
+
+        for page_size in (20, 200):
+            # هر درخواست کاربر تازه‌ای دارد: نقش‌ها + COUNT صفحه‌بندی + یک SELECT با JOIN نام کاربران
+            self.client.force_authenticate(user=User.objects.get(pk=self.officer.pk))
+            with self.assertNumQueries(3):
+                response = self.client.get(f'/api/cases/?page_size={page_size}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['count'], 200)
+            self.assertEqual(len(response.data['results']), page_size)
+
+        usernames = {(row['created_by_username'], row['assigned_detective_username']) for row in response.data['results']}
+        self.assertEqual(usernames, {('officer', 'intern'), ('complainant', 'officer')})
+        self.assertEqual(len({row['id'] for row in response.data['results']}), 200)
+
+    # تست ۷: صفحه‌بندی cursor روی (created_at, id) بدون COUNT و OFFSET
+    def test_case_list_cursor_pagination(self):
+        """با pagination=cursor همه پرونده‌ها (حتی با زمان ایجاد یکسان) بدون تکرار و با هزینه ثابت پیمایش می‌شوند"""
+        Case.objects.bulk_create(Case(title=f'پرونده {i}', created_by=self.officer) for i in range(25))
+        # زمان یکسان برای نیمی از پرونده‌ها تا ترتیب با id شکسته شود
+        same_time = Case.objects.order_by('id')[10].created_at
+        Case.objects.filter(id__in=list(Case.objects.order_by('id').values_list('id', flat=True)[:12])).update(created_at=same_time)
+
+        url = '/api/cases/?pagination=cursor&page_size=10'
+        seen = []
+        while url:
+            self.client.force_authenticate(user=User.objects.get(pk=self.officer.pk))
+            # نقش‌ها + یک SELECT محدود؛ بدون COUNT
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        expected = list(Case.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.client.get('/api/cases/?cursor=not-a-cursor').status_code, status.HTTP_404_NOT_FOUND)
@@ -9,6 +9,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -38,19 +39,29 @@ from accounts.permissions import (
     IsDetective,
     has_any_role,
 )
-from core.utils import log_audit, notify
+from core.utils import log_audit, notify, notify_role
+
+
+CASE_LIST_COLUMNS = [
+    'id', 'title', 'description', 'severity', 'status', 'is_crime_scene_case', 'created_by',
+    'created_by__username', 'assigned_detective', 'assigned_detective__username',
+    'approved_by_captain', 'created_at', 'updated_at',
+]
 
 
 class CaseListCreateView(generics.ListCreateAPIView):
     """List cases; create case (officer/admin after complaint approved or crime scene)."""
     permission_classes = [IsAuthenticated, IsOfficerOrAbove]
+    cursor_field = 'created_at'  # ?pagination=cursor (core.pagination)
     serializer_class = CaseListSerializer
 
     def get_queryset(self):
-        qs = Case.objects.all()
+        # Usernames come from the join and only the serialized columns are loaded, so a page
+        # costs the same number of queries whatever its size.
+        qs = Case.objects.select_related('created_by', 'assigned_detective').only(*CASE_LIST_COLUMNS)
         if not has_any_role(self.request.user, ['System Administrator', 'Police Chief', 'Captain', 'Sergeant']):
-            qs = qs.filter(assigned_detective=self.request.user) | qs.filter(created_by=self.request.user)
-        return qs.distinct().order_by('-created_at')
+            qs = qs.filter(Q(assigned_detective=self.request.user) | Q(created_by=self.request.user))
+        return qs.order_by('-created_at')
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -101,10 +112,7 @@ class CaseSubmitSuspectsToSergeantView(APIView):
         case.status = Case.STATUS_WAITING_SERGEANT_APPROVAL
         case.save(update_fields=['status', 'updated_at'])
         log_audit(request.user, 'status_change', 'Case', case.pk, 'Suspects list submitted to sergeant')
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        for u in User.objects.filter(roles__name='Sergeant'):
-            notify(u, 'Suspects list for review', f'Case #{case.pk}: {case.title}', 'suspects_submitted', 'Case', case.pk)
+        notify_role.delay('Sergeant', 'Suspects list for review', f'Case #{case.pk}: {case.title}', 'suspects_submitted', 'Case', case.pk)
         return Response({
             'success': True,
             'data': CaseDetailSerializer(case).data,
@@ -150,9 +158,7 @@ class CrimeSceneCaseCreateView(APIView):
             report.approved_at = timezone.now()
             report.save()
         else:
-            from django.contrib.auth import get_user_model
-            for u in get_user_model().objects.filter(roles__name='Sergeant'):
-                notify(u, 'Crime scene report pending approval', str(case), 'crime_scene_pending', 'CrimeSceneReport', report.pk)
+            notify_role.delay('Sergeant', 'Crime scene report pending approval', str(case), 'crime_scene_pending', 'CrimeSceneReport', report.pk)
         log_audit(request.user, 'create', 'Case', case.pk, f'Crime scene case created: {case.title}')
         return Response(
             {'success': True, 'data': CaseListSerializer(case).data},
@@ -163,6 +169,7 @@ class CrimeSceneCaseCreateView(APIView):
 class ComplaintListCreateView(generics.ListCreateAPIView):
     """List complaints (filtered by role); complainant creates complaint."""
     permission_classes = [IsAuthenticated]
+    cursor_field = 'created_at'  # ?pagination=cursor (core.pagination)
     serializer_class = ComplaintListSerializer
 
     def get_queryset(self):
@@ -182,9 +189,7 @@ class ComplaintListCreateView(generics.ListCreateAPIView):
         c = serializer.save()
         log_audit(self.request.user, 'create', 'Complaint', c.pk, f'Complaint submitted: {c.title}')
         # Notify trainees for review
-        from django.contrib.auth import get_user_model
-        for u in get_user_model().objects.filter(roles__name='Intern'):
-            notify(u, 'New complaint to review', c.title, 'complaint_pending_trainee', 'Complaint', c.pk)
+        notify_role.delay('Intern', 'New complaint to review', c.title, 'complaint_pending_trainee', 'Complaint', c.pk)
 
 
 class ComplaintDetailView(generics.RetrieveAPIView):
@@ -242,16 +247,14 @@ class ComplaintTraineeReviewView(APIView):
             complaint.last_correction_message = ser.validated_data.get('correction_message', '')
             complaint.reviewed_by_trainee = request.user
             complaint.save()
-            notify(complaint.complainant, 'Complaint needs correction', complaint.last_correction_message, 'complaint_correction', 'Complaint', complaint.pk)
+            notify.delay(complaint.complainant_id, 'Complaint needs correction', complaint.last_correction_message, 'complaint_correction', 'Complaint', complaint.pk)
             log_audit(request.user, 'update', 'Complaint', complaint.pk, 'Returned for correction')
         else:
             complaint.status = Complaint.STATUS_PENDING_OFFICER
             complaint.reviewed_by_trainee = request.user
             complaint.save()
             # Notify officers
-            from django.contrib.auth import get_user_model
-            for u in get_user_model().objects.filter(roles__name='Police Officer'):
-                notify(u, 'Complaint pending approval', complaint.title, 'complaint_pending_officer', 'Complaint', complaint.pk)
+            notify_role.delay('Police Officer', 'Complaint pending approval', complaint.title, 'complaint_pending_officer', 'Complaint', complaint.pk)
             log_audit(request.user, 'approve', 'Complaint', complaint.pk, 'Forwarded to officer')
         return Response({'success': True, 'data': ComplaintDetailSerializer(complaint).data})
 
@@ -290,7 +293,7 @@ class ComplaintOfficerReviewView(APIView):
             complaint.save()
             CaseComplainant.objects.create(case=case, user=complaint.complainant, is_primary=True)
             log_audit(request.user, 'approve', 'Complaint', complaint.pk, f'Approved; Case #{case.pk} created')
-            notify(complaint.complainant, 'Complaint approved', f'Case #{case.pk} created.', 'complaint_approved', 'Case', case.pk)
+            notify.delay(complaint.complainant_id, 'Complaint approved', f'Case #{case.pk} created.', 'complaint_approved', 'Case', case.pk)
         return Response({'success': True, 'data': ComplaintDetailSerializer(complaint).data})
 
 
@@ -320,9 +323,7 @@ class CrimeSceneReportListCreateView(generics.ListCreateAPIView):
             report.approved_at = timezone.now()
             report.save()
         else:
-            from django.contrib.auth import get_user_model
-            for u in get_user_model().objects.filter(roles__name='Sergeant'):
-                notify(u, 'Crime scene report pending approval', str(case), 'crime_scene_pending', 'CrimeSceneReport', report.pk)
+            notify_role.delay('Sergeant', 'Crime scene report pending approval', str(case), 'crime_scene_pending', 'CrimeSceneReport', report.pk)
 
 
 class CrimeSceneReportApproveView(APIView):
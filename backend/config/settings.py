@@ -95,6 +95,68 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Password hashing for login/registration runs on a bounded pool (see accounts.hashing).
+# EXECUTOR: 'thread' (PBKDF2 releases the GIL), 'process', or 'inline'. Requests beyond
+# MAX_PENDING in-flight hashes per process get 429.
+PASSWORD_HASHING_POOL = {
+    'EXECUTOR': os.environ.get('PASSWORD_HASHING_EXECUTOR', 'thread'),
+    'MAX_WORKERS': int(os.environ.get('PASSWORD_HASHING_WORKERS', '2')),
+    'MAX_PENDING': int(os.environ.get('PASSWORD_HASHING_MAX_PENDING', '16')),
+    'TIMEOUT': float(os.environ.get('PASSWORD_HASHING_TIMEOUT', '10')),
+}
+
+# Audit log: 'buffered' writes entries in bulk from a background thread (per process);
+# 'sync' saves each entry inline.
+AUDIT_LOG = {
+    'MODE': os.environ.get('AUDIT_LOG_MODE', 'buffered'),
+    'BATCH_SIZE': int(os.environ.get('AUDIT_LOG_BATCH_SIZE', '100')),
+    'FLUSH_INTERVAL': float(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL', '2')),
+    'MAX_PENDING': int(os.environ.get('AUDIT_LOG_MAX_PENDING', '10000')),
+}
+
+# Deferred side effects (notifications, thumbnails) go through the outbox table and are executed by
+# `manage.py run_worker` (see core.outbox). MODE 'inline' runs them during the request instead; it is
+# the default with DEBUG, where runserver starts no worker (Docker Compose sets 'outbox' and runs one).
+OUTBOX = {
+    'MODE': os.environ.get('OUTBOX_MODE', 'inline' if DEBUG else 'outbox'),
+    'MAX_ATTEMPTS': int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '5')),
+    'RETRY_DELAY': float(os.environ.get('OUTBOX_RETRY_DELAY', '5')),
+}
+
+# `manage.py test` runs audit writes and outbox jobs synchronously (see core.test_runner)
+TEST_RUNNER = 'core.test_runner.SyncSideEffectsTestRunner'
+
+# Seconds GET /api/statistics/ is cached (per process) and advertised in Cache-Control
+STATISTICS_CACHE_TTL = int(os.environ.get('STATISTICS_CACHE_TTL', '30'))
+
+# Seconds a rendered page of GET /api/most-wanted/ is cached (per process) and advertised in Cache-Control
+MOST_WANTED_CACHE_TTL = int(os.environ.get('MOST_WANTED_CACHE_TTL', '60'))
+
+# GET /api/notifications/stream/ (Server-Sent Events, needs ASGI; see core.events)
+NOTIFICATION_STREAM = {
+    'POLL_INTERVAL': float(os.environ.get('NOTIFICATION_STREAM_POLL_INTERVAL', '2')),
+    'HEARTBEAT': float(os.environ.get('NOTIFICATION_STREAM_HEARTBEAT', '15')),
+    'MAX_DURATION': float(os.environ.get('NOTIFICATION_STREAM_MAX_DURATION', '300')),
+    'TICKET_LIFETIME': int(os.environ.get('NOTIFICATION_STREAM_TICKET_LIFETIME', '60')),
+}
+
+# Set PASSWORD_HASHING_LOG_LEVEL=INFO to log per-call wait/hash timings for pool sizing
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'accounts.hashing': {
+            'handlers': ['console'],
+            'level': os.environ.get('PASSWORD_HASHING_LOG_LEVEL', 'WARNING'),
+        },
+        'core.outbox': {
+            'handlers': ['console'],
+            'level': os.environ.get('OUTBOX_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
@@ -110,6 +172,20 @@ MEDIA_ROOT = BASE_DIR / 'media'
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50 MB for multipart request
 
+# Chunked evidence uploads (evidence.uploads): largest file, largest chunk per PUT (bytes)
+EVIDENCE_UPLOAD = {
+    'MAX_SIZE': int(os.environ.get('EVIDENCE_UPLOAD_MAX_SIZE', str(2 * 1024 * 1024 * 1024))),
+    'CHUNK_SIZE': int(os.environ.get('EVIDENCE_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024))),
+}
+
+# GET /api/evidence/media/... (evidence.media): 'python' streams files from Django; behind nginx use
+# 'x-accel-redirect' (internal location ACCEL_PREFIX aliased to MEDIA_ROOT), behind Apache 'x-sendfile'
+EVIDENCE_MEDIA = {
+    'MODE': os.environ.get('EVIDENCE_MEDIA_MODE', 'python'),
+    'ACCEL_PREFIX': os.environ.get('EVIDENCE_MEDIA_ACCEL_PREFIX', '/protected-media/'),
+    'MAX_AGE': int(os.environ.get('EVIDENCE_MEDIA_MAX_AGE', '3600')),
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom user model
@@ -118,14 +194,14 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.RoleClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.StandardPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
@@ -136,7 +212,11 @@ from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.tokens.RoleClaimsTokenRefreshSerializer',
 }
+# Embed role names + role_version in access tokens so permission checks skip the roles query.
+# Tokens issued before a role change fall back to a database role check.
+JWT_ROLE_CLAIMS = os.environ.get('JWT_ROLE_CLAIMS', 'False').lower() in ('true', '1', 'yes')
 
 # CORS (adjust for production)
 CORS_ALLOW_ALL_ORIGINS = DEBUG
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AuditLog, Notification
+from .models import AuditLog, Notification, OutboxJob
 
 
 @admin.register(AuditLog)
@@ -11,3 +11,9 @@ class AuditLogAdmin(admin.ModelAdmin):
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ['id', 'recipient', 'title', 'read', 'created_at']
+
+
+@admin.register(OutboxJob)
+class OutboxJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'run_after', 'locked_by', 'created_at']
+    list_filter = ['status', 'name']
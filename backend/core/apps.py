@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from .audit import request_finished_handler
+        request_finished.connect(request_finished_handler, dispatch_uid='core.audit.request_finished')
+        from .stats import connect_signals
+        connect_signals()
+        from .search import connect_signals as connect_search_signals
+        connect_search_signals()
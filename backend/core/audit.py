@@ -0,0 +1,161 @@
+"""
+Buffered audit log writer.
+log_audit() appends entries to a per-process buffer; a background thread writes them with
+bulk_create when BATCH_SIZE entries are pending, every FLUSH_INTERVAL seconds, and when a
+request finishes. Durable entries (and MODE='sync', used by the test runner) bypass the
+buffer and are saved in the caller's transaction. Entries are never dropped silently: one the
+database rejects is logged in full.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError, transaction
+
+from core.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUDIT_CONFIG = {
+    'MODE': 'buffered',      # 'buffered' | 'sync'
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,   # seconds
+    'MAX_PENDING': 10000,    # entries kept while the database is unreachable
+}
+
+
+def audit_config():
+    return {**DEFAULT_AUDIT_CONFIG, **getattr(settings, 'AUDIT_LOG', {})}
+
+
+def describe(entry):
+    """Every field of an unsaved entry, for the log when it cannot be written."""
+    return {
+        'user_id': entry.user_id, 'action': entry.action, 'model_name': entry.model_name,
+        'object_id': entry.object_id, 'description': entry.description, 'extra_data': entry.extra_data,
+        'timestamp': entry.timestamp,
+    }
+
+
+class AuditBuffer:
+    """Thread-safe in-memory queue of unsaved AuditLog rows."""
+
+    def __init__(self, batch_size=100, flush_interval=2.0, background=True, max_pending=10000):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.background = background
+        self._entries = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            pending = len(self._entries)
+        if self.background:
+            self._ensure_thread()
+            if pending >= self.batch_size:
+                self._wake.set()
+
+    def wake(self):
+        """Ask the writer thread to flush soon (called at request end)."""
+        if self._entries:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Write all pending entries now. Returns the number written. If the batch fails, entries
+        are written one by one: an entry the database rejects is logged in full and dropped, and
+        on a connection error the unwritten entries are queued again.
+        """
+        with self._lock:
+            entries, self._entries = self._entries, []
+        if not entries:
+            return 0
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(entries, batch_size=self.batch_size)
+            return len(entries)
+        except DatabaseError:
+            logger.warning('Audit flush of %d entries failed; retrying them one by one', len(entries), exc_info=True)
+        written = 0
+        for index, entry in enumerate(entries):
+            entry.pk = None  # may be set by a batch that was rolled back
+            entry._state.adding = True
+            try:
+                with transaction.atomic():
+                    AuditLog.objects.bulk_create([entry])
+                written += 1
+            except (OperationalError, InterfaceError):
+                logger.exception('Audit database unavailable; re-queueing %d entries', len(entries) - index)
+                self._requeue(entries[index:])
+                break
+            except DatabaseError:
+                logger.exception('Dropping audit entry the database rejects: %s', describe(entry))
+        return written
+
+    def _requeue(self, entries):
+        with self._lock:
+            self._entries = entries + self._entries
+            # A dead database must not grow memory without bound: the oldest entries go to the log instead
+            overflow = len(self._entries) - self.max_pending
+            if overflow > 0:
+                dropped, self._entries = self._entries[:overflow], self._entries[overflow:]
+            else:
+                dropped = []
+        for entry in dropped:
+            logger.error('Audit buffer full; dropping entry: %s', describe(entry))
+
+    def _ensure_thread(self):
+        # A forked worker inherits the buffer object but not the thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        from django.db import connection
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            connection.close_if_unusable_or_obsolete()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            config = audit_config()
+            _buffer = AuditBuffer(config['BATCH_SIZE'], config['FLUSH_INTERVAL'], max_pending=config['MAX_PENDING'])
+            atexit.register(_buffer.flush)
+        return _buffer
+
+
+def write_audit(entry, durable=False):
+    """Save entry now (durable or sync mode) or hand it to the buffer."""
+    if durable or audit_config()['MODE'] == 'sync':
+        entry.save()
+    else:
+        get_buffer().add(entry)
+    return entry
+
+
+def request_finished_handler(sender, **kwargs):
+    if _buffer is not None:
+        _buffer.wake()
@@ -0,0 +1,264 @@
+"""
+Server-Sent Events stream of a user's new notifications (GET /api/notifications/stream/).
+Each open stream subscribes to an in-process broker. notify()/notify_many() publish recipient
+ids after commit; notifications created in other processes (outbox worker, other web workers)
+are picked up by one shared poller per process that checks for rows newer than the last seen id,
+plus the ids it skipped until they commit or GAP_TIMEOUT passes (a lower id can commit after a
+higher one). A woken stream fetches only that user's rows after its cursor, re-reading OVERLAP ids
+below it for late commits, so idle connections cost no queries. Each event id is the stream
+position (see StreamPosition); clients resume with the standard Last-Event-ID header (or
+?last_event_id=). EventSource cannot send headers: it authenticates with a short-lived ?ticket=
+from POST /api/notifications/stream/ticket/ instead of the access token, so no reusable credential
+lands in access logs. Streaming needs ASGI (config.asgi); under WSGI the endpoint answers with the
+pending events and a retry hint, which EventSource turns into a slow poll.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import Token
+
+from accounts.authentication import RoleClaimsJWTAuthentication
+from core.models import Notification
+
+DEFAULT_STREAM_CONFIG = {
+    'POLL_INTERVAL': 2.0,    # seconds between checks for notifications from other processes
+    'HEARTBEAT': 15.0,       # seconds of silence before a keep-alive comment
+    'MAX_DURATION': 300.0,   # seconds before the server closes a stream (client reconnects)
+    'RETRY_MS': 3000,        # reconnect delay sent to EventSource
+    'BATCH_SIZE': 50,
+    'OVERLAP': 1000,         # ids below a stream's cursor re-read for notifications committed late
+    'GAP_TIMEOUT': 30.0,     # seconds the poller waits for a skipped id to commit
+    'TICKET_LIFETIME': 60,   # seconds a stream ticket can be used to open a stream
+}
+
+EVENT_FIELDS = ['id', 'title', 'message', 'notification_type', 'related_model', 'related_id', 'read', 'created_at']
+
+
+def stream_config():
+    return {**DEFAULT_STREAM_CONFIG, **getattr(settings, 'NOTIFICATION_STREAM', {})}
+
+
+class StreamTicket(Token):
+    """Short-lived token that only opens the notification stream; access tokens stay out of URLs."""
+    token_type = 'stream'
+    lifetime = timedelta(seconds=DEFAULT_STREAM_CONFIG['TICKET_LIFETIME'])
+
+
+def issue_stream_ticket(user):
+    ticket = StreamTicket.for_user(user)
+    ticket.set_exp(lifetime=timedelta(seconds=stream_config()['TICKET_LIFETIME']))
+    return ticket
+
+
+class NotificationBroker:
+    """Maps recipient ids to the asyncio events of their open streams. publish() is thread-safe."""
+    max_gaps = 1000  # skipped ids tracked per poll, newest first
+
+    def __init__(self, poll_interval=2.0, gap_timeout=30.0):
+        self.poll_interval = poll_interval
+        self.gap_timeout = gap_timeout
+        self._subscribers = defaultdict(set)  # user id -> {(loop, asyncio.Event)}
+        self._lock = threading.Lock()
+        self._poller = None
+        self._last_pk = None
+        self._gaps = {}  # skipped id -> monotonic deadline
+
+    def subscribe(self, user_id):
+        """Register a stream; must be called from the event loop that will wait on the event."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        with self._lock:
+            self._subscribers[user_id].add((loop, event))
+            if self._poller is None or self._poller.done():
+                self._poller = loop.create_task(self._poll())
+        return event
+
+    def unsubscribe(self, user_id, event):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({s for s in subscribers if s[1] is event})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+            if not self._subscribers and self._poller is not None:
+                self._poller.cancel()
+                self._poller = None
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, recipient_ids):
+        with self._lock:
+            targets = [s for user_id in set(recipient_ids) for s in self._subscribers.get(user_id, ())]
+        for loop, event in targets:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
+    async def _poll(self):
+        """Pick up rows written by other processes: one small query per interval for the whole process."""
+        try:
+            if self._last_pk is None:
+                self._last_pk = (await Notification.objects.aaggregate(last=Max('pk')))['last'] or 0
+            while self.has_subscribers():
+                await asyncio.sleep(self.poll_interval)
+                rows = [
+                    row async for row in Notification.objects.filter(Q(pk__gt=self._last_pk) | Q(pk__in=list(self._gaps)))
+                    .order_by('pk').values_list('pk', 'recipient_id')
+                ]
+                self._track_gaps([pk for pk, _ in rows])
+                if rows:
+                    self.publish(recipient_id for _, recipient_id in rows)
+        finally:
+            # Restarted by the next subscriber; start again from the newest row then
+            self._last_pk = None
+            self._gaps = {}
+
+    def _track_gaps(self, pks):
+        """Advance past `pks`; ids skipped on the way may still commit and are polled until GAP_TIMEOUT."""
+        now = time.monotonic()
+        seen = set(pks)
+        self._gaps = {pk: deadline for pk, deadline in self._gaps.items() if pk not in seen and deadline > now}
+        newest = max(pks, default=self._last_pk)
+        if newest > self._last_pk:
+            deadline = now + self.gap_timeout
+            first = max(self._last_pk + 1, newest - self.max_gaps)
+            self._gaps.update((pk, deadline) for pk in range(first, newest) if pk not in seen)
+            self._last_pk = newest
+
+
+broker = NotificationBroker(stream_config()['POLL_INTERVAL'], stream_config()['GAP_TIMEOUT'])
+
+
+def publish_on_commit(recipient_ids):
+    """Wake open streams of these recipients once the current transaction commits."""
+    recipient_ids = list(recipient_ids)
+    if recipient_ids and broker.has_subscribers():
+        transaction.on_commit(lambda: broker.publish(recipient_ids))
+
+
+class StreamPosition:
+    """
+    Where a stream stands: every notification id up to `floor` is handled, and so are the ids in
+    `sent` above it. The window between floor and the newest sent id (OVERLAP ids) is re-read, so a
+    notification committed after a higher id is still delivered. Serialised as the SSE event id
+    "floor,sent1,sent2,..."; a plain id (older clients) is a floor with nothing sent above it.
+    """
+
+    def __init__(self, floor, sent=()):
+        self.floor = floor
+        self.sent = set(sent)
+
+    @classmethod
+    def parse(cls, raw):
+        try:
+            floor, *sent = (int(part) for part in raw.split(','))
+        except ValueError:
+            return None
+        return cls(floor, (pk for pk in sent if pk > floor))
+
+    def advance(self, pk, overlap):
+        self.sent.add(pk)
+        floor = max(self.sent) - overlap
+        if floor > self.floor:
+            self.floor = floor
+            self.sent = {sent for sent in self.sent if sent > floor}
+
+    def __str__(self):
+        return ','.join(str(pk) for pk in [self.floor, *sorted(self.sent)])
+
+
+def format_event(notification, position):
+    data = dict(notification, created_at=notification['created_at'].isoformat())
+    return f'id: {position}\nevent: notification\ndata: {json.dumps(data)}\n\n'
+
+
+def _fetch_after(user_id, position, limit):
+    return list(
+        Notification.objects.filter(recipient_id=user_id, pk__gt=position.floor).exclude(pk__in=position.sent)
+        .order_by('pk').values(*EVENT_FIELDS)[:limit]
+    )
+
+
+def _events(rows, position, overlap):
+    for row in rows:
+        position.advance(row['id'], overlap)
+        yield format_event(row, position)
+
+
+def _latest_pk(user_id):
+    return Notification.objects.filter(recipient_id=user_id).aggregate(last=Max('pk'))['last'] or 0
+
+
+def _authenticate(request):
+    """Bearer header, or a stream ticket in ?ticket= because EventSource cannot set headers. Returns a user or None."""
+    auth = RoleClaimsJWTAuthentication()
+    try:
+        result = auth.authenticate(request)
+        if result is None and request.GET.get('ticket'):
+            ticket = StreamTicket(request.GET['ticket'])
+            result = (auth.get_user(ticket), ticket)
+    except (AuthenticationFailed, TokenError):
+        return None
+    return result[0] if result else None
+
+
+def _parse_position(request):
+    raw = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    return StreamPosition.parse(raw) if raw is not None else None
+
+
+async def _event_stream(user_id, position, config):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + config['MAX_DURATION']
+    event = broker.subscribe(user_id)
+    try:
+        yield f'retry: {config["RETRY_MS"]}\n\n'
+        while loop.time() < deadline:
+            event.clear()
+            rows = await sync_to_async(_fetch_after)(user_id, position, config['BATCH_SIZE'])
+            for chunk in _events(rows, position, config['OVERLAP']):
+                yield chunk
+            if len(rows) == config['BATCH_SIZE']:
+                continue
+            try:
+                await asyncio.wait_for(event.wait(), min(config['HEARTBEAT'], max(deadline - loop.time(), 0)))
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(user_id, event)
+
+
+async def notification_stream(request):
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse(
+            {'success': False, 'error': {'message': 'Authentication credentials were not provided or are invalid.'}},
+            status=401,
+        )
+    config = stream_config()
+    position = _parse_position(request)
+    if position is None:
+        # New connection without a position: only notifications created from now on
+        position = StreamPosition(await sync_to_async(_latest_pk)(user.pk))
+    if isinstance(request, ASGIRequest):
+        content = _event_stream(user.pk, position, config)
+    else:
+        # No long-lived connections under WSGI: pending events plus a long retry (a slow poll)
+        rows = await sync_to_async(_fetch_after)(user.pk, position, config['BATCH_SIZE'])
+        retry_ms = max(config['RETRY_MS'], int(config['HEARTBEAT'] * 1000))
+        content = [f'retry: {retry_ms}\n\n', *_events(rows, position, config['OVERLAP'])]
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: do not buffer the stream
+    return response
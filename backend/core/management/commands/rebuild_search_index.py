@@ -0,0 +1,19 @@
+"""
+Rebuild the search index (core.search) from the source tables.
+Run after upgrading, after bulk imports or raw SQL changes that bypass model signals.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Re-index cases, complaints, evidence and tips for /api/search/'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        for kind, count in rebuild_index().items():
+            self.stdout.write(f'{kind:<12}{count:>10}')
+        self.stdout.write(f'Done in {time.perf_counter() - started:.1f}s')
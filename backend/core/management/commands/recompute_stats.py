@@ -0,0 +1,15 @@
+"""
+Rebuild the dashboard counters (core.stats) from COUNT queries.
+Run after bulk imports or raw SQL changes that bypass model signals, or periodically from cron.
+"""
+from django.core.management.base import BaseCommand
+
+from core.stats import recompute_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute dashboard statistics counters'
+
+    def handle(self, *args, **options):
+        for name, value in recompute_counters().items():
+            self.stdout.write(f'{name:<26}{value:>10}')
@@ -0,0 +1,31 @@
+"""
+Run outbox jobs (notifications and other deferred side effects) until interrupted.
+Start one or more of these next to the web server; with Postgres any number of workers can
+share the outbox safely.
+"""
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import Worker
+
+
+class Command(BaseCommand):
+    help = 'Process queued outbox jobs on a thread pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Jobs run concurrently per batch')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Process one batch and exit')
+
+    def handle(self, *args, **options):
+        worker = Worker(threads=options['threads'], poll_interval=options['poll_interval'])
+        if options['once']:
+            claimed = worker.run_once()
+            self.stdout.write(f'Processed {claimed} job(s)')
+            return
+        # Finish the current batch before exiting
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: worker.stop())
+        self.stdout.write(f'Outbox worker {worker.worker_id} running with {worker.threads} threads (Ctrl+C to stop)')
+        worker.run_forever()
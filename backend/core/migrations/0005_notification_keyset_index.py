@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_statcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at', '-id'], name='core_notifi_recipie_7e2e6b_idx'),
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:25
+
+from django.db import migrations, models
+
+POSTGRES_FORWARD = [
+    # 'simple' configuration: case texts mix Persian and English and PostgreSQL has no Persian stemmer
+    """
+    ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX core_searchdocument_vector_gin ON core_searchdocument USING GIN (search_vector)',
+]
+
+SQLITE_FORWARD = [
+    # External-content FTS5 table mirrored from core_searchdocument by triggers
+    """
+    CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        title, body, content='core_searchdocument', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS core_searchdocument_fts_ai',
+    'DROP TRIGGER IF EXISTS core_searchdocument_fts_ad',
+    'DROP TRIGGER IF EXISTS core_searchdocument_fts_au',
+    'DROP TABLE IF EXISTS core_searchdocument_fts',
+]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def create_fulltext_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        statements = SQLITE_FORWARD
+    else:
+        return  # core.search falls back to substring matching
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_BACKWARD:
+            schema_editor.execute(sql)
+    # PostgreSQL: the column and its index go with the table
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_notification_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('case', 'Case'), ('complaint', 'Complaint'), ('evidence', 'Evidence'), ('tip', 'Tip')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('case_id', models.BigIntegerField(blank=True, null=True)),
+                ('owner_id', models.BigIntegerField(blank=True, null=True)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['case_id'], name='core_search_case_id_08b646_idx'), models.Index(fields=['owner_id'], name='core_search_owner_i_af3180_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -1,8 +1,9 @@
 """
-Core models: audit trail and notifications.
+Core models: audit trail, notifications, the job outbox, dashboard counters and the search index.
 """
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class AuditLog(models.Model):
@@ -17,7 +18,8 @@ class AuditLog(models.Model):
         ('assign', 'Assign'),
     ]
 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when log_audit() is called, not when a buffered entry is flushed
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -57,4 +59,88 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', 'read']),
+            models.Index(fields=['recipient', '-created_at', '-id']),
         ]
+
+
+class OutboxJob(models.Model):
+    """
+    Deferred side effect (e.g. a notification) written in the same transaction as the change
+    that caused it and executed later by `manage.py run_worker`. Finished jobs are deleted;
+    jobs that exhaust their attempts stay as FAILED for inspection.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=255)  # dotted path of a @job function
+    payload = models.JSONField(default=dict, blank=True)  # {'args': [...], 'kwargs': {...}}
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+
+class StatCounter(models.Model):
+    """Precomputed dashboard aggregate (see core.stats); kept current by model signals."""
+    name = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name}={self.value}'
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one case, complaint, evidence item or tip, kept current by model signals
+    (core.search). The full-text index lives outside the ORM: a generated tsvector column with a
+    GIN index on PostgreSQL, an FTS5 table on SQLite (see migration 0006).
+    """
+    KIND_CASE = 'case'
+    KIND_COMPLAINT = 'complaint'
+    KIND_EVIDENCE = 'evidence'
+    KIND_TIP = 'tip'
+    KIND_CHOICES = [
+        (KIND_CASE, 'Case'),
+        (KIND_COMPLAINT, 'Complaint'),
+        (KIND_EVIDENCE, 'Evidence'),
+        (KIND_TIP, 'Tip'),
+    ]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    # Copied from the source row for role scoping without joins
+    case_id = models.BigIntegerField(null=True, blank=True)
+    owner_id = models.BigIntegerField(null=True, blank=True)  # complainant / tip submitter
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = [['kind', 'object_id']]
+        indexes = [
+            models.Index(fields=['case_id']),
+            models.Index(fields=['owner_id']),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.object_id}'
@@ -0,0 +1,174 @@
+"""
+Transactional outbox for side effects that do not need to finish inside the request.
+Functions decorated with @job gain .delay(*args, **kwargs), which inserts an OutboxJob row once
+the caller's transaction commits (transaction.on_commit; right away in autocommit): a worker never
+sees a job before the change that caused it, and a rolled-back change queues nothing.
+`manage.py run_worker` claims pending rows (SELECT ... FOR UPDATE SKIP LOCKED where supported,
+a conditional UPDATE elsewhere), runs them on a thread pool and retries failures with
+exponential backoff. With OUTBOX['MODE'] = 'inline' (used by the test runner) .delay() simply
+calls the function.
+"""
+import functools
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import OutboxJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_CONFIG = {
+    'MODE': 'outbox',          # 'outbox' | 'inline'
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 5.0,        # seconds before the first retry; doubles per attempt
+    'MAX_RETRY_DELAY': 600.0,
+    'LOCK_TIMEOUT': 300.0,     # a RUNNING job older than this is assumed orphaned and re-claimed
+}
+
+_registry = {}
+
+
+def outbox_config():
+    return {**DEFAULT_OUTBOX_CONFIG, **getattr(settings, 'OUTBOX', {})}
+
+
+def job(func):
+    """Register func as an outbox job and attach func.delay(). Arguments must be JSON-serialisable."""
+    name = f'{func.__module__}.{func.__qualname__}'
+    _registry[name] = func
+    func.job_name = name
+    func.delay = functools.partial(enqueue, func)
+    return func
+
+
+def enqueue(func, *args, **kwargs):
+    """Queue func(*args, **kwargs) when the current transaction commits (or run it now in inline mode)."""
+    config = outbox_config()
+    if config['MODE'] == 'inline':
+        func(*args, **kwargs)
+        return
+    payload = {'args': list(args), 'kwargs': kwargs}
+    transaction.on_commit(lambda: OutboxJob.objects.create(
+        name=func.job_name, payload=payload, max_attempts=config['MAX_ATTEMPTS'],
+    ))
+
+
+def get_job(name):
+    """Resolve a job name, importing its module so the @job decorator has run."""
+    if name not in _registry:
+        module_name = name.rsplit('.', 1)[0]
+        try:
+            import_module(module_name)
+        except ImportError:
+            pass
+    return _registry.get(name)
+
+
+def retry_delay(attempts, config=None):
+    config = config or outbox_config()
+    return min(config['RETRY_DELAY'] * 2 ** max(attempts - 1, 0), config['MAX_RETRY_DELAY'])
+
+
+def claim_jobs(worker_id, limit, config=None):
+    """Mark up to `limit` due jobs as RUNNING for this worker and return them."""
+    config = config or outbox_config()
+    now = timezone.now()
+    due = Q(status=OutboxJob.STATUS_PENDING, run_after__lte=now) | Q(
+        status=OutboxJob.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=config['LOCK_TIMEOUT']),
+    )
+    candidates = OutboxJob.objects.filter(due).order_by('run_after', 'pk')
+    claim = {'status': OutboxJob.STATUS_RUNNING, 'locked_by': worker_id, 'locked_at': now, 'attempts': F('attempts') + 1}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(candidates.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            OutboxJob.objects.filter(pk__in=ids).update(**claim)
+    else:
+        # No row locks (SQLite): claim each row with an UPDATE conditioned on the state we read;
+        # if another worker got there first it matches nothing.
+        ids = []
+        for row in candidates.values('pk', 'status', 'locked_at')[:limit]:
+            if OutboxJob.objects.filter(**row).update(**claim):
+                ids.append(row['pk'])
+    return list(OutboxJob.objects.filter(pk__in=ids, locked_by=worker_id).order_by('run_after', 'pk'))
+
+
+def run_job(job_row, config=None):
+    """Execute one claimed job. Returns True on success; failures are rescheduled or marked FAILED."""
+    config = config or outbox_config()
+    func = get_job(job_row.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown outbox job {job_row.name!r}')
+        with transaction.atomic():
+            func(*job_row.payload.get('args', []), **job_row.payload.get('kwargs', {}))
+    except Exception:
+        error = traceback.format_exc()
+        if func is None or job_row.attempts >= job_row.max_attempts:
+            logger.error('Outbox job %s #%s failed permanently:\n%s', job_row.name, job_row.pk, error)
+            update = {'status': OutboxJob.STATUS_FAILED}
+        else:
+            delay = retry_delay(job_row.attempts, config)
+            logger.warning('Outbox job %s #%s failed (attempt %d), retrying in %.0fs', job_row.name, job_row.pk, job_row.attempts, delay)
+            update = {'status': OutboxJob.STATUS_PENDING, 'run_after': timezone.now() + timedelta(seconds=delay)}
+        OutboxJob.objects.filter(pk=job_row.pk).update(locked_by='', locked_at=None, last_error=error, **update)
+        return False
+    OutboxJob.objects.filter(pk=job_row.pk).delete()
+    return True
+
+
+class Worker:
+    """Poll the outbox and run due jobs on a pool of `threads` threads."""
+
+    def __init__(self, threads=4, poll_interval=1.0, worker_id=None):
+        self.threads = max(1, threads)
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.config = outbox_config()
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, executor=None):
+        """Claim and run one batch of up to `threads` jobs. Returns the number of jobs claimed."""
+        jobs = claim_jobs(self.worker_id, self.threads, self.config)
+        if not jobs:
+            return 0
+        if executor is None:
+            for job_row in jobs:
+                run_job(job_row, self.config)
+        else:
+            list(executor.map(self._run_in_thread, jobs))
+        return len(jobs)
+
+    def run_forever(self):
+        logger.info('Outbox worker %s started with %d threads', self.worker_id, self.threads)
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='outbox') as executor:
+            while not self._stop.is_set():
+                try:
+                    claimed = self.run_once(executor)
+                except Exception:
+                    logger.exception('Outbox poll failed')
+                    claimed = 0
+                finally:
+                    close_old_connections()
+                if claimed < self.threads:
+                    self._stop.wait(self.poll_interval)
+        logger.info('Outbox worker %s stopped', self.worker_id)
+
+    def _run_in_thread(self, job_row):
+        try:
+            return run_job(job_row, self.config)
+        finally:
+            connection.close()
+
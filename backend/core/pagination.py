@@ -0,0 +1,90 @@
+"""
+Default pagination for list endpoints.
+Page numbers by default: PAGE_SIZE items, overridable per request with ?page_size= up to 200.
+Views that set `cursor_field` also offer keyset pagination, selected with ?pagination=cursor
+(and continued with the returned ?cursor=): rows are ordered newest first by (cursor_field, id)
+and each page is a single indexed range query, with no COUNT and no OFFSET, so deep pages
+cost the same as the first.
+"""
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+MAX_PAGE_SIZE = 200
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination on (field, id) descending."""
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, field, page_size):
+        self.field = field
+        self.page_size = page_size
+
+    def encode_cursor(self, row):
+        raw = f'{getattr(row, self.field).isoformat()}|{row.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, encoded):
+        try:
+            value, pk = base64.urlsafe_b64decode(encoded.encode()).decode().rsplit('|', 1)
+            position = parse_datetime(value), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        queryset = queryset.order_by(f'-{self.field}', '-pk')
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            value, pk = self.decode_cursor(encoded)
+            queryset = queryset.filter(Q(**{f'{self.field}__lt': value}) | Q(**{self.field: value, 'pk__lt': pk}))
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, 'pagination', 'cursor')
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': None, 'results': data})
+
+
+class StandardPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    keyset = None
+
+    def wants_cursor(self, request, view):
+        params = request.query_params
+        return bool(getattr(view, 'cursor_field', None)) and (
+            params.get('pagination') == 'cursor' or 'cursor' in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.wants_cursor(request, view):
+            self.keyset = KeysetPagination(view.cursor_field, self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,239 @@
+"""
+Full-text search over cases, complaints, evidence (with witness transcripts and ID document owner
+names) and tips.
+Each searchable row is copied into core.SearchDocument by post_save/post_delete signals in the
+same transaction. PostgreSQL matches a generated tsvector column through its GIN index and ranks
+with ts_rank_cd; SQLite joins the FTS5 table mirrored by triggers and ranks with bm25. Both match
+every term, the last one as a prefix. Without either, terms are matched with icontains. Results
+are scoped like the list endpoints: search() only returns rows the user could see there.
+`manage.py rebuild_search_index` rebuilds the whole index (after bulk imports or raw SQL).
+"""
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+from accounts.permissions import has_any_role
+from core.models import SearchDocument
+
+MAX_RESULTS = 100
+SNIPPET_LENGTH = 200
+FTS_TABLE = 'core_searchdocument_fts'
+REBUILD_BATCH_SIZE = 1000
+
+# Same role lists as the corresponding list endpoints
+ALL_CASES_ROLES = ['System Administrator', 'Police Chief', 'Captain', 'Sergeant']
+OFFICER_ROLES = ['Police Officer', 'Detective', 'Sergeant', 'Captain', 'Police Chief', 'System Administrator']
+COMPLAINT_STAFF_ROLES = ['Intern'] + OFFICER_ROLES
+
+
+def _text(*parts):
+    return '\n'.join(part for part in parts if part)
+
+
+def case_document(case):
+    return {
+        'case_id': case.pk, 'owner_id': None, 'created_at': case.created_at,
+        'title': case.title, 'body': case.description,
+    }
+
+
+def complaint_document(complaint):
+    return {
+        'case_id': complaint.case_id, 'owner_id': complaint.complainant_id, 'created_at': complaint.created_at,
+        'title': complaint.title, 'body': complaint.description,
+    }
+
+
+def evidence_document(evidence):
+    witness = getattr(evidence, 'witness_detail', None)
+    id_document = getattr(evidence, 'id_document_detail', None)
+    return {
+        'case_id': evidence.case_id, 'owner_id': None, 'created_at': evidence.created_at,
+        'title': evidence.title,
+        'body': _text(
+            evidence.description,
+            witness and witness.transcript,
+            witness and witness.statement,
+            id_document and id_document.owner_full_name,
+        ),
+    }
+
+
+def tip_document(tip):
+    return {
+        'case_id': tip.case_id, 'owner_id': tip.submitter_id, 'created_at': tip.created_at,
+        'title': tip.title, 'body': tip.description,
+    }
+
+
+@lru_cache(maxsize=None)
+def indexed_models():
+    """model -> (kind, document builder, queryset for rebuilds)."""
+    from cases.models import Case, Complaint
+    from evidence.models import Evidence
+    from tips_rewards.models import Tip
+    return {
+        Case: (SearchDocument.KIND_CASE, case_document, Case.objects.all()),
+        Complaint: (SearchDocument.KIND_COMPLAINT, complaint_document, Complaint.objects.all()),
+        Evidence: (
+            SearchDocument.KIND_EVIDENCE, evidence_document,
+            Evidence.objects.select_related('witness_detail', 'id_document_detail'),
+        ),
+        Tip: (SearchDocument.KIND_TIP, tip_document, Tip.objects.all()),
+    }
+
+
+def index_objects(model, objects):
+    """Insert or refresh the documents of these rows (one upsert per batch)."""
+    kind, build, _ = indexed_models()[model]
+    SearchDocument.objects.bulk_create(
+        [SearchDocument(kind=kind, object_id=obj.pk, **build(obj)) for obj in objects],
+        batch_size=REBUILD_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['case_id', 'owner_id', 'title', 'body', 'created_at'],
+    )
+
+
+def rebuild_index():
+    """Re-index every searchable row and drop documents whose row is gone. Returns {kind: count}."""
+    counts = {}
+    for model, (kind, _, queryset) in indexed_models().items():
+        batch = []
+        count = 0
+        for obj in queryset.order_by('pk').iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch.append(obj)
+            if len(batch) == REBUILD_BATCH_SIZE:
+                index_objects(model, batch)
+                count += len(batch)
+                batch = []
+        index_objects(model, batch)
+        counts[kind] = count + len(batch)
+        SearchDocument.objects.filter(kind=kind).exclude(object_id__in=model._default_manager.values('pk')).delete()
+    return counts
+
+
+# Signals
+
+def _index_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_objects(sender, [instance])
+
+
+def _unindex_deleted(sender, instance, **kwargs):
+    kind = indexed_models()[sender][0]
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def _reindex_evidence(sender, instance, raw=False, **kwargs):
+    """Witness transcripts and ID document owners are part of their evidence's document."""
+    from evidence.models import Evidence
+    if raw:
+        return
+    evidence = Evidence.objects.select_related('witness_detail', 'id_document_detail').filter(pk=instance.evidence_id).first()
+    if evidence is not None:
+        index_objects(Evidence, [evidence])
+
+
+def connect_signals():
+    from evidence.models import IDDocumentEvidence, WitnessEvidence
+    for model in indexed_models():
+        uid = f'core.search.{model._meta.label_lower}'
+        post_save.connect(_index_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(_unindex_deleted, sender=model, dispatch_uid=uid)
+    for model in (WitnessEvidence, IDDocumentEvidence):
+        uid = f'core.search.{model._meta.label_lower}'
+        post_save.connect(_reindex_evidence, sender=model, dispatch_uid=uid)
+        post_delete.connect(_reindex_evidence, sender=model, dispatch_uid=uid)
+
+
+# Queries
+
+def visible_documents(user):
+    """Q of the documents `user` may see, mirroring the list endpoints' role rules."""
+    from cases.models import Case
+    scope = Q(pk__in=[])
+    if has_any_role(user, OFFICER_ROLES):
+        if has_any_role(user, ALL_CASES_ROLES):
+            scope |= Q(kind=SearchDocument.KIND_CASE)
+        else:
+            own_cases = Case.objects.filter(Q(assigned_detective=user) | Q(created_by=user)).values('pk')
+            scope |= Q(kind=SearchDocument.KIND_CASE, case_id__in=own_cases)
+        scope |= Q(kind__in=[SearchDocument.KIND_EVIDENCE, SearchDocument.KIND_TIP])
+    else:
+        scope |= Q(kind=SearchDocument.KIND_TIP, owner_id=user.pk)
+    if has_any_role(user, COMPLAINT_STAFF_ROLES) and not user.has_role('Complainant / Witness'):
+        scope |= Q(kind=SearchDocument.KIND_COMPLAINT)
+    else:
+        scope |= Q(kind=SearchDocument.KIND_COMPLAINT, owner_id=user.pk)
+    return scope
+
+
+def search_terms(query):
+    return [term for term in query.split() if term]
+
+
+def fts5_query(terms):
+    """All terms must match; the last one as a prefix so partial words find results while typing."""
+    quoted = ['"%s"' % term.replace('"', '""') for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def tsquery(terms):
+    """to_tsquery() text matching like fts5_query(): every term, the last one as a prefix."""
+    quoted = ["'%s'" % term.replace('\\', '\\\\').replace("'", "''") for term in terms]
+    quoted[-1] += ':*'
+    return ' & '.join(quoted)
+
+
+@lru_cache(maxsize=None)
+def fulltext_backend(vendor, alias):
+    """'postgresql', 'fts5' or None, depending on what migration 0006 could create."""
+    if vendor == 'postgresql':
+        return 'postgresql'
+    if vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return 'fts5'
+    return None
+
+
+def _match(queryset, terms):
+    backend = fulltext_backend(connection.vendor, connection.alias)
+    table = SearchDocument._meta.db_table
+    if backend == 'postgresql':
+        query = "to_tsquery('simple', %s)"
+        return queryset.annotate(
+            matched=RawSQL(f'"{table}"."search_vector" @@ {query}', [tsquery(terms)], output_field=BooleanField()),
+            rank=RawSQL(f'ts_rank_cd("{table}"."search_vector", {query})', [tsquery(terms)], output_field=FloatField()),
+        ).filter(matched=True)
+    if backend == 'fts5':
+        # One join with the FTS table; bm25 is lower for better matches and title weighs more than body
+        return queryset.extra(
+            select={'rank': f'-bm25({FTS_TABLE}, 4.0, 1.0)'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = "{table}"."id"', f'{FTS_TABLE} MATCH %s'],
+            params=[fts5_query(terms)],
+        )
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+def search(user, query, kinds=None, limit=20):
+    """Best-ranked documents visible to `user` that match every term of `query`."""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    queryset = SearchDocument.objects.filter(visible_documents(user))
+    if kinds:
+        queryset = queryset.filter(kind__in=kinds)
+    queryset = _match(queryset, terms).order_by('-rank', '-created_at')
+    return list(queryset[:min(limit, MAX_RESULTS)])
+
+
+def snippet(document):
+    body = document.body or ''
+    return body if len(body) <= SNIPPET_LENGTH else body[:SNIPPET_LENGTH].rsplit(' ', 1)[0] + '…'
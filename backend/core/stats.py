@@ -0,0 +1,181 @@
+"""
+Dashboard statistics served from precomputed counters.
+Each counter is COUNT(*) over one model with an optional filter. Saves and deletes of those
+models adjust the StatCounter rows by +/-1 in the same transaction; `manage.py recompute_stats`
+rebuilds them from scratch. StatisticsView reads them through a TTL cache and answers with an ETag.
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from core.models import StatCounter
+
+CACHE_KEY = 'core:statistics'
+
+
+@lru_cache(maxsize=None)
+def counter_definitions():
+    """
+    name -> (model, filter). Filters use only exact and __in lookups so a single instance
+    can be tested against them in Python. Order here is the order of the API response.
+    """
+    from accounts.models import User
+    from cases.models import Case, Complaint
+    from evidence.models import Evidence
+    from suspects.models import Suspect
+    return {
+        'cases_total': (Case, {}),
+        'cases_open': (Case, {'status': Case.STATUS_OPEN}),
+        'complaints_total': (Complaint, {}),
+        'complaints_pending': (Complaint, {
+            'status__in': (Complaint.STATUS_PENDING_TRAINEE, Complaint.STATUS_PENDING_OFFICER),
+        }),
+        'evidence_total': (Evidence, {}),
+        'suspects_total': (Suspect, {}),
+        'suspects_high_priority': (Suspect, {'status': Suspect.STATUS_MOST_WANTED}),
+        'users_total': (User, {}),
+    }
+
+
+@lru_cache(maxsize=None)
+def _counters_by_model():
+    by_model = {}
+    for name, (model, conditions) in counter_definitions().items():
+        by_model.setdefault(model, {})[name] = conditions
+    return by_model
+
+
+def _tracked_fields(model):
+    return {lookup.split('__')[0] for conditions in _counters_by_model()[model].values() for lookup in conditions}
+
+
+def _matches(values, conditions):
+    for lookup, expected in conditions.items():
+        field, _, op = lookup.partition('__')
+        if op == 'in':
+            if values.get(field) not in expected:
+                return False
+        elif values.get(field) != expected:
+            return False
+    return True
+
+
+def statistics_cache_ttl():
+    return getattr(settings, 'STATISTICS_CACHE_TTL', 30)
+
+
+def invalidate_cache():
+    cache.delete(CACHE_KEY)
+
+
+def recompute_counters():
+    """Rebuild every counter with one aggregate query per model. Returns {name: value}."""
+    values = {}
+    for model, counters in _counters_by_model().items():
+        values.update(model._default_manager.aggregate(**{
+            name: Count('pk', filter=Q(**conditions) if conditions else None)
+            for name, conditions in counters.items()
+        }))
+    StatCounter.objects.bulk_create(
+        [StatCounter(name=name, value=value) for name, value in values.items()],
+        update_conflicts=True,
+        unique_fields=['name'],
+        update_fields=['value', 'updated_at'],
+    )
+    transaction.on_commit(invalidate_cache)
+    return values
+
+
+def get_statistics():
+    """(data, etag) from the cache; on a miss read StatCounter (one query), recomputing if any row is missing."""
+    cached = cache.get(CACHE_KEY)
+    if cached is not None:
+        return cached
+    names = list(counter_definitions())
+    values = dict(StatCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    if len(values) < len(names):
+        values = recompute_counters()
+    data = {name: values[name] for name in names}
+    etag = '"%s"' % hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    cache.set(CACHE_KEY, (data, etag), statistics_cache_ttl())
+    return data, etag
+
+
+def _apply_deltas(deltas):
+    changed = False
+    for name, delta in deltas.items():
+        if delta:
+            # Counters that were never computed have no row; the next read recomputes them
+            StatCounter.objects.filter(name=name).update(value=F('value') + delta)
+            changed = True
+    if changed:
+        transaction.on_commit(invalidate_cache)
+
+
+def record_bulk_update(model, count, before, after):
+    """Adjust counters for `count` rows a queryset.update() moved from field values `before` to `after`."""
+    counters = _counters_by_model().get(model)
+    if counters and count:
+        _apply_deltas({
+            name: count * (_matches(after, conditions) - _matches(before, conditions))
+            for name, conditions in counters.items()
+        })
+
+
+def record_bulk_create(model, objects):
+    """Adjust counters for rows inserted with bulk_create(), which sends no signals."""
+    counters = _counters_by_model().get(model)
+    if counters and objects:
+        _apply_deltas({
+            name: sum(_matches(_snapshot(obj), conditions) for obj in objects)
+            for name, conditions in counters.items()
+        })
+
+
+def _snapshot(instance):
+    return {field: getattr(instance, field) for field in _tracked_fields(type(instance))}
+
+
+def _stats_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored values of filtered fields so post_save can tell what moved."""
+    fields = _tracked_fields(sender)
+    if raw or instance._state.adding or not fields:
+        return
+    if update_fields is not None and not fields.intersection(update_fields):
+        return
+    instance._stats_previous = sender._default_manager.filter(pk=instance.pk).values(*fields).first()
+
+
+def _stats_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance.__dict__.pop('_stats_previous', None)
+    if not created and previous is None:
+        return
+    current = _snapshot(instance)
+    _apply_deltas({
+        name: _matches(current, conditions) - (0 if created else _matches(previous, conditions))
+        for name, conditions in _counters_by_model()[sender].items()
+    })
+
+
+def _stats_post_delete(sender, instance, **kwargs):
+    current = _snapshot(instance)
+    _apply_deltas({
+        name: -_matches(current, conditions)
+        for name, conditions in _counters_by_model()[sender].items()
+    })
+
+
+def connect_signals():
+    for model in _counters_by_model():
+        uid = f'core.stats.{model._meta.label_lower}'
+        pre_save.connect(_stats_pre_save, sender=model, dispatch_uid=uid)
+        post_save.connect(_stats_post_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_stats_post_delete, sender=model, dispatch_uid=uid)
@@ -0,0 +1,38 @@
+"""
+Streamed JSON arrays for large unpaginated lists.
+Rows are read with QuerySet.iterator() (a server-side cursor on PostgreSQL) and serialized a
+chunk at a time, so memory stays flat however many rows the list has.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+STREAM_CHUNK_SIZE = 500
+
+
+def iter_json_array(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE, context=None):
+    """Yield a JSON array of serializer_class(row).data, one text chunk per `chunk_size` rows."""
+    yield '['
+    separator = ''
+    chunk = []
+
+    def dump(rows):
+        data = serializer_class(rows, many=True, context=context).data
+        return ','.join(json.dumps(item, cls=DjangoJSONEncoder, separators=(',', ':')) for item in data)
+
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield separator + dump(chunk)
+            separator, chunk = ',', []
+    if chunk:
+        yield separator + dump(chunk)
+    yield ']'
+
+
+def streaming_json_response(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE, context=None):
+    return StreamingHttpResponse(
+        iter_json_array(queryset, serializer_class, chunk_size, context),
+        content_type='application/json',
+    )
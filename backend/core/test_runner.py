@@ -0,0 +1,16 @@
+"""
+Test runner (settings.TEST_RUNNER) that runs deferred side effects synchronously: audit entries
+are saved inline (AUDIT_LOG['MODE'] = 'sync') and outbox jobs run in the caller
+(OUTBOX['MODE'] = 'inline'), so tests can assert on them right away. Other runners (pytest)
+get the same with AUDIT_LOG_MODE=sync OUTBOX_MODE=inline in the environment.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class SyncSideEffectsTestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.AUDIT_LOG = {**settings.AUDIT_LOG, 'MODE': 'sync'}
+        settings.OUTBOX = {**settings.OUTBOX, 'MODE': 'inline'}
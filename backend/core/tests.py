@@ -1,3 +1,289 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from cases.models import Case, Complaint
+from evidence.models import Evidence, IDDocumentEvidence, WitnessEvidence
+from accounts.models import Role
+from accounts.views import get_tokens_for_user
+from core.audit import AuditBuffer
+from core.events import NotificationBroker, StreamPosition, _event_stream, broker, stream_config
+from core.models import AuditLog, Notification, OutboxJob, SearchDocument, StatCounter
+from core.outbox import Worker, job
+from core.search import fts5_query, tsquery
+from core.utils import log_audit, notify, notify_role, notify_many
 
-# Create your tests here.
+User = get_user_model()
+
+
+@job
+def failing_job():
+    raise RuntimeError('boom')
+
+
+class CoreTestCase(TestCase):
+    def setUp(self):
+        # ایجاد نقش و چند کاربر برای ارسال اعلان
+        self.sergeant_role = Role.objects.create(name='Sergeant')
+        self.sergeants = []
+        for i in range(5):
+            user = User.objects.create_user(username=f'sergeant{i}', email=f'sergeant{i}@test.com', password=None)
+            user.roles.add(self.sergeant_role)
+            self.sergeants.append(user)
+        self.other = User.objects.create_user(username='other', email='other@test.com', password=None)
+        cache.clear()
+
+    # تست ۱: اعلان به یک نقش با یک کوئری گیرندگان و یک INSERT گروهی
+    def test_notify_role_uses_constant_queries(self):
+        """ارسال اعلان به همه گروهبان‌ها مستقل از تعداد آن‌ها دو کوئری اجرا می‌کند"""
+        with self.assertNumQueries(2):
+            notify_role('Sergeant', 'Proposed', 'Case #1', 'suspect_proposed', 'Suspect', 7)
+
+        self.assertEqual(Notification.objects.filter(notification_type='suspect_proposed').count(), 5)
+        self.assertFalse(Notification.objects.filter(recipient=self.other).exists())
+        self.assertEqual(Notification.objects.filter(recipient=self.sergeants[0]).get().related_id, '7')
+
+    # تست ۲: اعلان به فهرست کاربران (نمونه یا شناسه)
+    def test_notify_many_accepts_users_and_ids(self):
+        """notify_many هم نمونه کاربر و هم شناسه را می‌پذیرد"""
+        notify_many([self.other, self.sergeants[0].pk], 'Hello')
+        self.assertEqual(Notification.objects.filter(title='Hello').count(), 2)
+
+    # تست ۳: ثبت گزارش ممیزی در بافر و نوشتن گروهی آن
+    def test_audit_buffer_flushes_in_bulk(self):
+        """ورودی‌های بافر تا flush در پایگاه داده نوشته نمی‌شوند و زمان اصلی خود را حفظ می‌کنند"""
+        buffer = AuditBuffer(batch_size=10, background=False)
+        entries = [AuditLog(user=self.other, action='view', model_name='Case', object_id=str(i)) for i in range(3)]
+        for entry in entries:
+            buffer.add(entry)
+        self.assertFalse(AuditLog.objects.exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.flush(), 3)
+        self.assertEqual([q['sql'].split()[0] for q in queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))], ['INSERT'])
+        self.assertEqual(len(buffer), 0)
+        saved = AuditLog.objects.get(object_id='1')
+        self.assertEqual(saved.timestamp, entries[1].timestamp)
+
+        # ورودی معیوب فقط خودش حذف و در لاگ ثبت می‌شود؛ بقیه دسته نوشته می‌شوند
+        buffer.add(AuditLog(user=self.other, action='view', model_name='Case', object_id='ok-1'))
+        buffer.add(AuditLog(user=self.other, action=None, model_name='Case', object_id='bad'))
+        buffer.add(AuditLog(user=self.other, action='view', model_name='Case', object_id='ok-2'))
+        with self.assertLogs('core.audit', 'ERROR') as logs:
+            self.assertEqual(buffer.flush(), 2)
+        self.assertIn("'object_id': 'bad'", logs.output[0])
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(AuditLog.objects.filter(object_id__in=['ok-1', 'ok-2']).count(), 2)
+
+    # تست ۴: ورودی‌های durable بلافاصله ذخیره می‌شوند
+    def test_durable_audit_is_saved_immediately(self):
+        """log_audit با durable=True حتی در حالت بافر بلافاصله ذخیره می‌شود"""
+        with self.settings(AUDIT_LOG={'MODE': 'buffered'}):
+            entry = log_audit(self.other, 'approve', 'ChiefApproval', 1, 'approved', durable=True)
+        self.assertIsNotNone(entry.pk)
+
+    # تست ۵: صف outbox و اجرای آن توسط worker
+    def test_outbox_job_runs_on_worker(self):
+        """notify_role.delay در حالت outbox فقط یک job ثبت می‌کند و worker آن را اجرا و حذف می‌کند"""
+        with self.settings(OUTBOX={'MODE': 'outbox'}):
+            # job پس از commit ثبت می‌شود و با rollback هیچ jobی نمی‌ماند
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    notify_role.delay('Sergeant', 'Queued', 'Case #2', 'suspect_proposed', 'Suspect', 9)
+                    self.assertFalse(OutboxJob.objects.exists())
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    notify_role.delay('Sergeant', 'Rolled back')
+                    raise RuntimeError
+            self.assertEqual(OutboxJob.objects.count(), 1)
+            self.assertFalse(Notification.objects.filter(title='Queued').exists())
+
+            self.assertEqual(Worker(threads=2).run_once(), 1)
+        self.assertEqual(Notification.objects.filter(title='Queued').count(), 5)
+        self.assertFalse(OutboxJob.objects.exists())
+
+    # تست ۶: تلاش مجدد با تأخیر و شکست نهایی
+    def test_outbox_failed_job_is_retried_with_backoff(self):
+        """job ناموفق با تأخیر دوباره زمان‌بندی می‌شود و پس از آخرین تلاش FAILED می‌ماند"""
+        with self.settings(OUTBOX={'MODE': 'outbox', 'MAX_ATTEMPTS': 2}):
+            with self.captureOnCommitCallbacks(execute=True):
+                failing_job.delay()
+            worker = Worker(threads=1)
+            with self.assertLogs('core.outbox', 'WARNING'):
+                worker.run_once()
+            outbox_job = OutboxJob.objects.get()
+            self.assertEqual(outbox_job.status, OutboxJob.STATUS_PENDING)
+            self.assertEqual(outbox_job.attempts, 1)
+            self.assertIn('boom', outbox_job.last_error)
+            self.assertGreater(outbox_job.run_after, timezone.now())
+            # پیش از رسیدن زمان تلاش بعدی چیزی برداشته نمی‌شود
+            self.assertEqual(worker.run_once(), 0)
+
+            OutboxJob.objects.update(run_after=timezone.now())
+            with self.assertLogs('core.outbox', 'ERROR'):
+                worker.run_once()
+        outbox_job.refresh_from_db()
+        self.assertEqual(outbox_job.status, OutboxJob.STATUS_FAILED)
+        self.assertEqual(outbox_job.attempts, 2)
+
+    # تست ۷: آمار داشبورد از شمارنده‌ها و کش خوانده می‌شود
+    def test_statistics_served_from_counters_with_etag(self):
+        """درخواست تکراری آمار هیچ کوئری‌ای ندارد و با If-None-Match پاسخ 304 می‌گیرد"""
+        client = APIClient()
+        response = client.get('/api/statistics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['users_total'], 6)
+        self.assertEqual(response.data['data']['cases_open'], 0)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = client.get('/api/statistics/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # ایجاد و تغییر وضعیت پرونده شمارنده‌ها را بدون شمارش مجدد به‌روز می‌کند
+        with self.captureOnCommitCallbacks(execute=True):
+            case = Case.objects.create(title='Open case', created_by=self.other)
+        self.assertEqual(StatCounter.objects.get(name='cases_total').value, 1)
+        self.assertEqual(StatCounter.objects.get(name='cases_open').value, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            case.status = Case.STATUS_CLOSED
+            case.save()
+        response = client.get('/api/statistics/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['cases_total'], 1)
+        self.assertEqual(response.data['data']['cases_open'], 0)
+
+    # تست ۸: جریان SSE اعلان‌ها با ادامه از Last-Event-ID
+    def test_notification_stream_resumes_from_last_event_id(self):
+        """بدون ASGI اعلان‌های بعد از Last-Event-ID یک‌جا برگردانده می‌شوند؛ فقط با بلیت کوتاه‌مدت و نه توکن دسترسی در URL"""
+        first = notify(self.other, 'First')
+        second = notify(self.other, 'Second')
+        notify(self.sergeants[0], 'Not mine')
+        third = notify(self.other, 'Third')
+        self.assertEqual(self.client.get('/api/notifications/stream/').status_code, 401)
+
+        # توکن دسترسی در query string پذیرفته نمی‌شود و بلیت جای توکن Bearer را نمی‌گیرد
+        access = get_tokens_for_user(self.other)['access']
+        self.assertEqual(self.client.get(f'/api/notifications/stream/?token={access}').status_code, 401)
+        self.assertEqual(self.client.get(f'/api/notifications/stream/?ticket={access}').status_code, 401)
+        client = APIClient()
+        client.force_authenticate(self.other)
+        ticket = client.post('/api/notifications/stream/ticket/').data['data']['ticket']
+        self.assertEqual(self.client.get('/api/notifications/', HTTP_AUTHORIZATION=f'Bearer {ticket}').status_code, 401)
+
+        response = self.client.get(
+            f'/api/notifications/stream/?ticket={ticket}', HTTP_LAST_EVENT_ID=str(first.pk),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('"title": "Second"', body)
+        self.assertIn(f'id: {first.pk},{second.pk}\n', body)
+        self.assertNotIn('First', body)
+        self.assertNotIn('Not mine', body)
+
+        # اعلانی که شناسه کمتری دارد ولی دیرتر commit شده، پس از شناسه بزرگ‌تر هم فرستاده می‌شود
+        response = self.client.get(
+            f'/api/notifications/stream/?ticket={ticket}', HTTP_LAST_EVENT_ID=f'{first.pk},{third.pk}',
+        )
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('"title": "Second"', body)
+        self.assertNotIn('Third', body)
+        self.assertIn(f'id: {first.pk},{second.pk},{third.pk}\n', body)
+
+        # poller مشترک شناسه‌های جاافتاده را تا commit شدن دنبال می‌کند
+        poller = NotificationBroker()
+        poller._last_pk = 10
+        poller._track_gaps([13])
+        self.assertEqual((poller._last_pk, set(poller._gaps)), (13, {11, 12}))
+        poller._track_gaps([11])
+        self.assertEqual((poller._last_pk, set(poller._gaps)), (13, {12}))
+
+    # تست ۹: جریان ASGI با انتشار اعلان جدید بیدار می‌شود
+    async def test_notification_stream_pushes_published_notifications(self):
+        """اعلان جدید پس از publish بدون کوئری دوره‌ای به جریان باز ارسال می‌شود"""
+        access = await sync_to_async(lambda: get_tokens_for_user(self.other)['access'])()
+        response = await self.async_client.get('/api/notifications/stream/', headers={'Authorization': f'Bearer {access}'})
+        self.assertEqual(response.status_code, 200)
+
+        stream = _event_stream(self.other.pk, StreamPosition(0), {**stream_config(), 'HEARTBEAT': 5, 'MAX_DURATION': 5})
+        self.assertTrue((await anext(stream)).startswith('retry:'))
+        notification = await sync_to_async(notify)(self.other, 'Live')
+        broker.publish([self.other.pk])
+        chunk = await anext(stream)
+        self.assertIn(f'id: 0,{notification.pk}\n', chunk)
+        self.assertIn('"title": "Live"', chunk)
+        await stream.aclose()
+        self.assertFalse(broker.has_subscribers())
+
+    # تست ۱۰: شمارش اعلان‌های خوانده‌نشده و علامت‌گذاری گروهی
+    def test_unread_count_and_bulk_mark_read(self):
+        """شمارش خوانده‌نشده‌ها با یک کوئری و خواندن گروهی با یک UPDATE"""
+        notifications = notify_many([self.other] * 4, 'Batch')
+        notify(self.sergeants[0], 'Other user')
+        client = APIClient()
+        client.force_authenticate(self.other)
+
+        with self.assertNumQueries(1):
+            response = client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.data['data']['unread'], 4)
+
+        response = client.post('/api/notifications/mark-read/', {'ids': [notifications[0].pk, notifications[1].pk]}, format='json')
+        self.assertEqual(response.data['data']['updated'], 2)
+        self.assertEqual(client.post('/api/notifications/mark-read/', {}, format='json').status_code, 400)
+
+        with self.assertNumQueries(1):
+            response = client.post('/api/notifications/mark-read/', {'all': True}, format='json')
+        self.assertEqual(response.data['data']['updated'], 2)
+        self.assertEqual(client.get('/api/notifications/unread-count/').data['data']['unread'], 0)
+        self.assertFalse(Notification.objects.get(recipient=self.sergeants[0]).read)
+
+    # تست ۱۱: جستجوی متنی با رتبه‌بندی و محدودیت دسترسی نقش‌ها
+    def test_search_ranks_and_scopes_results(self):
+        """سیگنال‌ها سند جستجو را به‌روز نگه می‌دارند؛ عنوان بالاتر از متن رتبه می‌گیرد و هر نقش فقط موارد قابل مشاهده را می‌بیند"""
+        detective = User.objects.create_user(username='detective', email='detective@test.com', password=None)
+        detective.roles.add(Role.objects.create(name='Detective'))
+        complainant = User.objects.create_user(username='complainant', email='complainant@test.com', password=None)
+        complainant.roles.add(Role.objects.create(name='Complainant / Witness'))
+        own_case = Case.objects.create(title='Warehouse robbery', description='Night shift', created_by=detective)
+        other_case = Case.objects.create(title='Fraud', description='Robbery of the warehouse ledger', created_by=self.sergeants[0])
+        evidence = Evidence.objects.create(case=own_case, evidence_type=Evidence.TYPE_WITNESS, title='Statement')
+        WitnessEvidence.objects.create(evidence=evidence, transcript='He wore a crimson jacket')
+        id_evidence = Evidence.objects.create(case=own_case, evidence_type=Evidence.TYPE_ID_DOCUMENT, title='Card')
+        IDDocumentEvidence.objects.create(evidence=id_evidence, owner_full_name='Parviz Karimi')
+        own_complaint = Complaint.objects.create(complainant=complainant, title='Stolen bike', description='Red bike')
+        Complaint.objects.create(complainant=self.other, title='Stolen bike', description='Blue bike')
+
+        def found(user, query, **params):
+            client = APIClient()
+            client.force_authenticate(user)
+            response = client.get('/api/search/', {'q': query, **params})
+            self.assertEqual(response.status_code, 200)
+            return [(item['kind'], item['id']) for item in response.data['results']]
+
+        # گروهبان همه پرونده‌ها را می‌بیند؛ تطبیق عنوان بالاتر از تطبیق متن
+        self.assertEqual(found(self.sergeants[0], 'warehouse robbery', kind='case'), [('case', own_case.pk), ('case', other_case.pk)])
+        # کارآگاه فقط پرونده‌های خودش را می‌بیند
+        self.assertEqual(found(detective, 'warehouse robbery', kind='case'), [('case', own_case.pk)])
+        # متن شهادت و نام صاحب مدرک شناسایی هم جستجو می‌شوند؛ آخرین کلمه پیشوندی است
+        self.assertEqual(found(detective, 'crimson'), [('evidence', evidence.pk)])
+        self.assertEqual(found(detective, 'parviz kari'), [('evidence', id_evidence.pk)])
+        # شاکی فقط شکایت خودش را می‌بیند و به مدارک دسترسی ندارد
+        self.assertEqual(found(complainant, 'stolen bike'), [('complaint', own_complaint.pk)])
+        self.assertEqual(found(complainant, 'crimson'), [])
+
+        evidence.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind=SearchDocument.KIND_EVIDENCE, object_id=evidence.pk).exists())
+        self.assertEqual(found(detective, 'crimson'), [])
+
+        client = APIClient()
+        client.force_authenticate(detective)
+        self.assertEqual(client.get('/api/search/').status_code, 400)
+        self.assertEqual(client.get('/api/search/', {'q': 'x', 'kind': 'suspect'}).status_code, 400)
+
+        # PostgreSQL همان معنای FTS5 را دارد: همه کلمات، آخرین کلمه پیشوندی
+        self.assertEqual(fts5_query(['it"s', 'kari']), '"it""s" "kari"*')
+        self.assertEqual(tsquery(["it's", 'kari']), "'it''s' & 'kari':*")
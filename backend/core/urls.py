@@ -1,8 +1,13 @@
 from django.urls import path
-from . import views
+from . import events, views
 
 urlpatterns = [
     path('statistics/', views.StatisticsView.as_view(), name='statistics'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('notifications/stream/', events.notification_stream, name='notification-stream'),
+    path('notifications/stream/ticket/', views.NotificationStreamTicketView.as_view(), name='notification-stream-ticket'),
     path('notifications/', views.NotificationListView.as_view(), name='notification-list'),
+    path('notifications/unread-count/', views.NotificationUnreadCountView.as_view(), name='notification-unread-count'),
+    path('notifications/mark-read/', views.NotificationBulkMarkReadView.as_view(), name='notification-bulk-mark-read'),
     path('notifications/<int:pk>/read/', views.NotificationMarkReadView.as_view(), name='notification-mark-read'),
 ]
@@ -1,28 +1,109 @@
 """
 Helpers for audit trail and notifications.
 """
+from django.contrib.auth import get_user_model
+
+from core.audit import write_audit
+from core.events import publish_on_commit
 from core.models import AuditLog, Notification
+from core.outbox import job
+
+# Rows per INSERT when fanning notifications (or audit entries) out to many rows
+NOTIFY_BATCH_SIZE = 500
+
+
+def log_audit(user, action, model_name='', object_id='', description='', extra_data=None, durable=False):
+    """
+    Record an audit log entry. Entries are buffered and bulk-written off the request path;
+    pass durable=True to save it immediately in the caller's transaction.
+    """
+    return write_audit(
+        AuditLog(
+            user=user,
+            action=action,
+            model_name=model_name,
+            object_id=str(object_id),
+            description=description,
+            extra_data=extra_data or {},
+        ),
+        durable=durable,
+    )
 
 
-def log_audit(user, action, model_name='', object_id='', description='', extra_data=None):
-    """Create an audit log entry."""
-    AuditLog.objects.create(
-        user=user,
-        action=action,
-        model_name=model_name,
-        object_id=str(object_id),
-        description=description,
-        extra_data=extra_data or {},
+def log_audit_many(user, action, model_name, object_ids, description='', extra_data=None):
+    """Record the same audit entry for many objects with bulk INSERTs in the caller's transaction."""
+    return AuditLog.objects.bulk_create(
+        [
+            AuditLog(
+                user=user,
+                action=action,
+                model_name=model_name,
+                object_id=str(object_id),
+                description=description,
+                extra_data=extra_data or {},
+            )
+            for object_id in object_ids
+        ],
+        batch_size=NOTIFY_BATCH_SIZE,
     )
 
 
+@job
 def notify(recipient, title, message='', notification_type='', related_model='', related_id=''):
-    """Create a notification for a user."""
-    Notification.objects.create(
-        recipient=recipient,
+    """Create a notification for a user (instance or id). Use notify.delay() from views."""
+    recipient_id = getattr(recipient, 'pk', recipient)
+    notification = Notification.objects.create(
+        recipient_id=recipient_id,
         title=title,
         message=message,
         notification_type=notification_type,
         related_model=related_model,
         related_id=str(related_id),
     )
+    publish_on_commit([recipient_id])
+    return notification
+
+
+@job
+def notify_many(recipients, title, message='', notification_type='', related_model='', related_id=''):
+    """Create the same notification for many users (instances or ids) with batched bulk INSERTs."""
+    notifications = [
+        Notification(
+            recipient_id=getattr(recipient, 'pk', recipient),
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            related_model=related_model,
+            related_id=str(related_id),
+        )
+        for recipient in recipients
+    ]
+    created = Notification.objects.bulk_create(notifications, batch_size=NOTIFY_BATCH_SIZE)
+    publish_on_commit(n.recipient_id for n in created)
+    return created
+
+
+@job
+def notify_each(items):
+    """Create one notification per item (dicts of notify() arguments, recipient as id) with batched bulk INSERTs."""
+    notifications = [
+        Notification(
+            recipient_id=getattr(item['recipient'], 'pk', item['recipient']),
+            title=item['title'],
+            message=item.get('message', ''),
+            notification_type=item.get('notification_type', ''),
+            related_model=item.get('related_model', ''),
+            related_id=str(item.get('related_id', '')),
+        )
+        for item in items
+    ]
+    created = Notification.objects.bulk_create(notifications, batch_size=NOTIFY_BATCH_SIZE)
+    publish_on_commit(n.recipient_id for n in created)
+    return created
+
+
+@job
+def notify_role(role_name, title, message='', notification_type='', related_model='', related_id=''):
+    """Notify every user with the given role: one query for recipient ids, then bulk INSERTs."""
+    recipient_ids = get_user_model().objects.filter(roles__name=role_name).values_list('pk', flat=True).distinct()
+    return notify_many(recipient_ids, title, message, notification_type, related_model, related_id)
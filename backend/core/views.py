@@ -1,34 +1,72 @@
-"""Notifications, audit log, and aggregated statistics."""
+"""Notifications, audit log, aggregated statistics and search."""
+from django.utils.http import parse_etags
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.views import APIView
 from rest_framework import serializers
-from .models import Notification
+from .events import issue_stream_ticket, stream_config
+from .models import Notification, SearchDocument
+from .search import MAX_RESULTS, search, snippet
+from .stats import get_statistics, statistics_cache_ttl
 
 
 class StatisticsView(APIView):
-    """Aggregated statistics for dashboard/home. Public or authenticated."""
+    """
+    Aggregated statistics for dashboard/home. Public or authenticated.
+    Served from precomputed counters (core.stats) with an ETag; If-None-Match gets 304.
+    """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        from cases.models import Case, Complaint
-        from evidence.models import Evidence
-        from suspects.models import Suspect
-        from accounts.models import User
-        stats = {
-            'cases_total': Case.objects.count(),
-            'cases_open': Case.objects.filter(status=Case.STATUS_OPEN).count(),
-            'complaints_total': Complaint.objects.count(),
-            'complaints_pending': Complaint.objects.filter(
-                status__in=(Complaint.STATUS_PENDING_TRAINEE, Complaint.STATUS_PENDING_OFFICER)
-            ).count(),
-            'evidence_total': Evidence.objects.count(),
-            'suspects_total': Suspect.objects.count(),
-            'suspects_high_priority': Suspect.objects.filter(status=Suspect.STATUS_MOST_WANTED).count(),
-            'users_total': User.objects.count(),
-        }
-        return Response({'success': True, 'data': stats})
+        stats, etag = get_statistics()
+        headers = {'ETag': etag, 'Cache-Control': f'public, max-age={statistics_cache_ttl()}'}
+        if_none_match = request.headers.get('If-None-Match', '')
+        if if_none_match.strip() == '*' or etag in parse_etags(if_none_match):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response({'success': True, 'data': stats}, headers=headers)
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='object_id')
+    snippet = serializers.SerializerMethodField()
+    rank = serializers.FloatField()
+
+    class Meta:
+        model = SearchDocument
+        fields = ['kind', 'id', 'case_id', 'title', 'snippet', 'rank', 'created_at']
+
+    def get_snippet(self, obj):
+        return snippet(obj)
+
+
+class SearchView(APIView):
+    """
+    GET /api/search/?q=<terms>[&kind=case,evidence][&limit=20] — ranked full-text search over cases,
+    complaints, evidence and tips the user can see (core.search). All terms must match.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'success': False, 'error': {'message': 'Query parameter q is required.'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        valid_kinds = {kind for kind, _ in SearchDocument.KIND_CHOICES}
+        kinds = [k for k in request.query_params.get('kind', '').split(',') if k]
+        if set(kinds) - valid_kinds:
+            return Response(
+                {'success': False, 'error': {'message': f'kind must be one of: {", ".join(sorted(valid_kinds))}'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), MAX_RESULTS))
+        except ValueError:
+            limit = 20
+        results = search(request.user, query, kinds=kinds, limit=limit)
+        return Response({'count': len(results), 'results': SearchResultSerializer(results, many=True).data})
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -40,6 +78,7 @@ class NotificationSerializer(serializers.ModelSerializer):
 class NotificationListView(generics.ListAPIView):
     """List current user's notifications."""
     permission_classes = [IsAuthenticated]
+    cursor_field = 'created_at'  # ?pagination=cursor (core.pagination)
     serializer_class = NotificationSerializer
 
     def get_queryset(self):
@@ -51,9 +90,53 @@ class NotificationMarkReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, pk):
-        notification = Notification.objects.filter(recipient=request.user, pk=pk).first()
-        if not notification:
+        if not Notification.objects.filter(recipient=request.user, pk=pk).update(read=True):
             return Response({'success': False}, status=status.HTTP_404_NOT_FOUND)
-        notification.read = True
-        notification.save()
         return Response({'success': True})
+
+
+class NotificationBulkMarkReadSerializer(serializers.Serializer):
+    """Exactly one of: all=true, ids=[...], or before=<datetime> (created at or before)."""
+    all = serializers.BooleanField(required=False)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000)
+    before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        selectors = [key for key in ('ids', 'before') if key in data] + (['all'] if data.get('all') else [])
+        if len(selectors) != 1:
+            raise serializers.ValidationError('Provide exactly one of: all, ids, before.')
+        return data
+
+
+class NotificationBulkMarkReadView(APIView):
+    """Mark many of the current user's notifications as read with a single UPDATE."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ser = NotificationBulkMarkReadSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        qs = Notification.objects.filter(recipient=request.user, read=False)
+        if 'ids' in ser.validated_data:
+            qs = qs.filter(pk__in=ser.validated_data['ids'])
+        elif 'before' in ser.validated_data:
+            qs = qs.filter(created_at__lte=ser.validated_data['before'])
+        updated = qs.update(read=True)
+        return Response({'success': True, 'data': {'updated': updated}})
+
+
+class NotificationUnreadCountView(APIView):
+    """Unread notification count for the navbar badge; one COUNT served by the (recipient, read) index."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        unread = Notification.objects.filter(recipient=request.user, read=False).count()
+        return Response({'success': True, 'data': {'unread': unread}})
+
+
+class NotificationStreamTicketView(APIView):
+    """Short-lived ticket for GET /api/notifications/stream/?ticket= (EventSource cannot send the Bearer header)."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ticket = issue_stream_ticket(request.user)
+        return Response({'success': True, 'data': {'ticket': str(ticket), 'expires_in': stream_config()['TICKET_LIFETIME']}})
@@ -0,0 +1,295 @@
+"""
+Bulk evidence import (POST /api/evidence/import/, `manage.py import_evidence`).
+The manifest has one JSON object per line with the fields of POST /api/evidence/ plus
+`files`: [{"path": ..., "media_type"?: ..., "caption"?: ...}] naming files in a directory or a zip
+archive (media_type defaults to the type of the file's extension). Items are checked by
+EvidenceImportItemSerializer, i.e. the rules of POST /api/evidence/, and their files hashed on a
+thread pool (no database access there); nothing is written unless every item is valid. Files are
+copied into the blob store (evidence.storage) in parallel, then each batch of items is inserted
+with bulk_create in one transaction. bulk_create sends no signals, so each batch applies their
+effects itself: dashboard counters, blob references, search documents, dossier snapshots and
+thumbnails. One audit entry and one notification per assigned detective cover the whole import,
+or the batches committed before one failed.
+"""
+import hashlib
+import json
+import os
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files import File
+from django.db import transaction
+from rest_framework.settings import api_settings
+
+from cases.models import Case
+from core.utils import log_audit, notify_each
+from .models import (
+    BiologicalEvidence,
+    BiologicalEvidenceImage,
+    Evidence,
+    IDDocumentEvidence,
+    VehicleEvidence,
+    WitnessEvidence,
+    WitnessMedia,
+)
+from .serializers import EvidenceImportItemSerializer
+from .storage import add_references, evidence_storage
+from .thumbnails import is_image, make_thumbnails, missing_sizes
+
+BATCH_SIZE = 500
+WORKERS = 8
+READ_SIZE = 64 * 1024
+
+
+class ManifestError(Exception):
+    """The manifest cannot be imported; `errors` lists {line, message} per invalid item."""
+
+    def __init__(self, errors):
+        super().__init__(f'Manifest has {len(errors)} invalid item(s).')
+        self.errors = errors
+
+
+class ItemError(Exception):
+    pass
+
+
+class DirectorySource:
+    """Manifest files relative to a directory (paths may not leave it)."""
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+
+    def path(self, name):
+        path = os.path.realpath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            raise KeyError(name)
+        return path
+
+    def size(self, name):
+        return os.path.getsize(self.path(name))
+
+    def open(self, name):
+        return open(self.path(name), 'rb')
+
+
+class ArchiveSource:
+    """Manifest files inside a zip archive (a path or a file object)."""
+
+    def __init__(self, archive):
+        try:
+            self.archive = zipfile.ZipFile(archive)
+        except zipfile.BadZipFile:
+            raise ManifestError([{'line': 0, 'message': 'Archive is not a valid zip file.'}])
+
+    def size(self, name):
+        return self.archive.getinfo(name).file_size
+
+    def open(self, name):
+        return self.archive.open(name)
+
+
+class NoFiles:
+    """Source of a manifest without files (every item naming a file is invalid)."""
+
+    def size(self, name):
+        raise KeyError(name)
+
+
+def read_manifest(lines):
+    """[(line number, item dict)] of a JSON-lines manifest (bytes or str lines)."""
+    entries, errors = [], []
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = None
+        if not isinstance(item, dict):
+            errors.append({'line': number, 'message': 'Not a JSON object.'})
+            continue
+        entries.append((number, item))
+    if errors:
+        raise ManifestError(errors)
+    if not entries:
+        raise ManifestError([{'line': 0, 'message': 'Manifest is empty.'}])
+    return entries
+
+
+def sha256_of(source, name):
+    digest = hashlib.sha256()
+    with source.open(name) as file:
+        for block in iter(lambda: file.read(READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def error_messages(errors, field=''):
+    """Flat 'field: message' strings from serializer.errors."""
+    if isinstance(errors, dict):
+        for key, value in errors.items():
+            name = field if key == api_settings.NON_FIELD_ERRORS_KEY else f'{field}.{key}' if field else str(key)
+            yield from error_messages(value, name)
+    elif isinstance(errors, list):
+        for value in errors:
+            yield from error_messages(value, field)
+    else:
+        yield f'{field}: {errors}' if field else str(errors)
+
+
+def validate_item(item, source):
+    """
+    Validated data of one manifest item (EvidenceImportItemSerializer) with each file's SHA-256;
+    raises ItemError. Runs on worker threads: no database access.
+    """
+    serializer = EvidenceImportItemSerializer(data=item, context={'source': source})
+    if not serializer.is_valid():
+        raise ItemError('; '.join(error_messages(serializer.errors)))
+    data = dict(serializer.validated_data)
+    data['files'] = [{**file, 'sha256': sha256_of(source, file['path'])} for file in data['files']]
+    return data
+
+
+def validate_manifest(entries, source, workers=WORKERS):
+    """Validate every item in parallel; returns normalized items or raises ManifestError with all errors."""
+    def run(entry):
+        number, item = entry
+        try:
+            return number, validate_item(item, source), None
+        except ItemError as exc:
+            return number, None, str(exc)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, entries))
+    errors = [{'line': number, 'message': message} for number, _, message in results if message]
+    items = [(number, data) for number, data, message in results if not message]
+    existing = set(Case.objects.filter(pk__in={data['case'] for _, data in items}).values_list('pk', flat=True))
+    errors += [{'line': number, 'message': f'Case {data["case"]} does not exist.'} for number, data in items if data['case'] not in existing]
+    if errors:
+        raise ManifestError(sorted(errors, key=lambda error: error['line']))
+    return [data for _, data in items]
+
+
+def store_files(items, source, workers=WORKERS):
+    """Copy every distinct file into the blob store in parallel; returns {path: stored name}."""
+    files = {file['path']: file['sha256'] for data in items for file in data['files']}
+
+    def store(path):
+        with source.open(path) as handle:
+            content = File(handle, name=os.path.basename(path))
+            content.sha256 = files[path]  # hashed during validation
+            return path, evidence_storage().save(path, content)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(store, files))
+
+
+def create_batch(items, user, stored):
+    """Insert one batch of validated items and apply the side effects of the skipped signals."""
+    from core.search import index_objects
+    from core.stats import record_bulk_create
+    from judiciary.snapshots import invalidate
+    with transaction.atomic():
+        evidence = Evidence.objects.bulk_create([
+            Evidence(
+                case_id=data['case'], evidence_type=data['evidence_type'], title=data['title'],
+                description=data['description'], recorder=user,
+            )
+            for data in items
+        ])
+        details = defaultdict(list)
+        for obj, data in zip(evidence, items):
+            evidence_type = data['evidence_type']
+            if evidence_type == Evidence.TYPE_WITNESS:
+                details[WitnessEvidence].append(WitnessEvidence(
+                    evidence=obj, transcript=data['transcript'], media_url=data.get('media_url', ''),
+                ))
+            elif evidence_type == Evidence.TYPE_BIOLOGICAL:
+                details[BiologicalEvidence].append(BiologicalEvidence(evidence=obj))
+            elif evidence_type == Evidence.TYPE_VEHICLE:
+                details[VehicleEvidence].append(VehicleEvidence(
+                    evidence=obj, model=data['model'], color=data['color'],
+                    license_plate=data['license_plate'], serial_number=data['serial_number'],
+                ))
+            elif evidence_type == Evidence.TYPE_ID_DOCUMENT:
+                details[IDDocumentEvidence].append(IDDocumentEvidence(
+                    evidence=obj, owner_full_name=data['owner_full_name'], attributes=data['attributes'],
+                ))
+        for model, rows in details.items():
+            model.objects.bulk_create(rows)
+
+        files = {obj.pk: data['files'] for obj, data in zip(evidence, items) if data['files']}
+        WitnessMedia.objects.bulk_create([
+            WitnessMedia(witness_evidence=witness, file=stored[file['path']], media_type=file['media_type'])
+            for witness in details[WitnessEvidence] for file in files.get(witness.evidence_id, [])
+        ])
+        BiologicalEvidenceImage.objects.bulk_create([
+            BiologicalEvidenceImage(biological_evidence=bio, image=stored[file['path']], caption=file['caption'])
+            for bio in details[BiologicalEvidence] for file in files.get(bio.evidence_id, [])
+        ])
+
+        names = [stored[file['path']] for item_files in files.values() for file in item_files]
+        record_bulk_create(Evidence, evidence)
+        add_references(names)
+        index_objects(Evidence, Evidence.objects.select_related('witness_detail', 'id_document_detail').filter(
+            pk__in=[obj.pk for obj in evidence],
+        ))
+        invalidate(case_id__in=sorted({data['case'] for data in items}))
+        for name in sorted(set(names)):
+            if is_image(name) and missing_sizes(name):
+                make_thumbnails.delay(name)
+    return evidence
+
+
+def import_evidence(entries, source, user, batch_size=BATCH_SIZE, workers=WORKERS):
+    """
+    Import manifest entries (read_manifest()) with files from `source`. Returns the created
+    Evidence rows; raises ManifestError (nothing written) if any item is invalid. If a batch fails,
+    the batches already committed are audited and notified before the error propagates.
+    """
+    items = validate_manifest(entries, source, workers)
+    stored = store_files(items, source, workers)
+    created = []
+    try:
+        for start in range(0, len(items), batch_size):
+            created += create_batch(items[start:start + batch_size], user, stored)
+    except Exception:
+        if created:
+            record_import(created, user, len(items))
+        raise
+    record_import(created, user, len(items))
+    return created
+
+
+def record_import(created, user, total):
+    """The import's audit entry and one notification per assigned detective of the cases it added to."""
+    by_case = defaultdict(int)
+    for obj in created:
+        by_case[obj.case_id] += 1
+    description = f'Imported {len(created)} evidence items into {len(by_case)} case(s)'
+    if len(created) < total:
+        description += f' ({total - len(created)} not imported: a batch failed)'
+    log_audit(
+        user, 'create', 'Evidence', '', description,
+        extra_data={'evidence_ids': [obj.pk for obj in created], 'cases': {str(k): v for k, v in by_case.items()}},
+        durable=True,
+    )
+    by_detective = defaultdict(dict)
+    for case_id, detective_id in Case.objects.filter(pk__in=by_case, assigned_detective__isnull=False).values_list(
+        'pk', 'assigned_detective_id',
+    ):
+        by_detective[detective_id][case_id] = by_case[case_id]
+    notify_each.delay([
+        {
+            'recipient': detective_id,
+            'title': 'New evidence added',
+            'message': ', '.join(f'Case #{case_id}: {count} items' for case_id, count in sorted(cases.items())),
+            'notification_type': 'evidence_added',
+            'related_model': 'Case' if len(cases) == 1 else '',
+            'related_id': next(iter(cases)) if len(cases) == 1 else '',
+        }
+        for detective_id, cases in by_detective.items()
+    ])
@@ -0,0 +1,19 @@
+"""
+Render missing thumbnails (evidence.thumbnails) of every stored evidence image, e.g. after
+`collect_evidence_blobs --import` or a change of THUMBNAIL_SIZES.
+"""
+from django.core.management.base import BaseCommand
+
+from evidence.thumbnails import make_thumbnails, missing_sizes, stored_images
+
+
+class Command(BaseCommand):
+    help = 'Render missing thumbnails of evidence images'
+
+    def handle(self, *args, **options):
+        rendered = 0
+        for name in sorted(stored_images()):
+            if missing_sizes(name):
+                make_thumbnails(name)
+                rendered += 1
+        self.stdout.write(f'Rendered thumbnails for {rendered} images')
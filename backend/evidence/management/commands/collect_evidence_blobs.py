@@ -0,0 +1,29 @@
+"""
+Maintain the content-addressed evidence store (evidence.storage): recount blob references and
+delete blobs nothing references. With --import, first move files still stored under their
+original names into the store (duplicates collapse). Safe to run from cron.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from evidence.storage import collect_garbage, import_files
+
+
+class Command(BaseCommand):
+    help = 'Garbage-collect unreferenced evidence blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--import', dest='import_files', action='store_true',
+                            help='Move files stored under their original names into the blob store first')
+        parser.add_argument('--min-age', type=int, default=60, help='Keep blobs written in the last N minutes')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['import_files'] and not options['dry_run']:
+            self.stdout.write(f'Imported {import_files()} files')
+        deleted, freed = collect_garbage(timedelta(minutes=options['min_age']), dry_run=options['dry_run'])
+        for name in deleted:
+            self.stdout.write(name)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(f'{verb} {len(deleted)} blobs ({freed / (1024 * 1024):.1f} MB)')
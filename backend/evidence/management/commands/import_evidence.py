@@ -0,0 +1,45 @@
+"""
+Bulk-import evidence from a JSON-lines manifest (evidence.bulk), with the files it names in a
+directory (--files) or a zip archive (--archive). All or nothing: any invalid item aborts the
+import and lists every error.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from evidence.bulk import BATCH_SIZE, WORKERS, ArchiveSource, DirectorySource, ManifestError, NoFiles, import_evidence, read_manifest
+
+
+class Command(BaseCommand):
+    help = 'Import evidence items from a JSON-lines manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='JSON-lines file, one evidence item per line')
+        files = parser.add_mutually_exclusive_group()
+        files.add_argument('--files', help='Directory the manifest file paths are relative to')
+        files.add_argument('--archive', help='Zip archive holding the manifest files')
+        parser.add_argument('--user', required=True, help='Username recorded as the recorder of the evidence')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=WORKERS, help='Threads validating and storing files')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user {options["user"]!r}')
+        started = time.monotonic()
+        try:
+            if options['archive']:
+                source = ArchiveSource(options['archive'])
+            elif options['files']:
+                source = DirectorySource(options['files'])
+            else:
+                source = NoFiles()
+            with open(options['manifest'], 'rb') as manifest:
+                created = import_evidence(
+                    read_manifest(manifest), source, user, options['batch_size'], options['workers'],
+                )
+        except ManifestError as exc:
+            raise CommandError('\n'.join([str(exc)] + [f'line {e["line"]}: {e["message"]}' for e in exc.errors]))
+        self.stdout.write(f'Imported {len(created)} evidence items in {time.monotonic() - started:.1f}s')
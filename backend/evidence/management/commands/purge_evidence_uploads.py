@@ -0,0 +1,17 @@
+"""
+Remove chunked evidence uploads (evidence.uploads) that were abandoned, with their staged bytes.
+Run periodically from cron.
+"""
+from django.core.management.base import BaseCommand
+
+from evidence.uploads import purge_stale
+
+
+class Command(BaseCommand):
+    help = 'Discard chunked evidence uploads not touched for --hours hours'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Removed {purge_stale(options["hours"])} uploads')
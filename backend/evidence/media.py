@@ -0,0 +1,159 @@
+"""
+Permission-checked serving of evidence files (GET /api/evidence/media/<kind>/<id>/).
+EvidenceMediaView checks that the user may see the evidence's case, then serve() answers
+conditional requests itself and hands the file to the front proxy (EVIDENCE_MEDIA['MODE']
+'x-accel-redirect' for nginx, 'x-sendfile' for Apache/lighttpd) or, in 'python' mode, streams it
+with FileResponse / a ranged iterator: single byte ranges get 206, If-Range is honoured and files
+are read in READ_SIZE blocks, never whole.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from accounts.permissions import has_any_role
+from .models import BiologicalEvidenceImage, Evidence, WitnessEvidence, WitnessMedia
+from .storage import blob_digest, is_blob
+
+READ_SIZE = 64 * 1024
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+DEFAULT_MEDIA_CONFIG = {
+    'MODE': 'python',                      # 'python' | 'x-accel-redirect' | 'x-sendfile'
+    'ACCEL_PREFIX': '/protected-media/',   # internal nginx location aliased to MEDIA_ROOT
+    'MAX_AGE': 3600,
+}
+
+ALL_CASES_ROLES = ['System Administrator', 'Police Chief', 'Captain', 'Sergeant']
+OFFICER_ROLES = ['Police Officer', 'Detective', 'Sergeant', 'Captain', 'Police Chief', 'System Administrator']
+
+# kind -> (model, file field, path from the row to its Evidence)
+MEDIA_SOURCES = {
+    'witness-media': (WitnessMedia, 'file', 'witness_evidence__evidence'),
+    'witness-file': (WitnessEvidence, 'media_file', 'evidence'),
+    'biological-image': (BiologicalEvidenceImage, 'image', 'biological_evidence__evidence'),
+}
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def media_config():
+    return {**DEFAULT_MEDIA_CONFIG, **getattr(settings, 'EVIDENCE_MEDIA', {})}
+
+
+def media_url(kind, pk, request=None, size=None):
+    url = reverse('evidence-media', kwargs={'kind': kind, 'pk': pk})
+    if size:
+        url += f'?size={size}'
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def can_view_evidence(user, evidence):
+    """Same people who work the case: supervisors, its detective/creator/recorder, forensic doctors
+    for biological evidence and the judge of its trial."""
+    if has_any_role(user, ALL_CASES_ROLES):
+        return True
+    case = evidence.case
+    if has_any_role(user, OFFICER_ROLES) and user.pk in (case.assigned_detective_id, case.created_by_id, evidence.recorder_id):
+        return True
+    if evidence.evidence_type == Evidence.TYPE_BIOLOGICAL and has_any_role(user, ['Forensic Doctor']):
+        return True
+    trial = getattr(case, 'trial', None)
+    return trial is not None and trial.judge_id == user.pk
+
+
+def parse_range(header, size):
+    """
+    (first, last) byte of a single `bytes=` range, or None to send the whole file (no header,
+    several ranges or a malformed one). Raises RangeNotSatisfiable.
+    """
+    match = RANGE.match((header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:  # suffix range: the last N bytes
+        if int(last) == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def read_range(path, first, length):
+    with open(path, 'rb') as source:
+        source.seek(first)
+        while length > 0:
+            block = source.read(min(READ_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve(request, name, path, filename=None):
+    """Response for the file `name` (relative to MEDIA_ROOT) at `path`, honouring conditional and Range headers."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404('File not found.')
+    config = media_config()
+    content_type = mimetypes.guess_type(filename or path)[0] or 'application/octet-stream'
+    # Blob names are content hashes: the strongest possible validator
+    etag = f'"{blob_digest(name)}"' if is_blob(name) else f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        if config['MODE'] == 'x-accel-redirect':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = config['ACCEL_PREFIX'] + quote(name)
+        elif config['MODE'] == 'x-sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = path
+        else:
+            response = stream(request, path, stat, etag, content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = f'private, max-age={config["MAX_AGE"]}'
+    response['Accept-Ranges'] = 'bytes'
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['Content-Disposition'] = content_disposition_header(False, filename or os.path.basename(name))
+    return response
+
+
+def stream(request, path, stat, etag, content_type):
+    size = stat.st_size
+    byte_range = None
+    if if_range_matches(request, etag, stat.st_mtime):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if byte_range is None:
+        return FileResponse(open(path, 'rb'), content_type=content_type)
+    first, last = byte_range
+    response = StreamingHttpResponse(read_range(path, first, last - first + 1), status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {first}-{last}/{size}'
+    response['Content-Length'] = str(last - first + 1)
+    return response
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0002_evidence_types_and_media'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evidence',
+            index=models.Index(fields=['-created_at', '-id'], name='evidence_ev_created_1a83b8_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:31
+
+from django.db import migrations, models
+import evidence.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evidence', '0004_evidenceupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvidenceBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='biologicalevidenceimage',
+            name='image',
+            field=models.ImageField(storage=evidence.storage.evidence_storage, upload_to='evidence/biological/'),
+        ),
+        migrations.AlterField(
+            model_name='witnessevidence',
+            name='media_file',
+            field=models.FileField(blank=True, null=True, storage=evidence.storage.evidence_storage, upload_to='evidence/witness/'),
+        ),
+        migrations.AlterField(
+            model_name='witnessmedia',
+            name='file',
+            field=models.FileField(storage=evidence.storage.evidence_storage, upload_to='evidence/witness/media/'),
+        ),
+    ]
@@ -1,12 +1,18 @@
 """
 Evidence management: base evidence + types (witness, biological, vehicle, ID doc, other).
 All evidence: title, description, created_at (auto), recorder (auto), case relation.
-Uploads: validation, storage, media serving, size/type limits.
+Uploads: validation, storage, media serving, size/type limits; large media through chunked
+uploads (EvidenceUpload, see evidence.uploads). Media files are stored content-addressed and
+deduplicated (evidence.storage, EvidenceBlob).
 """
+import uuid
+
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
+from .storage import evidence_storage
+
 
 # Max file size for evidence uploads (10 MB)
 EVIDENCE_FILE_MAX_SIZE = 10 * 1024 * 1024
@@ -51,6 +57,7 @@ class Evidence(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['case', 'evidence_type']),
+            models.Index(fields=['-created_at', '-id']),
         ]
         verbose_name_plural = 'Evidence'
 
@@ -68,7 +75,7 @@ class WitnessEvidence(models.Model):
     transcript = models.TextField(blank=True)
     # Legacy single file/URL for backward compatibility; prefer media_files
     statement = models.TextField(blank=True)
-    media_file = models.FileField(upload_to='evidence/witness/', blank=True, null=True)
+    media_file = models.FileField(upload_to='evidence/witness/', storage=evidence_storage, blank=True, null=True)
     media_url = models.URLField(blank=True)
 
 
@@ -87,7 +94,7 @@ class WitnessMedia(models.Model):
         on_delete=models.CASCADE,
         related_name='media_files',
     )
-    file = models.FileField(upload_to='evidence/witness/media/')
+    file = models.FileField(upload_to='evidence/witness/media/', storage=evidence_storage)
     media_type = models.CharField(max_length=16, choices=MEDIA_CHOICES)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -133,7 +140,7 @@ class BiologicalEvidenceImage(models.Model):
         on_delete=models.CASCADE,
         related_name='images',
     )
-    image = models.ImageField(upload_to='evidence/biological/')
+    image = models.ImageField(upload_to='evidence/biological/', storage=evidence_storage)
     caption = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
@@ -201,3 +208,35 @@ class EvidenceLink(models.Model):
         indexes = [
             models.Index(fields=['case']),
         ]
+
+
+class EvidenceUpload(models.Model):
+    """Chunked, resumable media upload (evidence.uploads); bytes are staged on disk, not in the row."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='evidence_uploads',
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)  # bytes written so far: the offset of the next chunk
+    sha256 = models.CharField(max_length=64, blank=True)  # expected digest from the client; actual once completed
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+
+
+class EvidenceBlob(models.Model):
+    """One stored file of the content-addressed evidence store and how many rows reference it."""
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
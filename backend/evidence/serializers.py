@@ -1,7 +1,10 @@
 """
 Evidence serializers: base + witness (transcript, media), biological (images, verification), vehicle, ID doc, other.
 Validation: file types/sizes, vehicle constraint, biological >=1 image.
+Large media arrive through chunked uploads (EvidenceUploadSerializer, evidence.uploads).
 """
+import mimetypes
+
 from rest_framework import serializers
 from django.core.files.uploadedfile import UploadedFile
 
@@ -15,22 +18,33 @@ from .models import (
     VehicleEvidence,
     IDDocumentEvidence,
     EvidenceLink,
+    EvidenceUpload,
     EVIDENCE_FILE_MAX_SIZE,
     ALLOWED_IMAGE_TYPES,
     ALLOWED_VIDEO_TYPES,
     ALLOWED_AUDIO_TYPES,
 )
+from .media import media_url
+from .thumbnails import THUMBNAIL_SIZES, has_thumbnails
+from .uploads import MEDIA_TYPES, attach, max_upload_size
 
 
-def validate_file_size(file: UploadedFile, max_size: int = EVIDENCE_FILE_MAX_SIZE):
-    if file.size > max_size:
+def validate_size(size: int, max_size: int = EVIDENCE_FILE_MAX_SIZE):
+    if size > max_size:
         raise serializers.ValidationError(
             f'File size must not exceed {max_size // (1024 * 1024)} MB.'
         )
 
 
+def validate_file_size(file: UploadedFile, max_size: int = EVIDENCE_FILE_MAX_SIZE):
+    validate_size(file.size, max_size)
+
+
 def validate_witness_media_type(file: UploadedFile, media_type: str):
-    content_type = getattr(file, 'content_type', '') or ''
+    validate_media_content_type(getattr(file, 'content_type', '') or '', media_type)
+
+
+def validate_media_content_type(content_type: str, media_type: str):
     if media_type == 'image' and content_type not in ALLOWED_IMAGE_TYPES:
         raise serializers.ValidationError(
             f'Image type not allowed. Allowed: {", ".join(ALLOWED_IMAGE_TYPES)}'
@@ -45,6 +59,35 @@ def validate_witness_media_type(file: UploadedFile, media_type: str):
         )
 
 
+class EvidenceUploadSerializer(serializers.ModelSerializer):
+    """Create/inspect a chunked upload; `received` is the offset the next chunk must start at."""
+
+    class Meta:
+        model = EvidenceUpload
+        fields = ['id', 'filename', 'content_type', 'size', 'received', 'sha256', 'completed_at', 'created_at']
+        read_only_fields = ['received', 'completed_at', 'created_at']
+
+    def validate_content_type(self, value):
+        if value not in MEDIA_TYPES:
+            raise serializers.ValidationError(f'Type not allowed. Allowed: {", ".join(MEDIA_TYPES)}')
+        return value
+
+    def validate_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Size must be positive.')
+        if value > max_upload_size():
+            raise serializers.ValidationError(
+                f'File size must not exceed {max_upload_size() // (1024 * 1024)} MB.'
+            )
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and (len(value) != 64 or set(value) - set('0123456789abcdef')):
+            raise serializers.ValidationError('sha256 must be 64 hexadecimal characters.')
+        return value
+
+
 class EvidenceListSerializer(serializers.ModelSerializer):
     recorder_username = serializers.CharField(source='recorder.username', read_only=True)
     date_recorded = serializers.DateTimeField(source='created_at', read_only=True)
@@ -57,24 +100,56 @@ class EvidenceListSerializer(serializers.ModelSerializer):
         ]
 
 
-class WitnessMediaSerializer(serializers.ModelSerializer):
+class MediaURLMixin:
+    """
+    `url` of the file through the permission-checked media view (evidence.media) and `thumbnails`:
+    {small, medium} URLs of an image's thumbnails (evidence.thumbnails), null until rendered.
+    """
+    media_kind = None
+    media_field = None
+
+    def get_url(self, obj):
+        return media_url(self.media_kind, obj.pk, self.context.get('request'))
+
+    def get_thumbnails(self, obj):
+        if not has_thumbnails(getattr(obj, self.media_field)):
+            return None
+        return {size: media_url(self.media_kind, obj.pk, self.context.get('request'), size) for size in THUMBNAIL_SIZES}
+
+
+class WitnessMediaSerializer(MediaURLMixin, serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+    media_kind = 'witness-media'
+    media_field = 'file'
+
     class Meta:
         model = WitnessMedia
-        fields = ['id', 'file', 'media_type', 'uploaded_at']
+        fields = ['id', 'url', 'media_type', 'thumbnails', 'uploaded_at']
 
 
 class WitnessEvidenceSerializer(serializers.ModelSerializer):
     media_files = WitnessMediaSerializer(many=True, read_only=True)
+    media_file_url = serializers.SerializerMethodField()
 
     class Meta:
         model = WitnessEvidence
-        fields = ['transcript', 'statement', 'media_file', 'media_url', 'media_files']
+        fields = ['transcript', 'statement', 'media_file_url', 'media_url', 'media_files']
+
+    def get_media_file_url(self, obj):
+        return media_url('witness-file', obj.pk, self.context.get('request')) if obj.media_file else None
 
 
-class BiologicalEvidenceImageSerializer(serializers.ModelSerializer):
+class BiologicalEvidenceImageSerializer(MediaURLMixin, serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+    media_kind = 'biological-image'
+    media_field = 'image'
+
     class Meta:
         model = BiologicalEvidenceImage
-        fields = ['id', 'image', 'caption', 'uploaded_at']
+        fields = ['id', 'image', 'url', 'caption', 'thumbnails', 'uploaded_at']
+        extra_kwargs = {'image': {'write_only': True}}  # read through `url`, never the storage path
 
 
 class BiologicalEvidenceSerializer(serializers.ModelSerializer):
@@ -155,19 +230,29 @@ class EvidenceCreateSerializer(serializers.Serializer):
         default=list,
     )
 
+    # Witness/biological: completed chunked uploads (evidence.uploads) to attach as media/images
+    uploads = serializers.ListField(child=serializers.UUIDField(), required=False, default=list)
+
     # Vehicle: exactly one of license_plate or serial_number
-    model = serializers.CharField(required=False, allow_blank=True, default='')
-    color = serializers.CharField(required=False, allow_blank=True, default='')
-    license_plate = serializers.CharField(required=False, allow_blank=True, default='')
-    serial_number = serializers.CharField(required=False, allow_blank=True, default='')
+    model = serializers.CharField(max_length=128, required=False, allow_blank=True, default='')
+    color = serializers.CharField(max_length=64, required=False, allow_blank=True, default='')
+    license_plate = serializers.CharField(max_length=32, required=False, allow_blank=True, default='')
+    serial_number = serializers.CharField(max_length=64, required=False, allow_blank=True, default='')
 
     # ID Document
-    owner_full_name = serializers.CharField(required=False, allow_blank=True, default='')
+    owner_full_name = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
     attributes = serializers.JSONField(required=False, default=dict)
 
+    # Field named in the "at least one image" error for biological evidence
+    media_field = 'images'
+
     def validate_evidence_type(self, value):
         return value
 
+    def attached_media(self, data):
+        """Files the evidence comes with (biological evidence needs at least one)."""
+        return (data.get('images') or []) + (data.get('uploads') or [])
+
     def validate(self, data):
         request = self.context.get('request')
         if request and request.FILES:
@@ -185,13 +270,15 @@ class EvidenceCreateSerializer(serializers.Serializer):
                 if media_files:
                     data['media_files'] = media_files
         evidence_type = data['evidence_type']
+        if data.get('uploads'):
+            data = dict(data)
+            data['uploads'] = self.validate_upload_ids(data['uploads'], evidence_type)
         if evidence_type == Evidence.TYPE_BIOLOGICAL:
-            images = data.get('images') or []
-            if not images:
+            if not self.attached_media(data):
                 raise serializers.ValidationError(
-                    {'images': 'At least one image is required for biological evidence.'}
+                    {self.media_field: 'At least one image is required for biological evidence.'}
                 )
-            for img in images:
+            for img in data.get('images') or []:
                 validate_file_size(img)
         if evidence_type == Evidence.TYPE_VEHICLE:
             plate = (data.get('license_plate') or '').strip()
@@ -214,6 +301,20 @@ class EvidenceCreateSerializer(serializers.Serializer):
                     validate_witness_media_type(f, item.get('media_type') or 'image')
         return data
 
+    def validate_upload_ids(self, ids, evidence_type):
+        if evidence_type not in (Evidence.TYPE_WITNESS, Evidence.TYPE_BIOLOGICAL):
+            raise serializers.ValidationError({'uploads': 'Only witness and biological evidence take media uploads.'})
+        uploads = EvidenceUpload.objects.filter(
+            pk__in=ids, uploaded_by=self.context['request'].user, completed_at__isnull=False,
+        )
+        if len(uploads) != len(set(ids)):
+            raise serializers.ValidationError({'uploads': 'Unknown or incomplete upload.'})
+        if evidence_type == Evidence.TYPE_BIOLOGICAL and any(
+            MEDIA_TYPES[upload.content_type] != WitnessMedia.MEDIA_IMAGE for upload in uploads
+        ):
+            raise serializers.ValidationError({'uploads': 'Biological evidence only takes images.'})
+        return list(uploads)
+
     def create(self, validated_data):
         case = validated_data['case']
         evidence_type = validated_data['evidence_type']
@@ -264,9 +365,65 @@ class EvidenceCreateSerializer(serializers.Serializer):
                 attributes=validated_data.get('attributes', {}),
             )
 
+        for upload in validated_data.get('uploads') or []:
+            attach(upload, evidence)
+
         return evidence
 
 
+class ImportFileSerializer(serializers.Serializer):
+    path = serializers.CharField()
+    media_type = serializers.ChoiceField(choices=WitnessMedia.MEDIA_CHOICES, required=False)
+    caption = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class EvidenceImportItemSerializer(EvidenceCreateSerializer):
+    """
+    One item of a bulk import manifest (evidence.bulk): the rules of EvidenceCreateSerializer,
+    with `files` read from context['source'] in place of uploaded files. Makes no queries, so
+    items can be validated on worker threads; `case` is checked for all items at once.
+    """
+    case = serializers.IntegerField()
+    files = serializers.ListField(child=ImportFileSerializer(), required=False, default=list)
+    media_file = None
+    media_files = None
+    images = None
+    uploads = None
+
+    media_field = 'files'
+
+    def attached_media(self, data):
+        return data.get('files') or []
+
+    def validate(self, data):
+        data = super().validate(data)
+        files = data.get('files') or []
+        if files and data['evidence_type'] not in (Evidence.TYPE_WITNESS, Evidence.TYPE_BIOLOGICAL):
+            raise serializers.ValidationError({'files': 'Only witness and biological evidence take files.'})
+        for file in files:
+            try:
+                file['media_type'] = self.validate_import_file(file, data['evidence_type'])
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({'files': [f'{file["path"]}: {message}' for message in exc.detail]})
+        return data
+
+    def validate_import_file(self, file, evidence_type):
+        """Media type of one manifest file (given, or from its extension)."""
+        try:
+            size = self.context['source'].size(file['path'])
+        except KeyError:
+            raise serializers.ValidationError('File not found.')
+        validate_size(size, max_upload_size())
+        content_type = mimetypes.guess_type(file['path'])[0] or ''
+        media_type = file.get('media_type') or MEDIA_TYPES.get(content_type)
+        if media_type is None:
+            raise serializers.ValidationError(f'File type not allowed. Allowed: {", ".join(MEDIA_TYPES)}')
+        validate_media_content_type(content_type, media_type)
+        if evidence_type == Evidence.TYPE_BIOLOGICAL and media_type != WitnessMedia.MEDIA_IMAGE:
+            raise serializers.ValidationError('Biological evidence only takes images.')
+        return media_type
+
+
 class EvidenceLinkSerializer(serializers.ModelSerializer):
     evidence_from_title = serializers.CharField(source='evidence_from.title', read_only=True)
     evidence_to_title = serializers.CharField(source='evidence_to.title', read_only=True)
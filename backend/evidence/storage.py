@@ -0,0 +1,264 @@
+"""
+Content-addressed storage for evidence files.
+Files are stored once per content under evidence/blobs/<aa>/<bb>/<sha256><ext>, so the same clip
+attached to several cases takes disk (and backup) space once. Each blob's references from
+WitnessEvidence.media_file, WitnessMedia.file and BiologicalEvidenceImage.image are counted in
+EvidenceBlob by save/delete signals in the same transaction; deleting a row never deletes the
+blob. `manage.py collect_evidence_blobs` recounts the references, removes unreferenced blobs and
+can move files stored under their original names into the blob store.
+"""
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+BLOB_DIR = 'evidence/blobs'
+READ_SIZE = 64 * 1024
+
+
+def content_sha256(content):
+    """SHA-256 of a Django File, read in blocks (from disk when it is a temporary upload)."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'temporary_file_path'):
+        with open(content.temporary_file_path(), 'rb') as source:
+            for block in iter(lambda: source.read(READ_SIZE), b''):
+                digest.update(block)
+    else:
+        for block in content.chunks(READ_SIZE):
+            digest.update(block)
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def blob_name(digest, filename=''):
+    extension = os.path.splitext(filename)[1].lower()[:10]  # FileField names are limited to 100 characters
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_DIR + '/')
+
+
+def blob_digest(name):
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by their SHA-256 (the upload_to name only contributes its
+    extension) and writes each content once. Content with a `sha256` attribute (a verified
+    chunked upload) is not hashed again.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name  # equal names mean equal content: never suffix
+
+    def _save(self, name, content):
+        digest = getattr(content, 'sha256', None) or content_sha256(content)
+        name = blob_name(digest, name)
+        if self._touch(name):
+            return name
+        # Hard-linked into place (files already on disk directly, anything else through a temp file
+        # beside the blob): a concurrent writer of the same content finds the name taken, which
+        # means the blob is complete (FileSystemStorage would retry under get_available_name(),
+        # i.e. the same name, forever)
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if hasattr(content, 'temporary_file_path') and self._link(content.temporary_file_path(), name):
+            return name
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    temp.write(chunk)
+            self._link(temp_path, name)
+        finally:
+            os.unlink(temp_path)
+        return name
+
+    def _link(self, source, name):
+        """
+        Hard-link a complete file to the blob name (an existing blob counts as linked). False when
+        `source` is on another filesystem and has to be copied.
+        """
+        try:
+            os.link(source, self.path(name))
+        except FileExistsError:
+            pass
+        except OSError:
+            return False
+        if self.file_permissions_mode is not None:
+            os.chmod(self.path(name), self.file_permissions_mode)
+        self._touch(name)  # a staged file keeps the mtime of its last chunk
+        return True
+
+    def _touch(self, name):
+        """
+        Whether the blob exists; if so, set its mtime to now. The row reusing it may not be committed
+        yet, and collect_garbage() keeps files modified within min_age.
+        """
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def evidence_storage():
+    """Storage of the evidence file fields (a callable, so migrations do not pin its settings)."""
+    return blob_storage
+
+
+@lru_cache(maxsize=None)
+def referencing_fields():
+    """model -> name of its file field in the blob store."""
+    from .models import BiologicalEvidenceImage, WitnessEvidence, WitnessMedia
+    return {
+        WitnessEvidence: 'media_file',
+        WitnessMedia: 'file',
+        BiologicalEvidenceImage: 'image',
+    }
+
+
+def _add_reference(name, delta):
+    from .models import EvidenceBlob
+    if not is_blob(name):
+        return
+    if EvidenceBlob.objects.filter(name=name).update(ref_count=F('ref_count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            EvidenceBlob.objects.create(
+                name=name, sha256=blob_digest(name), size=evidence_storage().size(name), ref_count=delta,
+            )
+    except IntegrityError:  # created concurrently
+        EvidenceBlob.objects.filter(name=name).update(ref_count=F('ref_count') + delta)
+
+
+def add_references(names):
+    """Count references from rows inserted with bulk_create(), which sends no signals."""
+    for name, count in Counter(name for name in names if name).items():
+        _add_reference(name, count)
+
+
+def recount_references():
+    """Rebuild every EvidenceBlob.ref_count from the referencing rows. Returns {name: count}."""
+    from .models import EvidenceBlob
+    counts = {}
+    for model, field in referencing_fields().items():
+        rows = model._default_manager.filter(**{f'{field}__startswith': BLOB_DIR + '/'})
+        for name, count in rows.values_list(field).annotate(n=Count('pk')).order_by():
+            counts[name] = counts.get(name, 0) + count
+    storage = evidence_storage()
+    known = set(EvidenceBlob.objects.values_list('name', flat=True))
+    EvidenceBlob.objects.bulk_create([
+        EvidenceBlob(name=name, sha256=blob_digest(name), size=storage.size(name))
+        for name in counts if name not in known and storage.exists(name)
+    ])
+    EvidenceBlob.objects.exclude(name__in=counts).update(ref_count=0)
+    for name, count in counts.items():
+        EvidenceBlob.objects.filter(name=name).exclude(ref_count=count).update(ref_count=count)
+    return counts
+
+
+def stored_blobs():
+    """(name, modified) of every file in the blob store."""
+    storage = evidence_storage()
+    root = storage.path(BLOB_DIR)
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            yield name, datetime.fromtimestamp(os.path.getmtime(path), tz=dt_timezone.utc)
+
+
+def collect_garbage(min_age=timedelta(hours=1), dry_run=False):
+    """
+    Delete blobs that nothing references (counted rows at zero and files without a row) and
+    their thumbnails.
+    Files newer than `min_age` are kept (their row may not be committed yet). Returns
+    (deleted names, bytes freed).
+    """
+    from .models import EvidenceBlob
+    from .thumbnails import delete_thumbnails
+    recount_references()
+    storage = evidence_storage()
+    cutoff = timezone.now() - min_age
+    referenced = set(EvidenceBlob.objects.filter(ref_count__gt=0).values_list('name', flat=True))
+    deleted, freed = [], 0
+    for name, modified in stored_blobs():
+        if name in referenced or modified > cutoff:
+            continue
+        freed += storage.size(name)
+        deleted.append(name)
+        if not dry_run:
+            storage.delete(name)
+            delete_thumbnails(name)
+    if not dry_run:
+        EvidenceBlob.objects.filter(ref_count=0, created_at__lt=cutoff).delete()
+    return deleted, freed
+
+
+def import_files():
+    """
+    Move files stored under their original names into the blob store and point the rows at the
+    blobs (duplicates collapse into one blob). Returns the number of files moved.
+    """
+    storage = evidence_storage()
+    moved = {}
+    for model, field in referencing_fields().items():
+        rows = model._default_manager.exclude(**{f'{field}__startswith': BLOB_DIR + '/'}).exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        for pk, name in rows.values_list('pk', field).iterator():
+            if name not in moved:
+                if not default_storage.exists(name):
+                    continue
+                with default_storage.open(name, 'rb') as source:
+                    moved[name] = storage.save(name, source)
+                default_storage.delete(name)
+            # update() bypasses the reference signals; recount_references() below settles the counts
+            model._default_manager.filter(pk=pk).update(**{field: moved[name]})
+    recount_references()
+    return len(moved)
+
+
+# Signals
+
+def _blobs_pre_save(sender, instance, raw=False, **kwargs):
+    """Remember the stored file name so post_save can move the reference."""
+    if not raw and not instance._state.adding:
+        field = referencing_fields()[sender]
+        instance._blob_previous = sender._default_manager.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+def _blobs_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance.__dict__.pop('_blob_previous', None)
+    current = getattr(instance, referencing_fields()[sender]).name
+    if current != previous:
+        _add_reference(current, 1)
+        _add_reference(previous, -1)
+
+
+def _blobs_post_delete(sender, instance, **kwargs):
+    _add_reference(getattr(instance, referencing_fields()[sender]).name, -1)
+
+
+def connect_signals():
+    for model in referencing_fields():
+        uid = f'evidence.storage.{model._meta.label_lower}'
+        pre_save.connect(_blobs_pre_save, sender=model, dispatch_uid=uid)
+        post_save.connect(_blobs_post_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_blobs_post_delete, sender=model, dispatch_uid=uid)
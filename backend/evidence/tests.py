@@ -1,16 +1,41 @@
-from django.test import TestCase
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from accounts.views import get_tokens_for_user
 from accounts.models import Role
 from cases.models import Case
-from evidence.models import Evidence, BiologicalEvidence, BiologicalEvidenceImage
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from evidence.models import (
+    Evidence, BiologicalEvidence, BiologicalEvidenceImage, EvidenceBlob, EvidenceUpload, WitnessEvidence, WitnessMedia,
+    ALLOWED_IMAGE_TYPES,
+)
+from evidence import bulk, uploads
+from evidence.thumbnails import THUMBNAIL_SIZES, make_thumbnails, thumbnail_name
+from evidence.storage import ContentAddressedStorage, collect_garbage, evidence_storage, import_files, stored_blobs
+from PIL import Image
 
 User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class EvidenceTestCase(TestCase):
     def setUp(self):
+        self.addCleanup(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
         self.client = APIClient()
         
         # ایجاد نقش‌ها
@@ -135,4 +160,333 @@ class EvidenceTestCase(TestCase):
         }, format='multipart')
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('size', response.data['error']['message'].lower())
\ No newline at end of file
+        self.assertIn('size', response.data['error']['message'].lower())
+
+    # تست ۶: آپلود تکه‌ای و قابل ادامه فایل ویدیویی
+    @override_settings(EVIDENCE_UPLOAD={'MAX_SIZE': 1024, 'CHUNK_SIZE': 4})
+    def test_chunked_upload_resumes_and_attaches(self):
+        """تکه‌ها با offset نوشته می‌شوند؛ offset اشتباه 409 و پایان کار فایل را به مدرک شاهد وصل می‌کند"""
+        self.client.force_authenticate(user=self.officer)
+        payload = b'bodycam-0123'
+        response = self.client.post('/api/evidence/uploads/', {
+            'filename': 'bodycam.mp4', 'content_type': 'video/mp4', 'size': len(payload),
+            'sha256': hashlib.sha256(payload).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = f"/api/evidence/uploads/{response.data['id']}/"
+
+        def put(first, chunk, **headers):
+            return self.client.put(
+                url, chunk, content_type='application/octet-stream',
+                HTTP_CONTENT_RANGE=f'bytes {first}-{first + len(chunk) - 1}/{len(payload)}', **headers,
+            )
+
+        self.assertEqual(put(0, payload[:4]).data['received'], 4)
+        # تکه تکراری یا خارج از ترتیب: 409 همراه با offset ادامه
+        response = put(0, payload[:4])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['error']['offset'], 4)
+        # تکه‌ای که هم‌زمان با نوشتن تکه دیگری برسد در فایل نمی‌نویسد
+        with open(uploads.staging_path(EvidenceUpload.objects.get()), 'rb') as staged:
+            fcntl.flock(staged, fcntl.LOCK_EX)
+            response = put(4, b'XXXX')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        with open(uploads.staging_path(EvidenceUpload.objects.get()), 'rb') as staged:
+            self.assertEqual(staged.read(), payload[:4])
+        # بدنه خالی (DRF برای Content-Length صفر stream ندارد) 400 می‌گیرد
+        response = self.client.put(
+            url, b'', content_type='application/octet-stream', HTTP_CONTENT_RANGE=f'bytes 4-6/{len(payload)}',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('0 bytes', response.data['error']['message'])
+        # تکه بزرگ‌تر از حد مجاز و checksum نادرست رد می‌شوند
+        self.assertEqual(put(4, payload[4:9]).status_code, 413)
+        self.assertEqual(put(4, payload[4:8], HTTP_X_CHUNK_SHA256='0' * 64).status_code, 400)
+        self.assertEqual(self.client.get(url).data['received'], 4)
+        # پایان زودهنگام مجاز نیست
+        self.assertEqual(self.client.post(url + 'complete/', {}, format='json').status_code, 409)
+        put(4, payload[4:8], HTTP_X_CHUNK_SHA256=hashlib.sha256(payload[4:8]).hexdigest())
+        put(8, payload[8:])
+
+        evidence = Evidence.objects.create(
+            case=self.case, evidence_type=Evidence.TYPE_WITNESS, title='ویدیو', recorder=self.officer,
+        )
+        response = self.client.post(url + 'complete/', {'evidence': evidence.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['sha256'], hashlib.sha256(payload).hexdigest())
+        media = WitnessMedia.objects.get(witness_evidence__evidence=evidence)
+        self.assertEqual(media.media_type, WitnessMedia.MEDIA_VIDEO)
+        with media.file.open('rb') as stored:
+            self.assertEqual(stored.read(), payload)
+        self.assertFalse(EvidenceUpload.objects.exists())
+
+        # اگر تراکنش بیرونی شکست بخورد، آپلود و بایت‌هایش برای تلاش دوباره می‌مانند
+        upload = EvidenceUpload.objects.create(
+            uploaded_by=self.officer, filename='retry.mp4', content_type='video/mp4', size=5, received=5,
+            sha256=hashlib.sha256(b'retry').hexdigest(), completed_at=timezone.now(),
+        )
+        path = uploads.staging_path(upload)
+        with open(path, 'wb') as staged:
+            staged.write(b'retry')
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                uploads.attach(EvidenceUpload.objects.get(pk=upload.pk), evidence)
+                raise RuntimeError('later upload failed')
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            uploads.attach(EvidenceUpload.objects.get(pk=upload.pk), evidence)
+        self.assertFalse(os.path.exists(path))
+
+        # مدرک زیستی با تصویری که از قبل تکه‌ای آپلود شده ساخته می‌شود
+        buffer = BytesIO()
+        Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+        png = buffer.getvalue()
+        upload = EvidenceUpload.objects.create(
+            uploaded_by=self.officer, filename='blood.png', content_type='image/png', size=len(png),
+        )
+        put_url = f'/api/evidence/uploads/{upload.pk}/'
+        with self.settings(EVIDENCE_UPLOAD={'MAX_SIZE': 1024, 'CHUNK_SIZE': 1024}):
+            self.client.put(
+                put_url, png, content_type='application/octet-stream', HTTP_CONTENT_RANGE=f'bytes 0-{len(png) - 1}/{len(png)}',
+            )
+        self.assertEqual(self.client.post(put_url + 'complete/', {}, format='json').status_code, 200)
+        response = self.client.post('/api/evidence/', {
+            'case': self.case.id, 'evidence_type': 'biological', 'title': 'نمونه خون', 'uploads': [str(upload.pk)],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(BiologicalEvidenceImage.objects.filter(biological_evidence__evidence__title='نمونه خون').count(), 1)
+
+    # تست ۷: ذخیره‌سازی یکتا بر اساس محتوا و پاک‌سازی فایل‌های بی‌مرجع
+    def test_content_addressed_store_deduplicates(self):
+        """یک کلیپ در چند پرونده یک بار ذخیره می‌شود؛ شمارش ارجاع‌ها و جمع‌آوری زباله درست کار می‌کند"""
+        clip = b'cctv-clip-bytes'
+        items = []
+        for i in range(3):
+            case = Case.objects.create(title=f'پرونده {i}', created_by=self.officer)
+            evidence = Evidence.objects.create(case=case, evidence_type=Evidence.TYPE_WITNESS, title='CCTV')
+            witness = WitnessEvidence.objects.create(evidence=evidence)
+            items.append(WitnessMedia.objects.create(
+                witness_evidence=witness, media_type=WitnessMedia.MEDIA_VIDEO,
+                file=SimpleUploadedFile(f'camera-{i}.mp4', clip, content_type='video/mp4'),
+            ))
+        digest = hashlib.sha256(clip).hexdigest()
+        self.assertEqual({item.file.name for item in items}, {f'evidence/blobs/{digest[:2]}/{digest[2:4]}/{digest}.mp4'})
+        self.assertEqual(len(list(stored_blobs())), 1)
+        blob = EvidenceBlob.objects.get()
+        self.assertEqual((blob.ref_count, blob.size), (3, len(clip)))
+
+        # حذف ردیف فایل را پاک نمی‌کند؛ فقط شمارش کم می‌شود
+        items[0].delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(collect_garbage(min_age=timedelta(0)), ([], 0))
+
+        # فایل‌های قدیمی با نام اصلی به مخزن منتقل و تکراری‌ها ادغام می‌شوند
+        legacy = default_storage.save('evidence/witness/media/old.mp4', ContentFile(clip))
+        WitnessMedia.objects.filter(pk=items[1].pk).update(file=legacy)
+        self.assertEqual(import_files(), 1)
+        self.assertFalse(default_storage.exists(legacy))
+        items[1].refresh_from_db()
+        self.assertEqual(items[1].file.name, blob.name)
+
+        WitnessMedia.objects.all().delete()
+        # فایل بی‌مرجعی که دوباره آپلود شده، تا min_age بعد از آپلود جدید پاک نمی‌شود
+        os.utime(evidence_storage().path(blob.name), (0, 0))
+        self.assertEqual(evidence_storage().save('again.mp4', ContentFile(clip)), blob.name)
+        self.assertEqual(collect_garbage(min_age=timedelta(hours=1)), ([], 0))
+        # نویسنده هم‌زمانی که همان محتوا را دیرتر تمام می‌کند، همان فایل را برمی‌گرداند
+        with mock.patch.object(ContentAddressedStorage, '_touch', side_effect=[False, True]) as touch:
+            self.assertEqual(evidence_storage().save('race.mp4', ContentFile(clip)), blob.name)
+        self.assertEqual(touch.call_count, 2)
+        self.assertEqual(os.listdir(os.path.dirname(evidence_storage().path(blob.name))), [os.path.basename(blob.name)])
+        deleted, freed = collect_garbage(min_age=timedelta(0))
+        self.assertEqual((deleted, freed), ([blob.name], len(clip)))
+        self.assertEqual(list(stored_blobs()), [])
+        self.assertFalse(EvidenceBlob.objects.exists())
+
+    # تست ۸: ساخت تصاویر بندانگشتی برای گالری مدارک
+    def test_thumbnails_rendered_once_per_content(self):
+        """پس از آپلود تصویر بندانگشتی در اندازه‌های مختلف ساخته و آدرس آن در سریالایزر برگردانده می‌شود"""
+        buffer = BytesIO()
+        Image.new('RGB', (2400, 1200), (200, 30, 30)).save(buffer, 'PNG')
+        photo = buffer.getvalue()
+        self.client.force_authenticate(user=self.officer)
+        evidence = Evidence.objects.create(case=self.case, evidence_type=Evidence.TYPE_BIOLOGICAL, title='لکه خون')
+        bio = BiologicalEvidence.objects.create(evidence=evidence)
+        BiologicalEvidenceImage.objects.create(
+            biological_evidence=bio, image=SimpleUploadedFile('stain.png', photo, content_type='image/png'),
+        )
+        image = self.client.get(f'/api/evidence/{evidence.pk}/').data['biological_detail']['images'][0]
+        self.assertEqual(set(image['thumbnails']), {'small', 'medium'})
+        response = self.client.get(image['thumbnails']['small'])
+        with Image.open(BytesIO(b''.join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (160, 80))
+        self.assertLess(int(response['Content-Length']), len(photo) // 10)
+
+        # همان تصویر در پرونده‌ای دیگر دوباره پردازش نمی‌شود
+        with mock.patch('evidence.thumbnails.render') as render:
+            BiologicalEvidenceImage.objects.create(
+                biological_evidence=bio, image=SimpleUploadedFile('copy.png', photo, content_type='image/png'),
+            )
+        render.assert_not_called()
+
+        # دو job هم‌زمان برای یک تصویر: job دیگر درست پس از بررسی این job می‌نویسد؛ فایل با نام دیگری نمی‌ماند
+        name = BiologicalEvidenceImage.objects.first().image.name
+        exists, checked = default_storage.exists, set()
+
+        def checked_before_other_job(target):
+            if target in checked:
+                return exists(target)
+            checked.add(target)
+            return False
+
+        with mock.patch('evidence.thumbnails.missing_sizes', return_value=list(THUMBNAIL_SIZES)), \
+                mock.patch.object(default_storage, 'exists', side_effect=checked_before_other_job):
+            make_thumbnails(name)
+        directory = os.path.dirname(default_storage.path(thumbnail_name(name, 'small')))
+        self.assertEqual(sorted(os.listdir(directory)), sorted(os.path.basename(thumbnail_name(name, size)) for size in THUMBNAIL_SIZES))
+
+    # تست ۹: ارائه فایل مدرک با بررسی دسترسی، درخواست بازه‌ای و شرطی
+    def test_media_view_checks_access_and_serves_ranges(self):
+        """فقط افراد مرتبط با پرونده فایل را می‌بینند؛ Range پاسخ 206 و ETag پاسخ 304 می‌دهد"""
+        clip = bytes(range(256)) * 4
+        evidence = Evidence.objects.create(
+            case=self.case, evidence_type=Evidence.TYPE_WITNESS, title='ویدیو', recorder=self.officer,
+        )
+        media = WitnessMedia.objects.create(
+            witness_evidence=WitnessEvidence.objects.create(evidence=evidence), media_type=WitnessMedia.MEDIA_VIDEO,
+            file=SimpleUploadedFile('clip.mp4', clip, content_type='video/mp4'),
+        )
+        url = f'/api/evidence/media/witness-media/{media.pk}/'
+
+        # کاربر بدون ارتباط با پرونده دسترسی ندارد؛ توکن در query string پذیرفته می‌شود
+        stranger = User.objects.create_user(username='stranger', email='stranger@test.com', password=None)
+        stranger.roles.add(self.detective_role)
+        self.client.force_authenticate(user=stranger)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        # جزئیات مدرک مسیر فایل در مخزن را لو نمی‌دهد، فقط آدرس نمای کنترل‌شده
+        item = self.client.get(f'/api/evidence/{evidence.pk}/').data['witness_detail']['media_files'][0]
+        self.assertEqual(set(item) & {'file', 'image'}, set())
+        self.assertTrue(item['url'].endswith(url))
+        self.client.force_authenticate(user=None)
+        response = self.client.get(url, {'token': get_tokens_for_user(self.officer)['access']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), clip)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        self.client.force_authenticate(user=self.officer)
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(clip)}')
+        self.assertEqual(b''.join(response.streaming_content), clip[100:200])
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-24').streaming_content), clip[-24:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(clip)}-').status_code, 416)
+        # If-Range با ETag قدیمی کل فایل را برمی‌گرداند
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"').status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(etag, f'"{hashlib.sha256(clip).hexdigest()}"')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.settings(EVIDENCE_MEDIA={'MODE': 'x-accel-redirect', 'ACCEL_PREFIX': '/protected-media/'}):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + media.file.name)
+        self.assertEqual(response.content, b'')
+
+    # تست ۱۰: ورود دسته‌ای مدارک از فایل manifest و آرشیو zip
+    def test_bulk_import_from_manifest_and_archive(self):
+        """همه اقلام در چند دسته ثبت می‌شوند؛ یک رکورد ممیزی و یک اعلان برای کارآگاه؛ manifest نامعتبر هیچ چیزی نمی‌سازد"""
+        import json
+        import zipfile
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.models import AuditLog, Notification, SearchDocument, StatCounter
+        from core.stats import recompute_counters
+
+        detective = User.objects.create_user(username='detective', email='detective@test.com', password=None)
+        detective.roles.add(self.detective_role)
+        Case.objects.filter(pk=self.case.pk).update(assigned_detective=detective)
+        buffer = BytesIO()
+        Image.new('RGB', (400, 300), (20, 120, 40)).save(buffer, 'PNG')
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('photos/stain.png', buffer.getvalue())
+            zf.writestr('clips/cctv.mp4', b'cctv-clip-bytes')
+
+        def manifest(items):
+            return SimpleUploadedFile('manifest.jsonl', '\n'.join(json.dumps(item) for item in items).encode())
+
+        def post(items):
+            archive.seek(0)
+            return self.client.post('/api/evidence/import/', {
+                'manifest': manifest(items),
+                'archive': SimpleUploadedFile('files.zip', archive.getvalue(), content_type='application/zip'),
+            }, format='multipart')
+
+        def witnesses(n):
+            return [
+                {'case': self.case.pk, 'evidence_type': 'witness', 'title': f'شاهد {i}', 'transcript': 'ماشین قرمز',
+                 'files': [{'path': 'clips/cctv.mp4'}]}
+                for i in range(n)
+            ]
+
+        recompute_counters()
+        self.client.force_authenticate(user=self.officer)
+        response = post(witnesses(3) + [
+            {'case': self.case.pk, 'evidence_type': 'biological', 'title': 'لکه خون',
+             'files': [{'path': 'photos/stain.png', 'caption': 'نمونه'}]},
+            {'case': self.case.pk, 'evidence_type': 'vehicle', 'title': 'خودرو', 'license_plate': '12ب345'},
+            {'case': self.case.pk, 'evidence_type': 'id_document', 'title': 'کارت ملی', 'owner_full_name': 'علی'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['created'], 6)
+        self.assertEqual(Evidence.objects.filter(recorder=self.officer).count(), 6)
+        self.assertEqual(WitnessMedia.objects.values('file').distinct().count(), 1)
+        self.assertEqual(BiologicalEvidenceImage.objects.get().caption, 'نمونه')
+        self.assertEqual(EvidenceBlob.objects.get(name=WitnessMedia.objects.first().file.name).ref_count, 3)
+        self.assertEqual(StatCounter.objects.get(name='evidence_total').value, 6)
+        self.assertEqual(SearchDocument.objects.filter(kind=SearchDocument.KIND_EVIDENCE).count(), 6)
+        self.assertEqual(AuditLog.objects.filter(model_name='Evidence').count(), 1)
+        notification = Notification.objects.get(recipient=detective)
+        self.assertIn('6', notification.message)
+
+        # تعداد کوئری‌ها با تعداد اقلام رشد نمی‌کند
+        with CaptureQueriesContext(connection) as small:
+            post(witnesses(2))
+        with CaptureQueriesContext(connection) as large:
+            post(witnesses(20))
+        self.assertEqual(len(small), len(large))
+
+        # یک قلم نامعتبر کل ورود را رد می‌کند و همه خطاها گزارش می‌شوند
+        count = Evidence.objects.count()
+        response = post(witnesses(1) + [
+            {'case': self.case.pk, 'evidence_type': 'vehicle', 'title': 'خودرو'},
+            {'case': 999999, 'evidence_type': 'other', 'title': 'نامعلوم'},
+            {'case': self.case.pk, 'evidence_type': 'biological', 'title': 'بدون تصویر',
+             'files': [{'path': 'clips/cctv.mp4'}]},
+            # نوع رسانه اعلام‌شده باید با نوع فایل بخواند
+            {'case': self.case.pk, 'evidence_type': 'witness', 'title': 'عکس؟',
+             'files': [{'path': 'clips/cctv.mp4', 'media_type': 'image'}]},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+        errors = response.data['error']['items']
+        self.assertEqual([error['line'] for error in errors], [2, 3, 4, 5])
+        self.assertEqual(errors[3]['message'], f'files: clips/cctv.mp4: Image type not allowed. Allowed: {", ".join(ALLOWED_IMAGE_TYPES)}')
+        self.assertEqual(Evidence.objects.count(), count)
+
+        # اگر دسته‌ای شکست بخورد، دسته‌های ثبت‌شده قبلی رکورد ممیزی دارند
+        create_batch = bulk.create_batch
+
+        def second_batch_fails(items, user, stored):
+            if Evidence.objects.count() > count:
+                raise DatabaseError('batch failed')
+            return create_batch(items, user, stored)
+
+        archive.seek(0)
+        lines = [json.dumps(item).encode() for item in witnesses(3)]
+        with mock.patch('evidence.bulk.create_batch', side_effect=second_batch_fails), self.assertRaises(DatabaseError):
+            bulk.import_evidence(bulk.read_manifest(lines), bulk.ArchiveSource(archive), self.officer, batch_size=2)
+        entry = AuditLog.objects.filter(model_name='Evidence').latest('pk')
+        self.assertEqual(entry.extra_data['evidence_ids'], list(Evidence.objects.order_by('pk').values_list('pk', flat=True))[-2:])
+        self.assertIn('1 not imported', entry.description)
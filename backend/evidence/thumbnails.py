@@ -0,0 +1,123 @@
+"""
+Thumbnails of evidence images for galleries and the detective board.
+When an image is saved (biological images, witness image media) an outbox job renders every size
+in THUMBNAIL_SIZES with Pillow; `manage.py run_worker` runs these jobs on its thread pool. Files
+live next to the blob store under evidence/thumbnails/<aa>/<bb>/<sha256>-<size>.jpg: they are
+keyed by content, so an image attached to several cases is rendered once, and a thumbnail that
+exists is never rendered again. Two jobs racing on one image both write a temp file and rename it
+over the same name, so neither leaves a suffixed copy behind. Serializers link them through the evidence media view (evidence.media)
+once has_thumbnails() is true.
+"""
+import logging
+import os
+import tempfile
+from io import BytesIO
+
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.outbox import job
+from .storage import BLOB_DIR, blob_digest, evidence_storage, is_blob, referencing_fields
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'evidence/thumbnails'
+THUMBNAIL_SIZES = {'small': 160, 'medium': 640}  # longest side in pixels
+THUMBNAIL_QUALITY = 80
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+
+def thumbnail_name(name, size):
+    digest = blob_digest(name)
+    return f'{THUMBNAIL_DIR}/{digest[:2]}/{digest[2:4]}/{digest}-{size}.jpg'
+
+
+def missing_sizes(name):
+    return [size for size in THUMBNAIL_SIZES if not default_storage.exists(thumbnail_name(name, size))]
+
+
+def render(source, max_side):
+    """JPEG bytes of `source` scaled to fit max_side x max_side."""
+    image = source.copy()
+    image.thumbnail((max_side, max_side))
+    out = BytesIO()
+    image.save(out, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+@job
+def make_thumbnails(name):
+    """Render the missing thumbnails of one stored image (outbox job)."""
+    sizes = missing_sizes(name)
+    if not sizes:
+        return
+    try:
+        with evidence_storage().open(name, 'rb') as original:
+            image = Image.open(original)
+            image.draft('RGB', (max(THUMBNAIL_SIZES.values()),) * 2)  # JPEG: decode at reduced scale
+            source = ImageOps.exif_transpose(image).convert('RGB')
+    except (UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        # Not retried: the same bytes will not become a readable image
+        logger.warning('No thumbnails for %s: %s', name, exc)
+        return
+    for size in sizes:
+        target = thumbnail_name(name, size)
+        if not default_storage.exists(target):
+            write_thumbnail(target, render(source, THUMBNAIL_SIZES[size]))
+
+
+def write_thumbnail(name, data):
+    """
+    Write through a temp file renamed over `name`: Storage.save() would give a concurrent writer
+    of the same thumbnail a suffixed name that nothing references or deletes.
+    """
+    path = default_storage.path(name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as temp:
+            temp.write(data)
+        if default_storage.file_permissions_mode is not None:
+            os.chmod(temp_path, default_storage.file_permissions_mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def is_image(name):
+    return is_blob(name) and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def has_thumbnails(file):
+    """Whether every thumbnail of a stored image has been rendered."""
+    return bool(file) and is_image(file.name) and not missing_sizes(file.name)
+
+
+def delete_thumbnails(name):
+    for size in THUMBNAIL_SIZES:
+        default_storage.delete(thumbnail_name(name, size))
+
+
+def stored_images():
+    """Names of every image referenced by evidence rows."""
+    names = set()
+    for model, field in referencing_fields().items():
+        rows = model._default_manager.filter(**{f'{field}__startswith': BLOB_DIR + '/'})
+        names.update(name for name in rows.values_list(field, flat=True).distinct() if is_image(name))
+    return names
+
+
+# Signals
+
+def _thumbnails_post_save(sender, instance, raw=False, **kwargs):
+    name = getattr(instance, referencing_fields()[sender]).name
+    if not raw and is_image(name) and missing_sizes(name):
+        make_thumbnails.delay(name)
+
+
+def connect_signals():
+    for model in referencing_fields():
+        post_save.connect(_thumbnails_post_save, sender=model, dispatch_uid=f'evidence.thumbnails.{model._meta.label_lower}')
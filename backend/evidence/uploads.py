@@ -0,0 +1,219 @@
+"""
+Chunked, resumable uploads of evidence media (witness media, biological images).
+POST creates an EvidenceUpload; each PUT carries the next chunk with its offset in Content-Range
+(`bytes <first>-<last>/<size>`) and is streamed from the request straight into a staging file
+under MEDIA_ROOT, READ_SIZE bytes at a time, hashing as it goes. Memory use is therefore the same
+for a 1 MB photo and a 2 GB body-cam video. A chunk that does not start at the stored offset, or
+arrives while another chunk of the upload is being written (an exclusive lock on the staging
+file), gets 409 with the offset to resume from. Completing the upload hashes the staged file (SHA-256, read in
+blocks), checks it against the digest the client announced, and attach() moves the file into
+the content-addressed store (evidence.storage) as a WitnessMedia or BiologicalEvidenceImage
+without reading it into memory.
+"""
+import fcntl
+import hashlib
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    ALLOWED_AUDIO_TYPES,
+    ALLOWED_IMAGE_TYPES,
+    ALLOWED_VIDEO_TYPES,
+    BiologicalEvidence,
+    BiologicalEvidenceImage,
+    Evidence,
+    EvidenceUpload,
+    WitnessEvidence,
+    WitnessMedia,
+)
+
+STAGING_DIR = os.path.join('evidence', 'uploads')
+READ_SIZE = 64 * 1024
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+MEDIA_TYPES = {
+    **{content_type: WitnessMedia.MEDIA_IMAGE for content_type in ALLOWED_IMAGE_TYPES},
+    **{content_type: WitnessMedia.MEDIA_VIDEO for content_type in ALLOWED_VIDEO_TYPES},
+    **{content_type: WitnessMedia.MEDIA_AUDIO for content_type in ALLOWED_AUDIO_TYPES},
+}
+
+
+class UploadError(Exception):
+    """Rejected upload operation; views turn it into an error response with status_code."""
+
+    def __init__(self, message, status_code=400, offset=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.offset = offset
+
+
+def upload_settings():
+    return getattr(settings, 'EVIDENCE_UPLOAD', {})
+
+
+def max_upload_size():
+    return upload_settings().get('MAX_SIZE', 2 * 1024 * 1024 * 1024)
+
+
+def max_chunk_size():
+    return upload_settings().get('CHUNK_SIZE', 8 * 1024 * 1024)
+
+
+def staging_path(upload):
+    return os.path.join(settings.MEDIA_ROOT, STAGING_DIR, f'{upload.pk}.part')
+
+
+def parse_content_range(header, size):
+    """(first byte, length) of a chunk from its Content-Range header."""
+    match = CONTENT_RANGE.match((header or '').strip())
+    if not match:
+        raise UploadError('Content-Range header must be "bytes <first>-<last>/<size>".')
+    first, last, total = (int(group) for group in match.groups())
+    if total != size or last < first or last >= size:
+        raise UploadError(f'Content-Range does not fit an upload of {size} bytes.')
+    length = last - first + 1
+    if length > max_chunk_size():
+        raise UploadError(f'Chunks must not exceed {max_chunk_size()} bytes.', 413)
+    return first, length
+
+
+def write_chunk(upload, stream, first, length, checksum=''):
+    """
+    Stream `length` bytes from `stream` (None for an empty body) into the staging file at offset
+    `first` and advance upload.received. Returns the chunk's SHA-256; a mismatching `checksum` rejects the chunk.
+    Writers of one upload are serialized by an exclusive lock on its staging file: a request
+    that finds it locked gets 409 instead of writing into the same bytes.
+    """
+    if upload.completed_at:
+        raise UploadError('Upload is already completed.', 409, upload.received)
+    if first != upload.received:
+        raise UploadError(f'Expected a chunk starting at byte {upload.received}.', 409, upload.received)
+    path = staging_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b') as out:
+        try:
+            fcntl.flock(out, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('Another chunk of this upload is being written.', 409, upload.received)
+        # Under the lock: a chunk written meanwhile has moved the offset on
+        upload.refresh_from_db(fields=['received', 'completed_at'])
+        if upload.completed_at or first != upload.received:
+            raise UploadError(f'Expected a chunk starting at byte {upload.received}.', 409, upload.received)
+        digest = hashlib.sha256()
+        written = 0
+        out.seek(first)
+        while written < length:
+            block = stream.read(min(READ_SIZE, length - written)) if stream is not None else b''
+            if not block:
+                break
+            digest.update(block)
+            out.write(block)
+            written += len(block)
+        out.truncate()
+        if written != length:
+            raise UploadError(f'Chunk body has {written} bytes, Content-Range announced {length}.', 400, upload.received)
+        if checksum and checksum.lower() != digest.hexdigest():
+            raise UploadError('Chunk SHA-256 does not match X-Chunk-SHA256.', 400, upload.received)
+        out.flush()
+        # Conditional: matches nothing if the upload was discarded meanwhile
+        advanced = EvidenceUpload.objects.filter(pk=upload.pk, received=first).update(
+            received=first + length, updated_at=timezone.now(),
+        )
+    if not advanced:
+        upload.refresh_from_db(fields=['received'])
+        raise UploadError(f'Expected a chunk starting at byte {upload.received}.', 409, upload.received)
+    upload.received = first + length
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as staged:
+        for block in iter(lambda: staged.read(READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete(upload):
+    """Verify size and SHA-256 of the staged file and mark the upload completed."""
+    if upload.completed_at:
+        return upload
+    if upload.received != upload.size:
+        raise UploadError(f'Upload has {upload.received} of {upload.size} bytes.', 409, upload.received)
+    digest = file_sha256(staging_path(upload))
+    if upload.sha256 and upload.sha256.lower() != digest:
+        raise UploadError('File SHA-256 does not match the digest given when the upload was created.')
+    upload.sha256 = digest
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['sha256', 'completed_at', 'updated_at'])
+    return upload
+
+
+class StagedFile(File):
+    """A staged upload; temporary_file_path() lets the blob store link it instead of copying."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def attach(upload, evidence, caption=''):
+    """
+    Move a completed upload into storage as media of `evidence` (WitnessMedia for witness
+    evidence, BiologicalEvidenceImage for biological evidence) and delete the upload.
+    """
+    if not upload.completed_at:
+        raise UploadError('Upload is not completed.', 409, upload.received)
+    media_type = MEDIA_TYPES.get(upload.content_type)
+    with transaction.atomic():
+        if evidence.evidence_type == Evidence.TYPE_WITNESS:
+            witness, _ = WitnessEvidence.objects.get_or_create(evidence=evidence)
+            media = WitnessMedia(witness_evidence=witness, media_type=media_type)
+            field = media.file
+        elif evidence.evidence_type == Evidence.TYPE_BIOLOGICAL:
+            if media_type != WitnessMedia.MEDIA_IMAGE:
+                raise UploadError('Biological evidence only takes images.')
+            biological, _ = BiologicalEvidence.objects.get_or_create(evidence=evidence)
+            media = BiologicalEvidenceImage(biological_evidence=biological, caption=caption)
+            field = media.image
+        else:
+            raise UploadError('Only witness and biological evidence take media uploads.')
+        with open(staging_path(upload), 'rb') as staged:
+            content = StagedFile(staged, upload.filename)
+            content.sha256 = upload.sha256  # verified by complete(); the blob store need not hash again
+            field.save(upload.filename, content, save=True)
+        discard(upload)
+    return media
+
+
+def remove_staged(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def discard(upload):
+    """
+    Delete an upload; its staged bytes are removed once that commits, so a rolled back attach()
+    (e.g. a later upload of the same evidence failing) leaves the upload there to retry.
+    """
+    path = staging_path(upload)
+    upload.delete()
+    transaction.on_commit(lambda: remove_staged(path))
+
+
+def purge_stale(hours):
+    """Discard uploads not touched for `hours` hours. Returns how many were removed."""
+    stale = EvidenceUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=hours))
+    count = 0
+    for upload in stale.iterator():
+        discard(upload)
+        count += 1
+    return count
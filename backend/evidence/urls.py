@@ -3,6 +3,11 @@ from . import views
 
 urlpatterns = [
     path('evidence/', views.EvidenceListCreateView.as_view(), name='evidence-list-create'),
+    path('evidence/uploads/', views.EvidenceUploadCreateView.as_view(), name='evidence-upload-create'),
+    path('evidence/uploads/<uuid:pk>/', views.EvidenceUploadDetailView.as_view(), name='evidence-upload-detail'),
+    path('evidence/uploads/<uuid:pk>/complete/', views.EvidenceUploadCompleteView.as_view(), name='evidence-upload-complete'),
+    path('evidence/import/', views.EvidenceImportView.as_view(), name='evidence-import'),
+    path('evidence/media/<str:kind>/<int:pk>/', views.EvidenceMediaView.as_view(), name='evidence-media'),
     path('evidence/<int:pk>/', views.EvidenceDetailView.as_view(), name='evidence-detail'),
     path('evidence/<int:pk>/biological-review/', views.BiologicalEvidenceReviewView.as_view(), name='biological-review'),
     path('evidence/<int:pk>/biological-add-image/', views.BiologicalEvidenceAddImageView.as_view(), name='biological-add-image'),
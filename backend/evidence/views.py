@@ -1,15 +1,20 @@
 """
-Evidence CRUD, biological evidence review (forensic doctor), evidence linking.
+Evidence CRUD, biological evidence review (forensic doctor), evidence linking, chunked media uploads,
+permission-checked media serving, bulk import.
 """
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 
+from django.core.files.storage import default_storage
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from .models import Evidence, BiologicalEvidence, BiologicalEvidenceImage, EvidenceLink
+from .models import Evidence, BiologicalEvidence, BiologicalEvidenceImage, EvidenceLink, EvidenceUpload
 from .serializers import (
     EvidenceListSerializer,
     EvidenceDetailSerializer,
@@ -17,7 +22,12 @@ from .serializers import (
     EvidenceLinkSerializer,
     EvidenceLinkCreateSerializer,
     BiologicalEvidenceImageSerializer,
+    EvidenceUploadSerializer,
+    WitnessMediaSerializer,
 )
+from . import bulk, media, uploads
+from .thumbnails import THUMBNAIL_SIZES, thumbnail_name
+from accounts.authentication import QueryTokenJWTAuthentication
 from accounts.permissions import IsOfficerOrAbove, IsForensicDoctor
 from core.utils import log_audit, notify
 
@@ -25,6 +35,7 @@ from core.utils import log_audit, notify
 class EvidenceListCreateView(generics.ListCreateAPIView):
     """List evidence (filter by case); create evidence (officer/detective)."""
     permission_classes = [IsAuthenticated, IsOfficerOrAbove]
+    cursor_field = 'created_at'  # ?pagination=cursor (core.pagination)
     serializer_class = EvidenceListSerializer
 
     def get_queryset(self):
@@ -43,8 +54,8 @@ class EvidenceListCreateView(generics.ListCreateAPIView):
         evidence = serializer.save()
         log_audit(self.request.user, 'create', 'Evidence', evidence.pk, f'Evidence added: {evidence.title}')
         if evidence.case.assigned_detective_id:
-            notify(
-                evidence.case.assigned_detective,
+            notify.delay(
+                evidence.case.assigned_detective_id,
                 'New evidence added',
                 f'Case #{evidence.case_id}: {evidence.title}',
                 'evidence_added',
@@ -85,8 +96,8 @@ class BiologicalEvidenceReviewView(APIView):
         bio.save()
         log_audit(request.user, 'update', 'BiologicalEvidence', bio.pk, f'Verification {status_val}')
         if evidence.case.assigned_detective_id:
-            notify(
-                evidence.case.assigned_detective,
+            notify.delay(
+                evidence.case.assigned_detective_id,
                 f'Biological evidence {status_val}',
                 evidence.title,
                 'biological_evidence_reviewed',
@@ -109,6 +120,142 @@ class BiologicalEvidenceAddImageView(APIView):
         return Response(ser.data, status=status.HTTP_201_CREATED)
 
 
+def upload_error(exc):
+    error = {'message': exc.message}
+    if exc.offset is not None:
+        error['offset'] = exc.offset
+    return Response({'success': False, 'error': error}, status=exc.status_code)
+
+
+class EvidenceUploadCreateView(generics.CreateAPIView):
+    """Start a chunked upload: {filename, content_type, size, sha256?}. See evidence.uploads."""
+    permission_classes = [IsAuthenticated, IsOfficerOrAbove]
+    serializer_class = EvidenceUploadSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(uploaded_by=self.request.user)
+
+
+class EvidenceUploadDetailView(APIView):
+    """
+    GET: upload state (`received` is the offset to resume from).
+    PUT: next chunk as the raw body with `Content-Range: bytes <first>-<last>/<size>` and an
+    optional `X-Chunk-SHA256`; the body is streamed to disk, never parsed or buffered.
+    DELETE: abort and remove the staged bytes.
+    """
+    permission_classes = [IsAuthenticated, IsOfficerOrAbove]
+
+    def get_upload(self, request, pk):
+        return get_object_or_404(EvidenceUpload, pk=pk, uploaded_by=request.user)
+
+    def get(self, request, pk):
+        return Response(EvidenceUploadSerializer(self.get_upload(request, pk)).data)
+
+    def put(self, request, pk):
+        upload = self.get_upload(request, pk)
+        try:
+            first, length = uploads.parse_content_range(request.headers.get('Content-Range'), upload.size)
+            chunk_sha256 = uploads.write_chunk(
+                upload, request.stream, first, length, request.headers.get('X-Chunk-SHA256', ''),
+            )
+        except uploads.UploadError as exc:
+            return upload_error(exc)
+        data = EvidenceUploadSerializer(upload).data
+        data['chunk_sha256'] = chunk_sha256
+        return Response(data)
+
+    def delete(self, request, pk):
+        uploads.discard(self.get_upload(request, pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class EvidenceUploadCompleteView(APIView):
+    """
+    Verify the whole file (size, SHA-256) once every chunk is in. With `evidence` (and optional
+    `caption`) the file is attached to that witness/biological evidence right away; otherwise pass
+    the upload id in `uploads` when creating evidence.
+    """
+    permission_classes = [IsAuthenticated, IsOfficerOrAbove]
+
+    def post(self, request, pk):
+        upload = get_object_or_404(EvidenceUpload, pk=pk, uploaded_by=request.user)
+        evidence_id = request.data.get('evidence')
+        evidence = get_object_or_404(Evidence, pk=evidence_id) if evidence_id else None
+        try:
+            uploads.complete(upload)
+            if evidence is None:
+                return Response(EvidenceUploadSerializer(upload).data)
+            sha256 = upload.sha256
+            media = uploads.attach(upload, evidence, request.data.get('caption') or '')
+        except uploads.UploadError as exc:
+            return upload_error(exc)
+        log_audit(request.user, 'create', type(media).__name__, media.pk, f'Uploaded {upload.filename} to evidence #{evidence.pk}')
+        if isinstance(media, BiologicalEvidenceImage):
+            data = BiologicalEvidenceImageSerializer(media).data
+        else:
+            data = WitnessMediaSerializer(media).data
+        data['sha256'] = sha256
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class EvidenceImportView(APIView):
+    """
+    Bulk import (multipart): `manifest` (JSON lines, one evidence item per line) and optional
+    `archive` (zip holding the files the items name). All or nothing: any invalid item returns 400
+    with every item error and creates nothing. See evidence.bulk.
+    """
+    permission_classes = [IsAuthenticated, IsOfficerOrAbove]
+
+    def post(self, request):
+        manifest = request.FILES.get('manifest')
+        if manifest is None:
+            return Response({'success': False, 'error': {'message': 'manifest file is required.'}}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            source = bulk.ArchiveSource(request.FILES['archive']) if 'archive' in request.FILES else bulk.NoFiles()
+            created = bulk.import_evidence(bulk.read_manifest(manifest), source, request.user)
+        except bulk.ManifestError as exc:
+            return Response(
+                {'success': False, 'error': {'message': str(exc), 'items': exc.errors}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {'success': True, 'data': {'created': len(created), 'evidence_ids': [obj.pk for obj in created]}},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class EvidenceMediaView(APIView):
+    """
+    GET /api/evidence/media/<kind>/<id>/[?size=small|medium] — a witness media file
+    (witness-media), legacy witness file (witness-file) or biological image (biological-image), or
+    its thumbnail, for users who may see the evidence's case. Supports Range and conditional
+    requests; `?token=<access>` authenticates <img>/<video> requests (see evidence.media).
+    """
+    authentication_classes = [QueryTokenJWTAuthentication] + api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, kind, pk):
+        if kind not in media.MEDIA_SOURCES:
+            raise Http404
+        model, field, evidence_path = media.MEDIA_SOURCES[kind]
+        item = get_object_or_404(model.objects.select_related(f'{evidence_path}__case__trial'), pk=pk)
+        evidence = item
+        for part in evidence_path.split('__'):
+            evidence = getattr(evidence, part)
+        if not media.can_view_evidence(request.user, evidence):
+            raise PermissionDenied('You do not have access to this case.')
+        file = getattr(item, field)
+        if not file:
+            raise Http404
+        size = request.query_params.get('size')
+        if size is None:
+            return media.serve(request, file.name, file.path)
+        if size not in THUMBNAIL_SIZES:
+            raise Http404
+        name = thumbnail_name(file.name, size)
+        return media.serve(request, name, default_storage.path(name))
+
+
 class EvidenceLinkListCreateView(generics.ListCreateAPIView):
     """List/create evidence links for a case (detective visual board)."""
     permission_classes = [IsAuthenticated, IsOfficerOrAbove]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Trial, Verdict
+from .models import DossierSnapshot, Trial, Verdict
 
 
 @admin.register(Trial)
@@ -10,3 +10,9 @@ class TrialAdmin(admin.ModelAdmin):
 @admin.register(Verdict)
 class VerdictAdmin(admin.ModelAdmin):
     list_display = ['id', 'trial', 'title', 'recorded_at']
+
+
+@admin.register(DossierSnapshot)
+class DossierSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['case', 'version', 'built_at']
+    exclude = ['data']
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class JudiciaryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'judiciary'
+
+    def ready(self):
+        from .snapshots import connect_signals
+        connect_signals()
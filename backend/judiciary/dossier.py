@@ -0,0 +1,112 @@
+"""
+Judge dossier: the whole graph of one case (evidence, complainants, crime scene report, suspects
+with interrogations, captain decisions with chief approvals, trial/verdict and involved personnel
+with their roles) loaded with a fixed number of queries, independent of how many rows each part has.
+TrialFullDetailSerializer and TrialFullDataByCaseSerializer both read from a CaseDossier.
+"""
+from operator import attrgetter
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+
+from cases.models import Case, CaseComplainant
+from evidence.models import Evidence
+from suspects.models import CaptainDecision, Interrogation, Suspect
+
+
+def dossier_queryset():
+    return Case.objects.select_related(
+        'created_by',
+        'assigned_detective',
+        'complaint_origin__complainant',
+        'crime_scene_report__reported_by',
+        'trial__judge',
+        'trial__verdict',
+    ).prefetch_related(
+        Prefetch('complainants', queryset=CaseComplainant.objects.select_related('user')),
+        Prefetch('evidence_items', queryset=Evidence.objects.select_related('recorder').order_by('-created_at')),
+        Prefetch(
+            'suspects',
+            queryset=Suspect.objects.select_related('user').prefetch_related(
+                Prefetch('interrogations', queryset=Interrogation.objects.order_by('-created_at')),
+            ),
+        ),
+        Prefetch('captain_decisions', queryset=CaptainDecision.objects.select_related('chief_approval')),
+    )
+
+
+class CaseDossier:
+    """Prefetched case graph. Build with CaseDossier.load(case_id) (raises Case.DoesNotExist)."""
+
+    def __init__(self, case):
+        self.case = case
+        self._personnel = None
+
+    @classmethod
+    def load(cls, case_id):
+        return cls(dossier_queryset().get(pk=case_id))
+
+    @property
+    def crime_scene_report(self):
+        return getattr(self.case, 'crime_scene_report', None)
+
+    @property
+    def trial(self):
+        return getattr(self.case, 'trial', None)
+
+    @property
+    def verdict(self):
+        return getattr(self.trial, 'verdict', None) if self.trial else None
+
+    @property
+    def complainants(self):
+        return self.case.complainants.all()
+
+    @property
+    def evidence_items(self):
+        return self.case.evidence_items.all()
+
+    @property
+    def suspects(self):
+        return self.case.suspects.all()
+
+    @property
+    def interrogations(self):
+        """All interrogations of the case's suspects, newest first."""
+        items = [i for suspect in self.suspects for i in suspect.interrogations.all()]
+        return sorted(items, key=attrgetter('created_at'), reverse=True)
+
+    @property
+    def captain_decisions(self):
+        return self.case.captain_decisions.all()
+
+    @property
+    def chief_approvals(self):
+        approvals = [
+            decision.chief_approval for decision in self.captain_decisions
+            if getattr(decision, 'chief_approval', None)
+        ]
+        return sorted(approvals, key=attrgetter('created_at'), reverse=True)
+
+    def personnel_ids(self):
+        case = self.case
+        ids = {case.created_by_id, case.assigned_detective_id, case.approved_by_captain_id}
+        report = self.crime_scene_report
+        if report:
+            ids.update((report.reported_by_id, report.approved_by_supervisor_id))
+        for suspect in self.suspects:
+            ids.update((suspect.proposed_by_detective_id, suspect.approved_by_supervisor_id))
+        ids.update(decision.decided_by_id for decision in self.captain_decisions)
+        ids.discard(None)
+        return ids
+
+    @property
+    def personnel(self):
+        """Police personnel involved in the case with their role names (two queries, once)."""
+        if self._personnel is None:
+            users = get_user_model().objects.filter(pk__in=self.personnel_ids()).prefetch_related('roles')
+            self._personnel = [
+                {'id': u.id, 'username': u.username, 'full_name': u.full_name, 'role_names': u.role_names()}
+                for u in users
+            ]
+        return self._personnel
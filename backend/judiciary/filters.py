@@ -0,0 +1,37 @@
+"""
+Filters for the trial list: ?status=open|closed, ?judge=<id>, ?started_after= / ?started_before= (dates, inclusive).
+"""
+from datetime import datetime, time, timedelta
+
+import django_filters
+from django.utils import timezone
+
+from .models import Trial
+
+
+def _start_of_day(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+class TrialFilter(django_filters.FilterSet):
+    status = django_filters.ChoiceFilter(
+        choices=[('open', 'Open'), ('closed', 'Closed')],
+        method='filter_status',
+    )
+    judge = django_filters.NumberFilter(field_name='judge_id')
+    # Compared as datetime ranges (not __date) so the started_at index is used
+    started_after = django_filters.DateFilter(method='filter_started_after')
+    started_before = django_filters.DateFilter(method='filter_started_before')
+
+    class Meta:
+        model = Trial
+        fields = ['status', 'judge', 'started_after', 'started_before']
+
+    def filter_status(self, queryset, name, value):
+        return queryset.filter(closed_at__isnull=(value == 'open'))
+
+    def filter_started_after(self, queryset, name, value):
+        return queryset.filter(started_at__gte=_start_of_day(value))
+
+    def filter_started_before(self, queryset, name, value):
+        return queryset.filter(started_at__lt=_start_of_day(value + timedelta(days=1)))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('judiciary', '0003_interrogation_trial_reward_extensions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trial',
+            index=models.Index(fields=['-started_at', '-id'], name='judiciary_t_started_029ec6_idx'),
+        ),
+    ]
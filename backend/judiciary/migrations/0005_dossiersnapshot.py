@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cases', '0003_keyset_pagination_indexes'),
+        ('judiciary', '0004_trial_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DossierSnapshot',
+            fields=[
+                ('case', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dossier_snapshot', serialize=False, to='cases.case')),
+                ('version', models.PositiveSmallIntegerField()),
+                ('data', models.BinaryField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
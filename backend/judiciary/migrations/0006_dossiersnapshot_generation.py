@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('judiciary', '0005_dossiersnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dossiersnapshot',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='dossiersnapshot',
+            name='data',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='dossiersnapshot',
+            name='version',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
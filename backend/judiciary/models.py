@@ -31,6 +31,9 @@ class Trial(models.Model):
 
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['-started_at', '-id']),
+        ]
 
     def __str__(self):
         return f"Trial for Case #{self.case_id}"
@@ -65,3 +68,20 @@ class Verdict(models.Model):
 
     class Meta:
         ordering = ['-recorded_at']
+
+
+class DossierSnapshot(models.Model):
+    """Serialized judge dossier of one case (zlib-compressed JSON); see judiciary.snapshots."""
+    case = models.OneToOneField(
+        'cases.Case',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='dossier_snapshot',
+    )
+    version = models.PositiveSmallIntegerField(default=0)
+    generation = models.PositiveIntegerField(default=0)  # bumped by every invalidation
+    data = models.BinaryField(null=True)  # null until built and after invalidation
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Dossier snapshot for Case #{self.case_id} (v{self.version})"
@@ -4,7 +4,7 @@ from cases.models import Case, CrimeSceneReport, CaseComplainant
 from cases.serializers import CaseDetailSerializer, CrimeSceneReportSerializer, CaseComplainantSerializer
 from evidence.serializers import EvidenceListSerializer
 from suspects.serializers import SuspectListSerializer, InterrogationSerializer, CaptainDecisionSerializer, ChiefApprovalSerializer
-from suspects.models import ChiefApproval
+from .dossier import CaseDossier
 
 
 class TrialSerializer(serializers.ModelSerializer):
@@ -34,7 +34,18 @@ class VerdictCreateSerializer(serializers.ModelSerializer):
         fields = ['trial', 'verdict_type', 'title', 'description', 'punishment_title', 'punishment_description']
 
 
-class TrialFullDetailSerializer(serializers.ModelSerializer):
+class DossierSerializerMixin:
+    """Reads nested case data from a CaseDossier (context['dossier'] or loaded once per case)."""
+
+    def get_dossier(self, case_id):
+        dossier = self.context.get('dossier')
+        if dossier is None or dossier.case.pk != case_id:
+            dossier = CaseDossier.load(case_id)
+            self.context['dossier'] = dossier
+        return dossier
+
+
+class TrialFullDetailSerializer(DossierSerializerMixin, serializers.ModelSerializer):
     """Full case data for Judge: case, evidence, arrested person, interrogations (detective/sergeant), captain decisions, personnel."""
     judge_username = serializers.CharField(source='judge.username', read_only=True, allow_null=True)
     case_data = serializers.SerializerMethodField()
@@ -58,76 +69,46 @@ class TrialFullDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_case_data(self, obj):
-        return CaseDetailSerializer(obj.case).data
+        return CaseDetailSerializer(self.get_dossier(obj.case_id).case).data
 
     def get_evidence_items(self, obj):
-        from evidence.models import Evidence
-        items = Evidence.objects.filter(case=obj.case).order_by('-created_at')
-        return EvidenceListSerializer(items, many=True).data
+        return EvidenceListSerializer(self.get_dossier(obj.case_id).evidence_items, many=True).data
 
     def get_crime_scene_report(self, obj):
-        if getattr(obj.case, 'crime_scene_report', None):
-            return CrimeSceneReportSerializer(obj.case.crime_scene_report).data
-        return None
+        report = self.get_dossier(obj.case_id).crime_scene_report
+        return CrimeSceneReportSerializer(report).data if report else None
 
     def get_complainants(self, obj):
-        return CaseComplainantSerializer(obj.case.complainants.all(), many=True).data
+        return CaseComplainantSerializer(self.get_dossier(obj.case_id).complainants, many=True).data
 
     def get_suspects(self, obj):
-        return SuspectListSerializer(obj.case.suspects.all(), many=True).data
+        return SuspectListSerializer(self.get_dossier(obj.case_id).suspects, many=True).data
 
     def get_arrested_suspect(self, obj):
         """The suspect referred to this trial (arrested person)."""
-        if obj.suspect_id:
-            return SuspectListSerializer(obj.suspect).data
-        return None
+        if not obj.suspect_id:
+            return None
+        suspect = next((s for s in self.get_dossier(obj.case_id).suspects if s.pk == obj.suspect_id), None)
+        return SuspectListSerializer(suspect or obj.suspect).data
 
     def get_interrogations(self, obj):
         """Interrogation(s) with detective/sergeant scores and notes for the trial suspect(s)."""
-        from suspects.models import Interrogation
-        qs = Interrogation.objects.filter(suspect__case=obj.case).select_related('suspect').order_by('-created_at')
-        return InterrogationSerializer(qs, many=True).data
+        return InterrogationSerializer(self.get_dossier(obj.case_id).interrogations, many=True).data
 
     def get_captain_decisions(self, obj):
         """Captain decision(s) with reasoning for this case."""
-        return CaptainDecisionSerializer(obj.case.captain_decisions.all(), many=True).data
+        return CaptainDecisionSerializer(self.get_dossier(obj.case_id).captain_decisions, many=True).data
 
     def get_verdict(self, obj):
-        if getattr(obj, 'verdict', None):
-            return VerdictSerializer(obj.verdict).data
-        return None
+        verdict = self.get_dossier(obj.case_id).verdict
+        return VerdictSerializer(verdict).data if verdict else None
 
     def get_personnel(self, obj):
         """All police personnel involved: created_by, assigned_detective, approved_by_captain, etc."""
-        case = obj.case
-        users = set()
-        if case.created_by_id:
-            users.add(case.created_by_id)
-        if case.assigned_detective_id:
-            users.add(case.assigned_detective_id)
-        if case.approved_by_captain_id:
-            users.add(case.approved_by_captain_id)
-        if getattr(case, 'crime_scene_report', None) and case.crime_scene_report.reported_by_id:
-            users.add(case.crime_scene_report.reported_by_id)
-        if getattr(case, 'crime_scene_report', None) and case.crime_scene_report.approved_by_supervisor_id:
-            users.add(case.crime_scene_report.approved_by_supervisor_id)
-        for s in case.suspects.all():
-            if s.proposed_by_detective_id:
-                users.add(s.proposed_by_detective_id)
-            if s.approved_by_supervisor_id:
-                users.add(s.approved_by_supervisor_id)
-        for cd in case.captain_decisions.all():
-            if cd.decided_by_id:
-                users.add(cd.decided_by_id)
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        return [
-            {'id': u.id, 'username': u.username, 'full_name': u.full_name, 'role_names': u.role_names()}
-            for u in User.objects.filter(pk__in=users)
-        ]
+        return self.get_dossier(obj.case_id).personnel
 
 
-class TrialFullDataByCaseSerializer(serializers.Serializer):
+class TrialFullDataByCaseSerializer(DossierSerializerMixin, serializers.Serializer):
     """Full case data for judge by case_id: case, evidence, interrogations, captain decisions, chief approvals, personnel."""
     case_data = serializers.SerializerMethodField()
     evidence_items = serializers.SerializerMethodField()
@@ -141,74 +122,41 @@ class TrialFullDataByCaseSerializer(serializers.Serializer):
     trial = serializers.SerializerMethodField()
     verdict = serializers.SerializerMethodField()
 
-    def _case(self):
-        return self.instance
+    def _dossier(self):
+        return self.get_dossier(self.instance.pk)
 
     def get_case_data(self, obj):
-        return CaseDetailSerializer(self._case()).data
+        return CaseDetailSerializer(self._dossier().case).data
 
     def get_evidence_items(self, obj):
-        from evidence.models import Evidence
-        items = Evidence.objects.filter(case=self._case()).order_by('-created_at')
-        return EvidenceListSerializer(items, many=True).data
+        return EvidenceListSerializer(self._dossier().evidence_items, many=True).data
 
     def get_crime_scene_report(self, obj):
-        case = self._case()
-        if getattr(case, 'crime_scene_report', None):
-            return CrimeSceneReportSerializer(case.crime_scene_report).data
-        return None
+        report = self._dossier().crime_scene_report
+        return CrimeSceneReportSerializer(report).data if report else None
 
     def get_complainants(self, obj):
-        return CaseComplainantSerializer(self._case().complainants.all(), many=True).data
+        return CaseComplainantSerializer(self._dossier().complainants, many=True).data
 
     def get_suspects(self, obj):
-        return SuspectListSerializer(self._case().suspects.all(), many=True).data
+        return SuspectListSerializer(self._dossier().suspects, many=True).data
 
     def get_interrogations(self, obj):
-        from suspects.models import Interrogation
-        qs = Interrogation.objects.filter(suspect__case=self._case()).select_related('suspect').order_by('-created_at')
-        return InterrogationSerializer(qs, many=True).data
+        return InterrogationSerializer(self._dossier().interrogations, many=True).data
 
     def get_captain_decisions(self, obj):
-        return CaptainDecisionSerializer(self._case().captain_decisions.all(), many=True).data
+        return CaptainDecisionSerializer(self._dossier().captain_decisions, many=True).data
 
     def get_chief_approvals(self, obj):
-        approvals = ChiefApproval.objects.filter(captain_decision__case=self._case()).select_related('captain_decision')
-        return ChiefApprovalSerializer(approvals, many=True).data
+        return ChiefApprovalSerializer(self._dossier().chief_approvals, many=True).data
 
     def get_personnel(self, obj):
-        case = self._case()
-        users = set()
-        if case.created_by_id:
-            users.add(case.created_by_id)
-        if case.assigned_detective_id:
-            users.add(case.assigned_detective_id)
-        if case.approved_by_captain_id:
-            users.add(case.approved_by_captain_id)
-        if getattr(case, 'crime_scene_report', None) and case.crime_scene_report.reported_by_id:
-            users.add(case.crime_scene_report.reported_by_id)
-        if getattr(case, 'crime_scene_report', None) and case.crime_scene_report.approved_by_supervisor_id:
-            users.add(case.crime_scene_report.approved_by_supervisor_id)
-        for s in case.suspects.all():
-            if s.proposed_by_detective_id:
-                users.add(s.proposed_by_detective_id)
-            if s.approved_by_supervisor_id:
-                users.add(s.approved_by_supervisor_id)
-        for cd in case.captain_decisions.all():
-            if cd.decided_by_id:
-                users.add(cd.decided_by_id)
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        return [{'id': u.id, 'username': u.username, 'full_name': u.full_name, 'role_names': u.role_names()} for u in User.objects.filter(pk__in=users)]
+        return self._dossier().personnel
 
     def get_trial(self, obj):
-        case = self._case()
-        if getattr(case, 'trial', None):
-            return TrialSerializer(case.trial).data
-        return None
+        trial = self._dossier().trial
+        return TrialSerializer(trial).data if trial else None
 
     def get_verdict(self, obj):
-        case = self._case()
-        if getattr(case, 'trial', None) and getattr(case.trial, 'verdict', None):
-            return VerdictSerializer(case.trial.verdict).data
-        return None
+        verdict = self._dossier().verdict
+        return VerdictSerializer(verdict).data if verdict else None
@@ -0,0 +1,154 @@
+"""
+Materialized judge dossiers.
+The first view of /api/trials/<pk>/full/ or /api/trials/full-by-case/<case_id>/ for a case that
+has reached the judiciary serializes both payloads from one CaseDossier and stores them as a
+zlib-compressed JSON row (DossierSnapshot); repeat views are a single-row read. Saves and deletes
+of anything the dossier shows clear the case's snapshot after commit and bump its generation; a
+build only stores its payload if the generation it read before loading the dossier is unchanged,
+so a view racing a change cannot write back the dossier from before it. A case sent back out of
+SNAPSHOT_STATUSES has its row deleted by the next build and is served live again. Bump
+SNAPSHOT_VERSION when the payload format changes so stored rows are rebuilt.
+"""
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from cases.models import Case
+from .dossier import CaseDossier
+from .models import DossierSnapshot, Trial
+
+SNAPSHOT_VERSION = 1
+
+# Earlier cases are still being worked on; they are served live
+SNAPSHOT_STATUSES = (Case.STATUS_REFERRED_TO_JUDICIARY, Case.STATUS_CLOSED)
+
+
+def encode(payload):
+    return zlib.compress(json.dumps(payload, cls=DjangoJSONEncoder).encode())
+
+
+def decode(data):
+    return json.loads(zlib.decompress(data))
+
+
+def build_payload(dossier, request=None):
+    """
+    Both dossier payloads, rendered with the view's request like the live serializers (nested
+    serializers get no request, so the stored payload does not depend on the host that built it).
+    """
+    from .serializers import TrialFullDataByCaseSerializer, TrialFullDetailSerializer
+    context = {'dossier': dossier, 'request': request}
+    trial = dossier.trial
+    return {
+        'case': TrialFullDataByCaseSerializer(dossier.case, context=context).data,
+        'trial': TrialFullDetailSerializer(trial, context=context).data if trial else None,
+    }
+
+
+def _read(**lookup):
+    """(case_id, generation, payload or None) of the snapshot row, or None if the case has none."""
+    row = DossierSnapshot.objects.filter(**lookup).values_list('case_id', 'generation', 'version', 'data').first()
+    if row is None:
+        return None
+    case_id, generation, version, data = row
+    return case_id, generation, decode(data) if data is not None and version == SNAPSHOT_VERSION else None
+
+
+def _build(case_id, generation, request):
+    """
+    Load and serialize the dossier. `generation` is the snapshot's generation read before loading
+    (None: no snapshot row, and the case is not yet served from snapshots).
+    """
+    dossier = CaseDossier.load(case_id)
+    payload = build_payload(dossier, request)
+    if generation is not None:
+        # Conditional: an invalidation since the generation was read means the payload may be stale
+        row = DossierSnapshot.objects.filter(case_id=case_id, generation=generation)
+        if dossier.case.status in SNAPSHOT_STATUSES:
+            row.update(version=SNAPSHOT_VERSION, data=encode(payload), built_at=timezone.now())
+        else:
+            row.delete()  # no longer with the judiciary: rebuilding it on every view would be wasted
+    return payload
+
+
+def _claim(case_id, status):
+    """
+    Generation to build a case without a snapshot row against. The row is created before the
+    dossier is loaded so that invalidations from then on are counted.
+    """
+    if status not in SNAPSHOT_STATUSES:
+        return None
+    DossierSnapshot.objects.bulk_create([DossierSnapshot(case_id=case_id)], ignore_conflicts=True)
+    return 0  # a row created concurrently may be further along: the write is then skipped
+
+
+def _payload(snapshot, case_id, status, request):
+    if snapshot is not None:
+        case_id, generation, payload = snapshot
+        return payload if payload is not None else _build(case_id, generation, request)
+    return _build(case_id, _claim(case_id, status), request)
+
+
+def case_payload(case_id, request=None):
+    """TrialFullDataByCaseSerializer data for a case. Raises Case.DoesNotExist."""
+    snapshot = _read(case_id=case_id)
+    status = None
+    if snapshot is None:
+        status = Case.objects.values_list('status', flat=True).get(pk=case_id)
+    return _payload(snapshot, case_id, status, request)['case']
+
+
+def trial_payload(trial_id, request=None):
+    """TrialFullDetailSerializer data for a trial. Raises Trial.DoesNotExist."""
+    snapshot = _read(case__trial__pk=trial_id)
+    case_id = status = None
+    if snapshot is None:
+        case_id, status = Trial.objects.values_list('case_id', 'case__status').get(pk=trial_id)
+    return _payload(snapshot, case_id, status, request)['trial']
+
+
+def invalidate(**lookup):
+    transaction.on_commit(
+        lambda: DossierSnapshot.objects.filter(**lookup).update(generation=F('generation') + 1, data=None)
+    )
+
+
+def invalidation_lookups():
+    """model -> (DossierSnapshot lookup, instance attribute) identifying the snapshot it appears in."""
+    from cases.models import CaseComplainant, CrimeSceneReport
+    from evidence.models import Evidence
+    from suspects.models import CaptainDecision, ChiefApproval, Interrogation, Suspect
+    from .models import Verdict
+    return {
+        Case: ('case_id', 'pk'),
+        CaseComplainant: ('case_id', 'case_id'),
+        CrimeSceneReport: ('case_id', 'case_id'),
+        Evidence: ('case_id', 'case_id'),
+        Suspect: ('case_id', 'case_id'),
+        Interrogation: ('case__suspects', 'suspect_id'),
+        CaptainDecision: ('case_id', 'case_id'),
+        ChiefApproval: ('case__captain_decisions', 'captain_decision_id'),
+        Trial: ('case_id', 'case_id'),
+        Verdict: ('case__trial', 'trial_id'),
+    }
+
+
+def _make_handler(lookup, attr):
+    def handler(sender, instance, raw=False, **kwargs):
+        value = getattr(instance, attr)
+        if not raw and value is not None:
+            invalidate(**{lookup: value})
+    return handler
+
+
+def connect_signals():
+    for model, (lookup, attr) in invalidation_lookups().items():
+        handler = _make_handler(lookup, attr)
+        uid = f'judiciary.snapshots.{model._meta.label_lower}'
+        post_save.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(handler, sender=model, weak=False, dispatch_uid=uid)
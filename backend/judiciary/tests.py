@@ -1,10 +1,20 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from accounts.models import Role
-from cases.models import Case
-from judiciary.models import Trial
+from cases.models import Case, CaseComplainant
+from evidence.models import Evidence
+from judiciary.dossier import CaseDossier
+from judiciary.models import DossierSnapshot, Trial
+from suspects.models import CaptainDecision, ChiefApproval, Interrogation, Suspect
 
 User = get_user_model()
 
@@ -42,4 +52,156 @@ class JudiciaryTest(TestCase):
         })
 
         self.assertIn(response.status_code, [200, 201])
-        self.assertEqual(Trial.objects.count(), 1)
\ No newline at end of file
+        self.assertEqual(Trial.objects.count(), 1)
+
+    def test_trial_list_streamed_and_paginated(self):
+        """Full list is streamed as a JSON array; page params and filters give a paginated view."""
+        judge_role = Role.objects.create(name="Judge")
+        self.judge.roles.add(judge_role)
+        other_judge = User.objects.create_user(username="judge2", email="judge2@test.com", password="pass")
+        cases = Case.objects.bulk_create(
+            Case(title=f"Case {i}", created_by=self.judge) for i in range(7)
+        )
+        for i, case in enumerate(cases):
+            Trial.objects.create(
+                case=case,
+                judge=self.judge if i % 2 else other_judge,
+                closed_at=timezone.now() if i < 3 else None,
+            )
+        self.client.force_authenticate(User.objects.get(pk=self.judge.pk))
+        url = reverse("trial-list-create")
+
+        # roles + one SELECT with case/judge joined, whatever the number of trials
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+            body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(body), 7)
+        self.assertEqual(body[0]["case_title"], "Case 6")
+        self.assertEqual({row["judge_username"] for row in body}, {"judge", "judge2"})
+
+        response = self.client.get(url, {"page_size": 2, "status": "open", "judge": self.judge.id})
+        self.assertEqual(response.data["count"], 2)  # trials 3 and 5
+        self.assertEqual(len(response.data["results"]), 2)
+
+        tomorrow = (timezone.now() + timedelta(days=1)).date()
+        response = self.client.get(url, {"page": 1, "started_after": tomorrow.isoformat()})
+        self.assertEqual(response.data["count"], 0)
+        response = self.client.get(url, {"status": "closed"})
+        self.assertEqual(len(json.loads(b"".join(response.streaming_content))), 3)
+
+    def _add_dossier_rows(self, count):
+        """Suspects with interrogations, decisions with approvals, evidence and complainants, each by its own user."""
+        for i in range(count):
+            person = User.objects.create_user(username=f"person{self.rows}", email=f"p{self.rows}@test.com", password="pass")
+            officer = User.objects.create_user(username=f"officer{self.rows}", email=f"o{self.rows}@test.com", password="pass")
+            self.rows += 1
+            suspect = Suspect.objects.create(case=self.case, user=person, proposed_by_detective=officer)
+            Interrogation.objects.create(suspect=suspect, detective_probability=5, notes="n")
+            Interrogation.objects.create(suspect=suspect, supervisor_probability=7)
+            decision = CaptainDecision.objects.create(
+                suspect=suspect, case=self.case, final_decision=CaptainDecision.DECISION_GUILTY, decided_by=officer,
+            )
+            ChiefApproval.objects.create(
+                captain_decision=decision, status=ChiefApproval.STATUS_APPROVED, approved_by=self.judge,
+            )
+            Evidence.objects.create(case=self.case, evidence_type="other", title=f"E{i}", recorder=officer)
+            CaseComplainant.objects.create(case=self.case, user=person)
+        return suspect
+
+    def test_full_dossier_fixed_query_count(self):
+        """Both judge dossier endpoints cost the same number of queries however large the case is."""
+        self.judge.roles.add(Role.objects.create(name="Judge"))
+        self.rows = 0
+        suspect = self._add_dossier_rows(3)
+        trial = Trial.objects.create(case=self.case, judge=self.judge, suspect=suspect)
+        self.client.force_authenticate(self.judge)
+        detail_url = reverse("trial-full-detail", args=[trial.pk])
+        by_case_url = reverse("trial-full-by-case", args=[self.case.pk])
+
+        def count_queries(url):
+            self.client.force_authenticate(User.objects.get(pk=self.judge.pk))
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(ctx), response.data
+
+        detail_queries, detail = count_queries(detail_url)
+        by_case_queries, by_case = count_queries(by_case_url)
+        # roles, snapshot lookup, trial, case with its one-to-ones, 5 prefetches, personnel + their roles
+        self.assertLessEqual(detail_queries, 11)
+        self.assertEqual(len(detail["suspects"]), 3)
+        self.assertEqual(len(detail["interrogations"]), 6)
+        self.assertEqual(detail["arrested_suspect"]["id"], suspect.id)
+        self.assertEqual(len(by_case["chief_approvals"]), 3)
+        self.assertEqual(by_case["trial"]["id"], trial.id)
+        self.assertEqual(len(by_case["personnel"]), 4)  # judge (case creator) + 3 officers
+
+        self._add_dossier_rows(6)
+        self.assertEqual(count_queries(detail_url)[0], detail_queries)
+        by_case_after, by_case = count_queries(by_case_url)
+        self.assertEqual(by_case_after, by_case_queries)
+        self.assertEqual(len(by_case["evidence_items"]), 9)
+        self.assertEqual(len(by_case["interrogations"]), 18)
+
+    def test_dossier_snapshot_reused_and_invalidated(self):
+        """A referred case's dossier is built once, served from its snapshot, and rebuilt after a change."""
+        self.judge.roles.add(Role.objects.create(name="Judge"))
+        self.rows = 0
+        suspect = self._add_dossier_rows(2)
+        trial = Trial.objects.create(case=self.case, judge=self.judge, suspect=suspect)
+        detail_url = reverse("trial-full-detail", args=[trial.pk])
+        by_case_url = reverse("trial-full-by-case", args=[self.case.pk])
+        self.client.force_authenticate(self.judge)
+
+        # Still with the police: served live, no snapshot
+        self.client.get(by_case_url)
+        self.assertFalse(DossierSnapshot.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.case.status = Case.STATUS_REFERRED_TO_JUDICIARY
+            self.case.save()
+        first = self.client.get(by_case_url).data
+        self.assertEqual(DossierSnapshot.objects.get().case_id, self.case.pk)
+
+        self.client.force_authenticate(User.objects.get(pk=self.judge.pk))
+        with self.assertNumQueries(2):  # roles + snapshot row
+            self.assertEqual(self.client.get(by_case_url).data, first)
+        self.client.force_authenticate(User.objects.get(pk=self.judge.pk))
+        with self.assertNumQueries(2):
+            detail = self.client.get(detail_url).data
+        self.assertEqual(detail["arrested_suspect"]["id"], suspect.id)
+        self.assertEqual(detail["case_data"]["status"], Case.STATUS_REFERRED_TO_JUDICIARY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Interrogation.objects.create(suspect=suspect, notes="late")
+        self.assertIsNone(DossierSnapshot.objects.get().data)
+        self.assertEqual(len(self.client.get(detail_url).data["interrogations"]), 5)
+        self.assertEqual(len(self.client.get(by_case_url).data["interrogations"]), 5)
+
+        # A change committed while a view is building: its payload predates the change and is not stored
+        with self.captureOnCommitCallbacks(execute=True):
+            Interrogation.objects.create(suspect=suspect, notes="later")
+        load = CaseDossier.load
+
+        def load_then_change(case_id):
+            dossier = load(case_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                Interrogation.objects.create(suspect=suspect, notes="racing")
+            return dossier
+
+        with mock.patch("judiciary.snapshots.CaseDossier.load", side_effect=load_then_change):
+            self.assertEqual(len(self.client.get(by_case_url).data["interrogations"]), 6)
+        self.assertIsNone(DossierSnapshot.objects.get().data)
+        self.assertEqual(len(self.client.get(by_case_url).data["interrogations"]), 7)
+        self.assertIsNotNone(DossierSnapshot.objects.get().data)
+
+        # Sent back to the police: the row is dropped rather than rebuilt and stored on every view
+        with self.captureOnCommitCallbacks(execute=True):
+            self.case.status = Case.STATUS_UNDER_INVESTIGATION
+            self.case.save()
+        self.assertEqual(self.client.get(by_case_url).data["case_data"]["status"], Case.STATUS_UNDER_INVESTIGATION)
+        self.assertFalse(DossierSnapshot.objects.exists())
+        self.assertEqual(len(self.client.get(detail_url).data["interrogations"]), 7)
+        self.assertFalse(DossierSnapshot.objects.exists())
+
+        self.assertEqual(self.client.get(reverse("trial-full-detail", args=[trial.pk + 100])).status_code, 404)
@@ -6,27 +6,51 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.http import Http404
 
+from .filters import TrialFilter
 from .models import Trial, Verdict
 from .serializers import (
     TrialSerializer,
     VerdictSerializer,
     VerdictCreateSerializer,
     TrialFullDetailSerializer,
-    TrialFullDataByCaseSerializer,
 )
+from .snapshots import case_payload, trial_payload
 from cases.models import Case
 from accounts.permissions import IsJudge, CanReferCaseToJudiciary
+from core.streaming import streaming_json_response
 from core.utils import log_audit
 
 
+# Any of these query parameters switches the trial list from the full streamed array to pages
+PAGINATION_PARAMS = ('page', 'page_size', 'pagination', 'cursor')
+
+
 class TrialListCreateView(generics.ListCreateAPIView):
-    """List trials; create trial when case referred to judiciary (Captain/Chief/Judge)."""
+    """
+    List trials; create trial when case referred to judiciary (Captain/Chief/Judge).
+    GET streams the full list as a JSON array so the judge always sees all trials; with
+    ?page=/?page_size=/?pagination=cursor it is paginated instead. Both accept TrialFilter.
+    """
     permission_classes = [IsAuthenticated]
     serializer_class = TrialSerializer
-    queryset = Trial.objects.all().order_by('-started_at')
-    pagination_class = None  # Return full list so judge always sees all trials
+    filterset_class = TrialFilter
+    cursor_field = 'started_at'  # ?pagination=cursor (core.pagination)
+
+    def get_queryset(self):
+        return (
+            Trial.objects.select_related('case', 'judge')
+            .only('id', 'case', 'case__title', 'judge', 'judge__username', 'started_at', 'closed_at')
+            .order_by('-started_at', '-id')
+        )
+
+    def list(self, request, *args, **kwargs):
+        if any(param in request.query_params for param in PAGINATION_PARAMS):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return streaming_json_response(queryset, TrialSerializer, context=self.get_serializer_context())
 
     def get_permissions(self):
         if self.request.method == 'GET':
@@ -50,18 +74,24 @@ class TrialDetailView(generics.RetrieveUpdateAPIView):
 class TrialFullDetailView(generics.RetrieveAPIView):
     """Judge: full case data, all evidence, all reports, all approvals, all police personnel."""
     permission_classes = [IsAuthenticated, IsJudge]
-    queryset = Trial.objects.all()
     serializer_class = TrialFullDetailSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return Response(trial_payload(kwargs['pk'], request))
+        except Trial.DoesNotExist:
+            raise Http404
+
 
 class TrialFullDataByCaseView(APIView):
     """GET /api/trials/full-by-case/<case_id>/ — Judge: full case data by case_id (interrogations, captain decisions, chief approvals)."""
     permission_classes = [IsAuthenticated, IsJudge]
 
     def get(self, request, case_id):
-        case = get_object_or_404(Case, pk=case_id)
-        serializer = TrialFullDataByCaseSerializer(instance=case)
-        return Response(serializer.data)
+        try:
+            return Response(case_payload(case_id, request))
+        except Case.DoesNotExist:
+            raise Http404
 
 
 class VerdictListCreateView(generics.ListCreateAPIView):
@@ -77,9 +107,11 @@ class VerdictListCreateView(generics.ListCreateAPIView):
             return VerdictCreateSerializer
         return VerdictSerializer
 
+    @transaction.atomic
     def perform_create(self, serializer):
         verdict = serializer.save(recorded_by=self.request.user)
-        log_audit(self.request.user, 'create', 'Verdict', verdict.pk, verdict.title or verdict.verdict_type)
+        # Verdicts are legally binding: the audit row commits with the verdict or not at all
+        log_audit(self.request.user, 'create', 'Verdict', verdict.pk, verdict.title or verdict.verdict_type, durable=True)
         trial = verdict.trial
         from django.utils import timezone
         trial.closed_at = timezone.now()
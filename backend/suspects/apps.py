@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SuspectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'suspects'
+
+    def ready(self):
+        from .caching import connect_signals
+        connect_signals()
@@ -0,0 +1,77 @@
+"""
+Cached rendering of the public Most Wanted list (GET /api/most-wanted/).
+Scores are computed as of midnight (ranking_day), so they tick once a day. Each rendered page is
+cached under the current list version and day with a strong ETag (a hash of the body) and the
+time it was rendered as Last-Modified. Saves and deletes of suspects and cases, and the
+most-wanted sweep, start a new version after commit. With the default per-process cache other
+processes (web workers, the sweep) pick changes up within MOST_WANTED_CACHE_TTL seconds, when
+their copy is rendered again with a later Last-Modified; a shared cache backend makes
+invalidation immediate.
+"""
+import hashlib
+import json
+import uuid
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+VERSION_KEY = 'suspects:most_wanted:version'
+
+
+def most_wanted_cache_ttl():
+    return getattr(settings, 'MOST_WANTED_CACHE_TTL', 60)
+
+
+def ranking_day():
+    """Start of the current day: the public ranking counts whole days up to this moment."""
+    return timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+
+
+def current_version():
+    """Token of the list version; created on first use."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_on_commit(*args, **kwargs):
+    transaction.on_commit(invalidate)
+
+
+def get_page(url, render):
+    """
+    (data, etag, last_modified) for one page URL of the list, from the cache or render().
+    last_modified is when the page was rendered, so it moves forward whenever a process renders
+    the page again, whichever process made the change.
+    """
+    day = ranking_day()
+    key = 'suspects:most_wanted:page:' + hashlib.md5(f'{current_version()}|{day.isoformat()}|{url}'.encode()).hexdigest()
+    cached = cache.get(key)
+    if cached is None:
+        rendered_at = timezone.now().replace(microsecond=0)
+        data = render(day)
+        body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        etag = '"%s"' % hashlib.md5(body.encode()).hexdigest()
+        cached = (data, etag, rendered_at)
+        cache.set(key, cached, most_wanted_cache_ttl())
+    return cached
+
+
+def connect_signals():
+    from cases.models import Case
+    from .models import Suspect
+    for model in (Suspect, Case):
+        uid = f'suspects.caching.{model._meta.label_lower}'
+        post_save.connect(invalidate_on_commit, sender=model, dispatch_uid=uid)
+        post_delete.connect(invalidate_on_commit, sender=model, dispatch_uid=uid)
@@ -0,0 +1,122 @@
+"""
+Most Wanted ranking benchmark.
+Seeds people with several Suspect rows each inside a transaction that is rolled back, then times
+the per-person GROUP BY ranking (suspects.ranking) against aggregating the same rows in Python.
+The endpoint is timed with its page cache invalidated before each request.
+"""
+import statistics
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from cases.models import Case
+from suspects.caching import invalidate
+from suspects.models import Suspect
+from suspects.ranking import RANKED_STATUSES, attach_people, most_wanted_people, ranked_suspects
+
+BATCH_SIZE = 5000
+DATE_CHUNK = 100  # consecutive rows sharing a pursuit start date
+
+
+def python_ranking(now):
+    """The same ranking computed in Python from streamed rows (no GROUP BY)."""
+    people = defaultdict(lambda: [0, 0])
+    rows = ranked_suspects().values_list('user_id', 'first_pursuit_date', 'case__severity')
+    for user_id, first_pursuit_date, severity in rows.iterator(chunk_size=BATCH_SIZE):
+        best = people[user_id]
+        best[0] = max(best[0], (now - first_pursuit_date).days)
+        best[1] = max(best[1], 4 - severity)
+    return sorted(((days * degree, user_id) for user_id, (days, degree) in people.items()), reverse=True)
+
+
+class Command(BaseCommand):
+    help = 'Time the per-person Most Wanted ranking on seeded Suspect rows (nothing is persisted)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Suspect rows to seed')
+        parser.add_argument('--per-person', type=int, default=5, help='Suspect rows (cases) per person')
+        parser.add_argument('--cases', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=5)
+
+    def handle(self, *args, **options):
+        per_person = options['per_person']
+        people = max(options['rows'] // per_person, 1)
+        n_cases = max(options['cases'], per_person)
+        with transaction.atomic():
+            self.seed(people, per_person, n_cases)
+            now = timezone.now()
+            total = Suspect.objects.count()
+            ranked = ranked_suspects().count()
+            self.stdout.write(f'{total} suspect rows, {ranked} ranked, {people} people')
+
+            client = APIClient(HTTP_HOST='localhost')
+
+            def uncached_get():
+                invalidate()  # time rendering the page, not a page cache hit
+                return client.get('/api/most-wanted/')
+
+            measurements = [
+                ('GROUP BY count', lambda: most_wanted_people(now).count()),
+                ('GROUP BY page + attach', lambda: attach_people(list(most_wanted_people(now)[:20]), now)),
+                ('GET /api/most-wanted/', uncached_get),
+                ('python aggregate', lambda: python_ranking(now)),
+            ]
+            self.stdout.write(f'{"strategy":<26}{"queries":>9}{"median ms":>12}{"best ms":>10}')
+            for name, run in measurements:
+                reset_queries()  # the test client resets the log at request start
+                with CaptureQueriesContext(connection) as ctx:
+                    run()
+                timings = []
+                for _ in range(options['iterations']):
+                    start = time.perf_counter()
+                    run()
+                    timings.append((time.perf_counter() - start) * 1000)
+                self.stdout.write(f'{name:<26}{len(ctx):>9}{statistics.median(timings):>12.1f}{min(timings):>10.1f}')
+            transaction.set_rollback(True)
+
+    def seed(self, people, per_person, n_cases):
+        started = time.perf_counter()
+        password = make_password(None)
+        sergeant = User.objects.create_user(username='__bench_sergeant__', password=None)
+        cases = Case.objects.bulk_create(
+            [Case(title=f'Bench case {i}', severity=i % 4, created_by=sergeant) for i in range(n_cases)],
+            batch_size=BATCH_SIZE,
+        )
+        for offset in range(0, people, BATCH_SIZE):
+            User.objects.bulk_create(
+                [User(username=f'bench_wanted_{i}', password=password) for i in range(offset, min(offset + BATCH_SIZE, people))]
+            )
+        user_ids = User.objects.filter(username__startswith='bench_wanted_').values_list('pk', flat=True)
+        stride = n_cases // per_person
+        statuses = RANKED_STATUSES + (Suspect.STATUS_ARRESTED,)
+        batch = []
+        for p, user_id in enumerate(user_ids.iterator(chunk_size=BATCH_SIZE)):
+            for j in range(per_person):
+                batch.append(Suspect(
+                    case=cases[(p + j * stride) % n_cases],
+                    user_id=user_id,
+                    status=statuses[(p + j) % len(statuses)],
+                    approved_by_supervisor=sergeant,
+                ))
+            if len(batch) >= BATCH_SIZE:
+                self.spread_dates(Suspect.objects.bulk_create(batch))
+                batch = []
+        self.spread_dates(Suspect.objects.bulk_create(batch))
+        self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+    def spread_dates(self, suspects):
+        """first_pursuit_date is auto_now_add: move each chunk of new rows back a different number of days."""
+        now = timezone.now()
+        for start in range(0, len(suspects), DATE_CHUNK):
+            chunk = suspects[start:start + DATE_CHUNK]
+            Suspect.objects.filter(pk__gte=chunk[0].pk, pk__lte=chunk[-1].pk).update(
+                first_pursuit_date=now - timedelta(days=chunk[0].pk * 7 % 365),
+            )
@@ -0,0 +1,41 @@
+"""
+Promote approved suspects under investigation for more than 30 days to most wanted (suspects.ranking).
+Run it from cron (e.g. hourly), or keep it running with --interval.
+"""
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from suspects.ranking import promote_most_wanted
+
+
+class Command(BaseCommand):
+    help = 'Promote long-running suspects to the Most Wanted list in one set-based update'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Repeat every N seconds until interrupted (default: sweep once and exit)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        if not interval:
+            self.sweep()
+            return
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        self.stdout.write(f'Sweeping every {interval:g}s (Ctrl+C to stop)')
+        while not stop.is_set():
+            self.sweep()
+            stop.wait(interval)
+
+    def sweep(self):
+        started = time.perf_counter()
+        rows = promote_most_wanted()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        cases = len({case_id for _, case_id, _ in rows})
+        self.stdout.write(f'Promoted {len(rows)} suspect(s) in {cases} case(s) in {elapsed_ms:.1f} ms')
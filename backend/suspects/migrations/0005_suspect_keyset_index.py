@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suspects', '0004_add_interrogation_notes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='suspect',
+            index=models.Index(fields=['-marked_at', '-id'], name='suspects_su_marked__bc37fc_idx'),
+        ),
+    ]
@@ -2,6 +2,8 @@
 Suspect management: proposal, interrogation, guilt probability, arrest, status tracking.
 Detective proposes -> supervisor reviews with criminal records -> approve (arrest) or reject.
 """
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -15,6 +17,7 @@ class Suspect(models.Model):
     STATUS_RELEASED = 'released'
     STATUS_CONVICTED = 'convicted'
     STATUS_REJECTED = 'rejected'
+    MOST_WANTED_AFTER_DAYS = 30
     STATUS_CHOICES = [
         (STATUS_UNDER_INVESTIGATION, 'Under Investigation'),
         (STATUS_MOST_WANTED, 'Most Wanted'),
@@ -58,6 +61,7 @@ class Suspect(models.Model):
         ordering = ['-marked_at']
         indexes = [
             models.Index(fields=['status']),
+            models.Index(fields=['-marked_at', '-id']),
         ]
 
     def __str__(self):
@@ -91,8 +95,9 @@ class Suspect(models.Model):
         return self.ranking_score() * 20_000_000
 
     def update_most_wanted(self):
-        """If under_investigation and >30 days, set most_wanted."""
-        if self.status == self.STATUS_UNDER_INVESTIGATION and self.days_under_investigation > 30:
+        """If under_investigation and >30 days, set most_wanted (suspects.ranking.promote_most_wanted does all at once)."""
+        cutoff = timezone.now() - timedelta(days=self.MOST_WANTED_AFTER_DAYS)
+        if self.status == self.STATUS_UNDER_INVESTIGATION and self.first_pursuit_date < cutoff:
             self.status = self.STATUS_MOST_WANTED
             self.save(update_fields=['status'])
 
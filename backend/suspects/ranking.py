@@ -0,0 +1,142 @@
+"""
+Most Wanted ranking computed in the database, one entry per person.
+Over all of a person's approved Suspect rows that are under investigation or most wanted:
+score = max(days under investigation) * max(crime degree), crime degree = 4 - case severity;
+reward = score * 20,000,000 Rials. most_wanted_people() is a single GROUP BY user_id query,
+sorted and paginated in SQL; reading it never writes. Suspects are promoted to
+STATUS_MOST_WANTED by promote_most_wanted() (`manage.py sweep_most_wanted`).
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Func, IntegerField, Max, Min, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.stats import record_bulk_update
+from core.utils import log_audit_many, notify_each
+from .caching import invalidate_on_commit
+from .models import Suspect
+
+REWARD_PER_POINT = 20_000_000
+
+RANKED_STATUSES = (Suspect.STATUS_UNDER_INVESTIGATION, Suspect.STATUS_MOST_WANTED)
+
+
+class DaysSince(Func):
+    """Whole days from a datetime column to `now` (like timedelta.days for past dates)."""
+    output_field = IntegerField()
+    template = 'CAST(FLOOR(EXTRACT(EPOCH FROM (%(expressions)s)) / 86400) AS INTEGER)'
+    arg_joiner = ' - '
+
+    def __init__(self, field, now, **extra):
+        super().__init__(now, field, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Whole seconds first so julianday rounding cannot lose a day; integer division truncates
+        return self.as_sql(
+            compiler, connection,
+            template='(CAST(ROUND((julianday(%(expressions)s)) * 86400) AS INTEGER) / 86400)',
+            arg_joiner=') - julianday(',
+            **extra_context,
+        )
+
+
+def pursuit_days(now):
+    return Greatest(DaysSince('first_pursuit_date', Value(now)), Value(0))
+
+
+def crime_degree():
+    return Value(4) - F('case__severity')
+
+
+def ranked_suspects():
+    """Approved Suspect rows that count towards the ranking."""
+    return Suspect.objects.filter(approved_by_supervisor__isnull=False, status__in=RANKED_STATUSES)
+
+
+def annotate_ranking(queryset, now=None):
+    """Adds per-row pursuit_days, degree and score (ints) to a Suspect queryset."""
+    now = now or timezone.now()
+    return queryset.annotate(
+        pursuit_days=pursuit_days(now),
+        degree=crime_degree(),
+    ).annotate(score=F('pursuit_days') * F('degree'))
+
+
+def most_wanted_people(now=None):
+    """
+    One dict per person (GROUP BY user_id): days, degree, score, case_count, first_pursued and
+    last_marked, highest score first.
+    """
+    now = now or timezone.now()
+    return ranked_suspects().values('user_id').annotate(
+        days=Max(pursuit_days(now)),
+        degree=Max(crime_degree()),
+        case_count=Count('pk'),
+        first_pursued=Min('first_pursuit_date'),
+        last_marked=Max('marked_at'),
+    ).annotate(score=F('days') * F('degree')).order_by('-score', '-last_marked', 'user_id')
+
+
+def attach_people(rows, now=None):
+    """
+    Adds 'user' and 'suspects' (the person's ranked Suspect rows with their case, most severe
+    first) to a page of most_wanted_people() rows: two queries for the whole page.
+    """
+    user_ids = [row['user_id'] for row in rows]
+    users = get_user_model().objects.in_bulk(user_ids)
+    suspects = defaultdict(list)
+    queryset = ranked_suspects().filter(user_id__in=user_ids).select_related('case')
+    for suspect in annotate_ranking(queryset, now).order_by('-degree', '-marked_at', '-id'):
+        suspects[suspect.user_id].append(suspect)
+    for row in rows:
+        row['user'] = users.get(row['user_id'])
+        row['suspects'] = suspects[row['user_id']]
+    return rows
+
+
+def promote_most_wanted(now=None):
+    """
+    Move every approved suspect under investigation for more than MOST_WANTED_AFTER_DAYS to most wanted
+    with one UPDATE; audit entries and detective notifications are written in bulk in the same
+    transaction. Returns the promoted suspects as (id, case_id, proposed_by_detective_id) rows.
+    """
+    now = now or timezone.now()
+    eligible = Suspect.objects.filter(
+        approved_by_supervisor__isnull=False,
+        status=Suspect.STATUS_UNDER_INVESTIGATION,
+        first_pursuit_date__lt=now - timedelta(days=Suspect.MOST_WANTED_AFTER_DAYS),
+    )
+    with transaction.atomic():
+        rows = list(eligible.select_for_update().values_list('pk', 'case_id', 'proposed_by_detective_id'))
+        if not rows:
+            return []
+        # Exactly the locked rows: the ones audited, notified and counted below
+        promoted = Suspect.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(status=Suspect.STATUS_MOST_WANTED)
+        # queryset.update() skips model signals: keep counters, dossier snapshots and the public list in step
+        record_bulk_update(
+            Suspect, promoted, {'status': Suspect.STATUS_UNDER_INVESTIGATION}, {'status': Suspect.STATUS_MOST_WANTED},
+        )
+        from judiciary.snapshots import invalidate
+        invalidate(case_id__in=sorted({case_id for _, case_id, _ in rows}))
+        invalidate_on_commit()
+        log_audit_many(
+            None, 'status_change', 'Suspect', [pk for pk, _, _ in rows],
+            f'Promoted to most wanted after {Suspect.MOST_WANTED_AFTER_DAYS} days under investigation',
+        )
+        notify_each.delay([
+            {
+                'recipient': detective_id,
+                'title': 'Suspect added to Most Wanted',
+                'message': f'Suspect #{pk} in case #{case_id} has been under investigation for over '
+                           f'{Suspect.MOST_WANTED_AFTER_DAYS} days.',
+                'notification_type': 'suspect_most_wanted',
+                'related_model': 'Suspect',
+                'related_id': pk,
+            }
+            for pk, case_id, detective_id in rows if detective_id
+        ])
+    return rows
@@ -3,6 +3,7 @@ Suspect, Interrogation, ArrestOrder serializers. Ranking and reward calculation.
 """
 from rest_framework import serializers
 from .models import Suspect, Interrogation, ArrestOrder, CaptainDecision, ChiefApproval
+from .ranking import REWARD_PER_POINT, attach_people
 
 
 class SuspectListSerializer(serializers.ModelSerializer):
@@ -133,40 +134,78 @@ class ChiefApprovalCreateSerializer(serializers.Serializer):
     comment = serializers.CharField(required=False, allow_blank=True)
 
 
-class MostWantedPublicSerializer(serializers.ModelSerializer):
-    """Public Most Wanted list: photo (placeholder), personal details, score, reward. Sorted by score."""
-    user_full_name = serializers.CharField(source='user.full_name', read_only=True)
-    user_username = serializers.CharField(source='user.username', read_only=True)
-    case_title = serializers.CharField(source='case.title', read_only=True)
-    days_under_investigation = serializers.SerializerMethodField()
-    crime_degree = serializers.SerializerMethodField()
-    ranking_score = serializers.SerializerMethodField()
-    reward_rials = serializers.SerializerMethodField()
+class MostWantedListSerializer(serializers.ListSerializer):
+    """Loads users and Suspect rows for the whole page of people at once (suspects.ranking.attach_people)."""
+
+    def to_representation(self, data):
+        rows = attach_people([dict(row) for row in data])
+        return [self.child.to_representation(row) for row in rows]
+
+
+class MostWantedPublicSerializer(serializers.Serializer):
+    """
+    Public Most Wanted list, one entry per person: photo (placeholder), personal details, score, reward.
+    Score = max(days under investigation) × max(crime degree) over the person's open cases. Sorted by score.
+    `id`, `case` and `case_title` refer to the person's most severe case.
+    """
+    id = serializers.SerializerMethodField()
+    user = serializers.IntegerField(source='user_id')
+    user_username = serializers.CharField(source='user.username')
+    user_full_name = serializers.CharField(source='user.full_name')
     photo = serializers.SerializerMethodField()
+    case = serializers.SerializerMethodField()
+    case_title = serializers.SerializerMethodField()
+    cases = serializers.SerializerMethodField()
+    case_count = serializers.IntegerField()
+    days_under_investigation = serializers.IntegerField(source='days')
+    crime_degree = serializers.IntegerField(source='degree')
+    ranking_score = serializers.IntegerField(source='score')
+    reward_rials = serializers.SerializerMethodField()
+    marked_at = serializers.DateTimeField(source='last_marked')
 
     class Meta:
-        model = Suspect
-        fields = [
-            'id', 'user', 'user_username', 'user_full_name', 'photo',
-            'case', 'case_title', 'days_under_investigation', 'crime_degree',
-            'ranking_score', 'reward_rials', 'marked_at',
-        ]
+        list_serializer_class = MostWantedListSerializer
 
-    def get_days_under_investigation(self, obj):
-        return obj.days_under_investigation
+    def _top(self, row):
+        return row['suspects'][0] if row['suspects'] else None
 
-    def get_crime_degree(self, obj):
-        return obj.crime_degree()
+    def get_id(self, row):
+        top = self._top(row)
+        return top.id if top else None
 
-    def get_ranking_score(self, obj):
-        return obj.ranking_score()
+    def get_case(self, row):
+        top = self._top(row)
+        return top.case_id if top else None
 
-    def get_reward_rials(self, obj):
-        return obj.reward_rials()
+    def get_case_title(self, row):
+        top = self._top(row)
+        return top.case.title if top else ''
+
+    def get_cases(self, row):
+        return [{'id': s.case_id, 'title': s.case.title, 'crime_degree': s.degree} for s in row['suspects']]
+
+    def get_reward_rials(self, row):
+        return row['score'] * REWARD_PER_POINT
+
+    def get_photo(self, row):
+        return getattr(row['user'], 'photo', None) or None  # Optional User.photo; frontend can use placeholder
+
+
+class HighPriorityPersonSerializer(MostWantedPublicSerializer):
+    """Dashboard Most Wanted entry: public fields plus identity, status and all Suspect rows of the person."""
+    user_national_id = serializers.CharField(source='user.national_id')
+    status = serializers.SerializerMethodField()
+    days_pursued = serializers.IntegerField(source='days')
+    first_pursuit_date = serializers.DateTimeField(source='first_pursued')
+    suspect_ids = serializers.SerializerMethodField()
+
+    def get_status(self, row):
+        statuses = {s.status for s in row['suspects']}
+        return Suspect.STATUS_MOST_WANTED if Suspect.STATUS_MOST_WANTED in statuses else Suspect.STATUS_UNDER_INVESTIGATION
+
+    def get_suspect_ids(self, row):
+        return [s.id for s in row['suspects']]
 
-    def get_photo(self, obj):
-        return getattr(obj.user, 'photo', None) or None  # Optional User.photo; frontend can use placeholder
-        
 
 class ArrestOrderSerializer(serializers.ModelSerializer):
     class Meta:
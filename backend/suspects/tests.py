@@ -1,11 +1,19 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 from datetime import timedelta
+from unittest import mock
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from accounts.models import Role
 from cases.models import Case
+from core.models import AuditLog, Notification
+from core.stats import get_statistics
+from suspects.caching import most_wanted_cache_ttl, ranking_day
 from suspects.models import Suspect, CaptainDecision
 
 User = get_user_model()
@@ -13,6 +21,7 @@ User = get_user_model()
 class SuspectsTestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
+        cache.clear()
         
         # ایجاد نقش‌ها
         self.detective_role = Role.objects.create(name='Detective')
@@ -194,3 +203,166 @@ class SuspectsTestCase(TestCase):
         # بررسی اینکه هنوز وضعیت تغییر نکرده
         suspect.refresh_from_db()
         self.assertEqual(suspect.status, 'arrested')
+
+    # تست ۶: رتبه‌بندی Most Wanted در پایگاه داده و بدون نوشتن
+    def test_most_wanted_ranked_in_sql_without_writes(self):
+        """امتیاز (روز × درجه جرم) در SQL محاسبه و مرتب می‌شود و خواندن لیست هیچ ردیفی را تغییر نمی‌دهد"""
+        minor_case = Case.objects.create(
+            title='سرقت', severity=Case.SEVERITY_LEVEL_3, created_by=self.detective,
+        )
+        rows = [(self.case, 40), (minor_case, 100), (self.case, 10), (minor_case, 5)]
+        suspects = []
+        for i, (case, days) in enumerate(rows):
+            user = User.objects.create_user(
+                username=f'wanted{i}', password='Wanted@123456', email=f'wanted{i}@test.com',
+                phone=f'0913000000{i}', national_id=f'002000000{i}',
+            )
+            suspect = Suspect.objects.create(
+                case=case, user=user, proposed_by_detective=self.detective,
+                approved_by_supervisor=self.sergeant, status='under_investigation',
+            )
+            Suspect.objects.filter(pk=suspect.pk).update(first_pursuit_date=ranking_day() - timedelta(days=days, hours=1))
+            suspects.append(suspect)
+        # پیشنهاد تأییدنشده در لیست نمی‌آید
+        Suspect.objects.create(case=self.case, user=self.suspect_user, proposed_by_detective=self.detective)
+
+        # شمارش، صفحه (GROUP BY)، کاربران و ردیف‌های مظنون صفحه؛ بدون UPDATE
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/most-wanted/', {'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        results = response.data['results']
+        # ۴۰ روز × ۳ = ۱۲۰، ۱۰۰ روز × ۱ = ۱۰۰، ۱۰ روز × ۳ = ۳۰
+        self.assertEqual([r['id'] for r in results], [suspects[0].id, suspects[1].id, suspects[2].id])
+        self.assertEqual([r['ranking_score'] for r in results], [120, 100, 30])
+        for row in results:
+            suspect = Suspect.objects.get(pk=row['id'])
+            self.assertEqual(row['ranking_score'], suspect.ranking_score())
+            self.assertEqual(row['reward_rials'], suspect.reward_rials())
+            self.assertEqual(suspect.status, 'under_investigation')
+
+    # تست ۷: ارتقای گروهی به Most Wanted با دستور sweep_most_wanted
+    def test_sweep_most_wanted_command(self):
+        """مظنونان تأییدشده بیش از ۳۰ روز تحت تعقیب با یک UPDATE ارتقا می‌یابند و لاگ و اعلان گروهی ثبت می‌شود"""
+        # پیشنهاد تأییدنشده کارآگاه، هرچند قدیمی، ارتقا نمی‌یابد
+        ages = {
+            'old': (31, 'under_investigation', True), 'recent': (10, 'under_investigation', True),
+            'arrested': (40, 'arrested', True), 'unapproved': (40, 'under_investigation', False),
+        }
+        suspects = {}
+        for i, (name, (days, suspect_status, approved)) in enumerate(ages.items()):
+            user = User.objects.create_user(
+                username=name, password='Sweep@123456', email=f'{name}@test.com',
+                phone=f'0914000000{i}', national_id=f'003000000{i}',
+            )
+            suspect = Suspect.objects.create(
+                case=self.case, user=user, proposed_by_detective=self.detective, status=suspect_status,
+                approved_by_supervisor=self.sergeant if approved else None,
+            )
+            Suspect.objects.filter(pk=suspect.pk).update(first_pursuit_date=timezone.now() - timedelta(days=days))
+            suspects[name] = suspect
+        self.assertEqual(get_statistics()[0]['suspects_high_priority'], 0)
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('sweep_most_wanted', stdout=out)
+        self.assertIn('Promoted 1 suspect(s) in 1 case(s)', out.getvalue())
+
+        statuses = {name: Suspect.objects.get(pk=s.pk).status for name, s in suspects.items()}
+        self.assertEqual(statuses, {
+            'old': 'most_wanted', 'recent': 'under_investigation', 'arrested': 'arrested', 'unapproved': 'under_investigation',
+        })
+        self.assertEqual(
+            list(AuditLog.objects.filter(action='status_change', model_name='Suspect').values_list('object_id', flat=True)),
+            [str(suspects['old'].pk)],
+        )
+        notification = Notification.objects.get(notification_type='suspect_most_wanted')
+        self.assertEqual(notification.recipient, self.detective)
+        self.assertEqual(notification.related_id, str(suspects['old'].pk))
+        # شمارنده داشبورد بدون سیگنال مدل به‌روز شده است
+        self.assertEqual(get_statistics()[0]['suspects_high_priority'], 1)
+
+        # اجرای دوباره چیزی را تغییر نمی‌دهد
+        out = StringIO()
+        call_command('sweep_most_wanted', stdout=out)
+        self.assertIn('Promoted 0 suspect(s)', out.getvalue())
+
+    # تست ۸: تجمیع Most Wanted برای هر شخص در همه پرونده‌هایش
+    def test_most_wanted_aggregated_per_person(self):
+        """هر شخص یک بار می‌آید: امتیاز = بیشترین روز × بیشترین درجه جرم در همه پرونده‌های فعالش"""
+        minor_case = Case.objects.create(title='سرقت', severity=Case.SEVERITY_LEVEL_3, created_by=self.detective)
+        closed_case = Case.objects.create(title='کلاهبرداری', severity=Case.SEVERITY_CRISIS, created_by=self.detective)
+        for case, days, suspect_status in [
+            (minor_case, 100, 'most_wanted'),          # درجه ۱
+            (self.case, 10, 'under_investigation'),    # درجه ۳
+            (closed_case, 200, 'convicted'),           # در رتبه‌بندی حساب نمی‌شود
+        ]:
+            suspect = Suspect.objects.create(
+                case=case, user=self.suspect_user, proposed_by_detective=self.detective,
+                approved_by_supervisor=self.sergeant, status=suspect_status,
+            )
+            Suspect.objects.filter(pk=suspect.pk).update(first_pursuit_date=ranking_day() - timedelta(days=days, hours=1))
+        severe = Suspect.objects.get(case=self.case)
+
+        response = self.client.get('/api/most-wanted/')
+        self.assertEqual(response.data['count'], 1)
+        row = response.data['results'][0]
+        self.assertEqual(row['user'], self.suspect_user.id)
+        self.assertEqual((row['days_under_investigation'], row['crime_degree'], row['ranking_score']), (100, 3, 300))
+        self.assertEqual(row['reward_rials'], 300 * 20_000_000)
+        self.assertEqual(row['case_count'], 2)
+        self.assertEqual((row['id'], row['case']), (severe.id, self.case.id))
+        self.assertEqual([c['id'] for c in row['cases']], [self.case.id, minor_case.id])
+        self.assertNotIn('user_national_id', row)
+
+        self.client.force_authenticate(user=self.detective)
+        row = self.client.get('/api/suspects/high-priority/').data['results'][0]
+        self.assertEqual(row['status'], 'most_wanted')
+        self.assertEqual(row['user_national_id'], self.suspect_user.national_id)
+        self.assertEqual(row['days_pursued'], 100)
+        self.assertEqual(len(row['suspect_ids']), 2)
+
+    # تست ۹: کش عمومی Most Wanted با ETag و Last-Modified
+    def test_public_most_wanted_http_caching(self):
+        """صفحه عمومی کش می‌شود، ETag قوی و Cache-Control عمومی دارد و با تغییر مظنون تازه می‌شود"""
+        suspect = Suspect.objects.create(
+            case=self.case, user=self.suspect_user, proposed_by_detective=self.detective,
+            approved_by_supervisor=self.sergeant, status='under_investigation',
+        )
+        Suspect.objects.filter(pk=suspect.pk).update(first_pursuit_date=timezone.now() - timedelta(days=12))
+
+        response = self.client.get('/api/most-wanted/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertRegex(response['Cache-Control'], r'^public, max-age=\d+$')
+        self.assertIn('Last-Modified', response)
+        # رتبه‌بندی عمومی تا نیمه‌شب امروز حساب می‌شود
+        self.assertIn(response.data['results'][0]['days_under_investigation'], (11, 12))
+
+        # درخواست تکراری بدون کوئری پایگاه داده پاسخ داده می‌شود
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/most-wanted/')
+        self.assertEqual(again['ETag'], etag)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/most-wanted/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get('/api/most-wanted/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304,
+        )
+
+        # تغییر پرونده (درجه جرم) پس از commit نسخه جدید می‌سازد
+        with self.captureOnCommitCallbacks(execute=True):
+            self.case.severity = Case.SEVERITY_CRISIS
+            self.case.save()
+        fresh = self.client.get('/api/most-wanted/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(fresh['ETag'], etag)
+        self.assertEqual(fresh.data['results'][0]['crime_degree'], 4)
+
+        # تغییری در پروسه دیگر (بدون سیگنال در این پروسه): پس از TTL صفحه با Last-Modified جدیدتر دوباره ساخته می‌شود
+        Case.objects.filter(pk=self.case.pk).update(severity=Case.SEVERITY_LEVEL_3)
+        later = timezone.now() + timedelta(seconds=most_wanted_cache_ttl() + 1)
+        with mock.patch('django.utils.timezone.now', return_value=later), mock.patch('time.time', return_value=later.timestamp()):
+            changed = self.client.get('/api/most-wanted/', HTTP_IF_MODIFIED_SINCE=fresh['Last-Modified'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data['results'][0]['crime_degree'], 1)
@@ -1,13 +1,19 @@
+from datetime import timedelta
+
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
 from django.contrib.auth import get_user_model
 
 from .models import Suspect, Interrogation, ArrestOrder, CaptainDecision, ChiefApproval
+from .caching import get_page, most_wanted_cache_ttl, ranking_day
+from .ranking import most_wanted_people
 from cases.models import Case
 from .serializers import (
     SuspectListSerializer,
@@ -15,6 +21,7 @@ from .serializers import (
     SuspectProposeSerializer,
     SuspectSupervisorReviewSerializer,
     MostWantedPublicSerializer,
+    HighPriorityPersonSerializer,
     InterrogationSerializer,
     InterrogationCreateSerializer,
     InterrogationCaptainDecisionSerializer,
@@ -26,7 +33,7 @@ from .serializers import (
     ArrestOrderSerializer,
 )
 from accounts.permissions import IsDetective, IsSupervisor, IsCaptain, IsPoliceChief
-from core.utils import log_audit, notify
+from core.utils import log_audit, notify, notify_role
 from cases.models import Case
 
 User = get_user_model()
@@ -47,6 +54,7 @@ def _maybe_clear_waiting_sergeant(case):
 
 class SuspectListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
+    cursor_field = 'marked_at'  # ?pagination=cursor (core.pagination)
     serializer_class = SuspectListSerializer
 
     def get_queryset(self):
@@ -85,8 +93,7 @@ class SuspectListCreateView(generics.ListCreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         log_audit(request.user, 'create', 'Suspect', suspect.pk, 'Proposed')
-        for u in User.objects.filter(roles__name='Sergeant'):
-            notify(u, 'Proposed', f'{case.pk}', 'suspect_proposed', 'Suspect', suspect.pk)
+        notify_role.delay('Sergeant', 'Proposed', f'{case.pk}', 'suspect_proposed', 'Suspect', suspect.pk)
         return Response({'success': True, 'data': SuspectDetailSerializer(suspect).data}, status=status.HTTP_201_CREATED)
 
 
@@ -118,8 +125,8 @@ class SuspectSupervisorReviewView(APIView):
             suspect.save(update_fields=['status', 'rejection_message', 'approved_by_supervisor'])
             log_audit(request.user, 'reject', 'Suspect', suspect.pk, 'Suspect rejected by sergeant')
             if suspect.case.assigned_detective_id:
-                notify(
-                    suspect.case.assigned_detective,
+                notify.delay(
+                    suspect.case.assigned_detective_id,
                     'Suspect rejected',
                     f'Case #{suspect.case_id}: {msg}',
                     'suspect_rejected',
@@ -134,8 +141,8 @@ class SuspectSupervisorReviewView(APIView):
         suspect.save()
         log_audit(request.user, 'approve', 'Suspect', suspect.pk, 'Approved')
         if suspect.case.assigned_detective_id:
-            notify(
-                suspect.case.assigned_detective,
+            notify.delay(
+                suspect.case.assigned_detective_id,
                 'Suspect approved',
                 f'Suspect arrested in case #{suspect.case_id}. Arrest process begins.',
                 'suspect_approved',
@@ -170,15 +177,14 @@ class InterrogationListCreateView(generics.ListCreateAPIView):
 def _notify_captain_when_both_scores(interrogation):
     """When both detective and supervisor scores exist, notify captain."""
     if interrogation.detective_probability is not None and interrogation.supervisor_probability is not None:
-        for u in User.objects.filter(roles__name='Captain'):
-            notify(
-                u,
-                'Interrogation scores ready',
-                f'Case #{interrogation.suspect.case_id} suspect ready for captain decision.',
-                'interrogation_ready',
-                'Interrogation',
-                interrogation.pk,
-            )
+        notify_role.delay(
+            'Captain',
+            'Interrogation scores ready',
+            f'Case #{interrogation.suspect.case_id} suspect ready for captain decision.',
+            'interrogation_ready',
+            'Interrogation',
+            interrogation.pk,
+        )
 
 
 class InterrogationSubmitDetectiveScoreView(APIView):
@@ -245,8 +251,7 @@ class InterrogationCaptainDecisionView(APIView):
         case = interrogation.suspect.case
         if case.severity == Case.SEVERITY_CRISIS:
             interrogation.chief_confirmed = False
-            for u in User.objects.filter(roles__name='Police Chief'):
-                notify(u, 'Confirm', f'{case.pk}', 'chief_confirm', 'Interrogation', interrogation.pk)
+            notify_role.delay('Police Chief', 'Confirm', f'{case.pk}', 'chief_confirm', 'Interrogation', interrogation.pk)
         else:
             interrogation.chief_confirmed = True
         interrogation.save()
@@ -319,19 +324,19 @@ class CaptainDecisionListCreateView(APIView):
                 {'success': False, 'error': {'message': 'Case does not match suspect.'}},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        cap = CaptainDecision.objects.create(
-            suspect=suspect,
-            case=case,
-            final_decision=ser.validated_data['final_decision'],
-            reasoning=ser.validated_data.get('reasoning', ''),
-            decided_by=request.user,
-        )
-        log_audit(request.user, 'create', 'CaptainDecision', cap.pk, f'Decision: {cap.final_decision}')
-        if case.severity == Case.SEVERITY_CRISIS:
-            for u in User.objects.filter(roles__name='Police Chief'):
-                notify(u, 'Chief approval required', f'Case #{case.pk} captain decision for suspect', 'chief_approval_required', 'CaptainDecision', cap.pk)
-            return Response({'success': True, 'data': CaptainDecisionSerializer(cap).data, 'requires_chief_approval': True})
-        _apply_captain_decision(cap)
+        with transaction.atomic():
+            cap = CaptainDecision.objects.create(
+                suspect=suspect,
+                case=case,
+                final_decision=ser.validated_data['final_decision'],
+                reasoning=ser.validated_data.get('reasoning', ''),
+                decided_by=request.user,
+            )
+            log_audit(request.user, 'create', 'CaptainDecision', cap.pk, f'Decision: {cap.final_decision}', durable=True)
+            if case.severity == Case.SEVERITY_CRISIS:
+                notify_role.delay('Police Chief', 'Chief approval required', f'Case #{case.pk} captain decision for suspect', 'chief_approval_required', 'CaptainDecision', cap.pk)
+                return Response({'success': True, 'data': CaptainDecisionSerializer(cap).data, 'requires_chief_approval': True})
+            _apply_captain_decision(cap)
         return Response({'success': True, 'data': CaptainDecisionSerializer(cap).data})
 
 
@@ -348,15 +353,19 @@ class ChiefApprovalView(APIView):
             )
         ser = ChiefApprovalCreateSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
-        approval = ChiefApproval.objects.create(
-            captain_decision=captain_decision,
-            status=ser.validated_data['status'],
-            comment=ser.validated_data.get('comment', ''),
-            approved_by=request.user,
-        )
-        log_audit(request.user, 'approve' if approval.status == ChiefApproval.STATUS_APPROVED else 'reject', 'ChiefApproval', approval.pk, approval.status)
-        if approval.status == ChiefApproval.STATUS_APPROVED:
-            _apply_captain_decision(captain_decision)
+        with transaction.atomic():
+            approval = ChiefApproval.objects.create(
+                captain_decision=captain_decision,
+                status=ser.validated_data['status'],
+                comment=ser.validated_data.get('comment', ''),
+                approved_by=request.user,
+            )
+            log_audit(
+                request.user, 'approve' if approval.status == ChiefApproval.STATUS_APPROVED else 'reject',
+                'ChiefApproval', approval.pk, approval.status, durable=True,
+            )
+            if approval.status == ChiefApproval.STATUS_APPROVED:
+                _apply_captain_decision(captain_decision)
         return Response({'success': True, 'data': ChiefApprovalSerializer(approval).data})
 
 
@@ -371,31 +380,47 @@ class ArrestOrderListCreateView(generics.ListCreateAPIView):
         serializer.save(issued_by=self.request.user)
 
 
-def _most_wanted_queryset():
-    """Approved suspects (under investigation or most_wanted). Score = max(Lj)*max(Di) = crime_degree * days. Reward = score * 20,000,000 Rials. Sorted by score DESC."""
-    qs = Suspect.objects.filter(
-        approved_by_supervisor__isnull=False,
-        status__in=(Suspect.STATUS_UNDER_INVESTIGATION, Suspect.STATUS_MOST_WANTED),
-    )
-    for s in qs:
-        s.update_most_wanted()
-    # Sort by ranking_score (crime_degree * days_under_investigation) descending
-    return sorted(qs, key=lambda s: s.ranking_score(), reverse=True)
-
-
 class SuspectHighPriorityListView(generics.ListAPIView):
-    """Dashboard: approved suspects on Most Wanted list. Score = crime_degree * days, reward = score * 20M Rials. Order by score DESC."""
-    serializer_class = SuspectListSerializer
+    """Dashboard: people on the Most Wanted list. Score = max(crime_degree) * max(days) over their cases, reward = score * 20M Rials. Order by score DESC."""
+    serializer_class = HighPriorityPersonSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return _most_wanted_queryset()
+        return most_wanted_people()
 
 
 class MostWantedPublicListView(generics.ListAPIView):
-    """Public Most Wanted: approved suspects. Score = max(Lj)*max(Di) (crime degree 1–4 × days). Reward = score * 20,000,000 Rials. Order by score DESC."""
+    """
+    Public Most Wanted: one entry per person. Score = max(Lj)*max(Di) (crime degree 1–4 × days). Reward = score * 20,000,000 Rials. Order by score DESC.
+    Scores are as of midnight; pages are cached (suspects.caching) and sent with a strong ETag,
+    Last-Modified and Cache-Control: public, so If-None-Match / If-Modified-Since get 304.
+    """
     serializer_class = MostWantedPublicSerializer
     permission_classes = [AllowAny]
+    ranking_now = None
 
     def get_queryset(self):
-        return _most_wanted_queryset()
+        return most_wanted_people(now=self.ranking_now)
+
+    def list(self, request, *args, **kwargs):
+        def render(day):
+            self.ranking_now = day
+            return super(MostWantedPublicListView, self).list(request, *args, **kwargs).data
+
+        data, etag, last_modified = get_page(request.build_absolute_uri(), render)
+        # Never cache past the next daily score tick
+        until_tick = int((ranking_day() + timedelta(days=1) - timezone.now()).total_seconds())
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(last_modified.timestamp()),
+            'Cache-Control': f'public, max-age={max(0, min(most_wanted_cache_ttl(), until_tick))}',
+        }
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            not_modified = if_none_match.strip() == '*' or etag in parse_etags(if_none_match)
+        else:
+            since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+            not_modified = since is not None and int(last_modified.timestamp()) <= since
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips_rewards', '0002_interrogation_trial_reward_extensions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(fields=['-created_at', '-id'], name='tips_reward_created_03dfae_idx'),
+        ),
+    ]
@@ -61,6 +61,9 @@ class Tip(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
 
 
 class Reward(models.Model):
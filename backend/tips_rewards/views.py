@@ -7,20 +7,19 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from django.contrib.auth import get_user_model
 
 from .models import Tip, Reward, RewardPayment
 from .serializers import TipListSerializer, TipCreateSerializer, RewardSerializer, RewardClaimLookupSerializer
 from accounts.permissions import IsPoliceOfficer, IsDetective, IsOfficerOrAbove, has_any_role
-from core.utils import log_audit, notify
-
-User = get_user_model()
+from core.utils import log_audit, notify, notify_role
 
 
 class TipListCreateView(generics.ListCreateAPIView):
     """List tips (filtered by role); citizen submits tip."""
     permission_classes = [IsAuthenticated]
+    cursor_field = 'created_at'  # ?pagination=cursor (core.pagination)
     serializer_class = TipListSerializer
 
     def get_queryset(self):
@@ -51,14 +50,13 @@ class TipOfficerReviewView(APIView):
             tip.status = Tip.STATUS_REJECTED
             tip.reviewed_by_officer = request.user
             tip.save()
-            notify(tip.submitter, 'Tip rejected', request.data.get('message', 'Your tip was rejected as invalid.'), 'tip_rejected', 'Tip', tip.pk)
+            notify.delay(tip.submitter_id, 'Tip rejected', request.data.get('message', 'Your tip was rejected as invalid.'), 'tip_rejected', 'Tip', tip.pk)
             log_audit(request.user, 'reject', 'Tip', tip.pk, 'Tip rejected by officer')
             return Response({'success': True, 'data': TipListSerializer(tip).data, 'message': 'Tip rejected.'})
         tip.status = Tip.STATUS_OFFICER_REVIEWED
         tip.reviewed_by_officer = request.user
         tip.save()
-        for u in User.objects.filter(roles__name='Detective'):
-            notify(u, 'Tip to confirm', tip.title, 'tip_pending_detective', 'Tip', tip.pk)
+        notify_role.delay('Detective', 'Tip to confirm', tip.title, 'tip_pending_detective', 'Tip', tip.pk)
         log_audit(request.user, 'update', 'Tip', tip.pk, 'Officer reviewed; sent to detective')
         return Response({'success': True, 'data': TipListSerializer(tip).data})
 
@@ -83,7 +81,7 @@ class TipDetectiveConfirmView(APIView):
             amount_rials=amount,
             recipient_national_id=tip.submitter.national_id or '',
         )
-        notify(tip.submitter, 'Tip confirmed - Reward code', f'Code: {reward.unique_code}', 'reward_created', 'Reward', reward.pk)
+        notify.delay(tip.submitter_id, 'Tip confirmed - Reward code', f'Code: {reward.unique_code}', 'reward_created', 'Reward', reward.pk)
         log_audit(request.user, 'approve', 'Tip', tip.pk, 'Detective confirmed; reward created')
         return Response({
             'success': True,
@@ -136,15 +134,16 @@ class RewardRedeemView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         from django.utils import timezone
-        reward.claimed = True
-        reward.claimed_at = timezone.now()
-        reward.save(update_fields=['claimed', 'claimed_at'])
-        RewardPayment.objects.create(
-            reward=reward,
-            officer=request.user,
-            amount_rials=reward.amount_rials,
-        )
-        log_audit(request.user, 'update', 'Reward', reward.pk, 'Reward redeemed at police office')
+        with transaction.atomic():
+            reward.claimed = True
+            reward.claimed_at = timezone.now()
+            reward.save(update_fields=['claimed', 'claimed_at'])
+            RewardPayment.objects.create(
+                reward=reward,
+                officer=request.user,
+                amount_rials=reward.amount_rials,
+            )
+            log_audit(request.user, 'update', 'Reward', reward.pk, 'Reward redeemed at police office', durable=True)
         return Response({'success': True, 'data': RewardSerializer(reward).data, 'message': 'Reward redeemed.'})
 
 
@@ -8,6 +8,7 @@ import type {
   EvidenceLink,
   Suspect,
   MostWantedItem,
+  HighPriorityPerson,
   Interrogation,
   CaptainDecision,
   ChiefApproval,
@@ -146,7 +147,7 @@ export const suspectsApi = {
   list: (params?: { case?: number }) =>
     apiClient.get<PaginatedResponse<Suspect> | Suspect[]>('suspects/', { params }).then((res) => res.data),
   highPriority: () =>
-    apiClient.get<PaginatedResponse<Suspect> | Suspect[]>('suspects/high-priority/').then((res) => res.data),
+    apiClient.get<PaginatedResponse<HighPriorityPerson> | HighPriorityPerson[]>('suspects/high-priority/').then((res) => res.data),
   get: (id: number) => apiClient.get<Suspect>(`suspects/${id}/`).then((res) => res.data),
   propose: (caseId: number, userId: number) =>
     apiClient.post<{ data: Suspect }>('suspects/', { case_id: caseId, user_id: userId }).then((res) => res.data),
@@ -247,4 +248,10 @@ export const notificationsApi = {
   list: () =>
     apiClient.get<PaginatedResponse<Notification> | Notification[]>('notifications/').then((res) => res.data),
   markRead: (id: number) => apiClient.post(`notifications/${id}/read/`).then((res) => res.data),
+  unreadCount: () =>
+    apiClient.get<ApiSuccess<{ unread: number }>>('notifications/unread-count/').then((res) => res.data.data.unread),
+  markAllRead: () =>
+    apiClient
+      .post<ApiSuccess<{ updated: number }>>('notifications/mark-read/', { all: true })
+      .then((res) => res.data.data.updated),
 }
@@ -4,7 +4,7 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/Card'
 import { Input } from '@/components/ui/Input'
 import { CardSkeleton } from '@/components/ui/Skeleton'
 import { formatDate, formatCurrencyRials } from '@/utils/format'
-import type { Suspect } from '@/types'
+import type { HighPriorityPerson } from '@/types'
 
 function ensureArray<T>(data: T[] | { results: T[] }): T[] {
   return Array.isArray(data) ? data : (data as { results: T[] }).results ?? []
@@ -13,7 +13,7 @@ function ensureArray<T>(data: T[] | { results: T[] }): T[] {
 export function HighPriorityPage() {
   const [search, setSearch] = useState('')
   const { data, isLoading, error } = useSuspectsHighPriority()
-  const list = data ? ensureArray(data as Suspect[] | { results: Suspect[] }) : []
+  const list = data ? ensureArray<HighPriorityPerson>(data) : []
   const filtered = list.filter(
     (s) =>
       s.user_username?.toLowerCase().includes(search.toLowerCase()) ||
@@ -46,7 +46,7 @@ export function HighPriorityPage() {
               </CardHeader>
               <CardContent className="space-y-2">
                 <p className="text-sm text-slate-500">Case: {s.case_title}</p>
-                <p className="text-sm text-slate-400">Days pursued: {s.days_pursued ?? 0}</p>
+                <p className="text-sm text-slate-400">Days pursued: {s.days_pursued}</p>
                 {s.reward_rials != null && (
                   <p className="text-sm text-primary-400">Reward: {formatCurrencyRials(s.reward_rials)}</p>
                 )}
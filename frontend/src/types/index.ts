@@ -82,6 +82,12 @@ export interface Complaint {
   updated_at: string
 }
 
+/** Thumbnail URLs of an evidence image; null until the worker has rendered them */
+export interface EvidenceThumbnails {
+  small: string
+  medium: string
+}
+
 export interface Evidence {
   id: number
   case: number
@@ -93,8 +99,8 @@ export interface Evidence {
   recorder_username: string | null
   created_at: string
   updated_at: string
-  witness_detail?: { transcript?: string; media_files?: { file: string; media_type: string }[] }
-  biological_detail?: { verification_status: string; verification_result?: string | null; images?: { id: number; image: string; caption?: string }[] }
+  witness_detail?: { transcript?: string; media_file_url?: string | null; media_files?: { id: number; url: string; media_type: string; thumbnails?: EvidenceThumbnails | null }[] }
+  biological_detail?: { verification_status: string; verification_result?: string | null; images?: { id: number; url: string; caption?: string; thumbnails?: EvidenceThumbnails | null }[] }
   vehicle_detail?: { model?: string; color?: string; license_plate?: string; serial_number?: string }
   id_document_detail?: { owner_full_name?: string; attributes?: Record<string, unknown> }
 }
@@ -139,8 +145,11 @@ export interface MostWantedItem {
   user_username: string
   user_full_name: string
   photo: string | null
+  /** Most severe of the person's open cases */
   case: number
   case_title: string
+  cases: { id: number; title: string; crime_degree: number }[]
+  case_count: number
   days_under_investigation: number
   crime_degree: number
   ranking_score: number
@@ -148,6 +157,15 @@ export interface MostWantedItem {
   marked_at: string
 }
 
+/** suspects/high-priority/ entry: a MostWantedItem plus identity, status and all of the person's Suspect rows */
+export interface HighPriorityPerson extends MostWantedItem {
+  user_national_id: string
+  status: 'under_investigation' | 'most_wanted'
+  days_pursued: number
+  first_pursuit_date: string
+  suspect_ids: number[]
+}
+
 export interface Interrogation {
   id: number
   suspect: number